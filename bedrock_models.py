@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Per-model circuit breakers and sticky fallback routing for Bedrock model calls
+Bedrock モデル呼び出しのモデル別サーキットブレーカーとフォールバック制御
+"""
+
+import threading
+import time
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+# Preferred first; later models are fallbacks
+DEFAULT_MODEL_IDS = [
+    "us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
+    "us.anthropic.claude-3-5-sonnet-20240620-v1:0"
+]
+
+# Error codes meaning the model cannot work in this account or region, not that it is busy
+PERMANENT_ERROR_CODES = frozenset({
+    "AccessDeniedException", "ResourceNotFoundException", "UnrecognizedClientException"
+})
+
+# ValidationException mostly means a bad request body; only these messages blame the model itself
+MODEL_VALIDATION_MESSAGES = ("model identifier is invalid", "on-demand throughput isn")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _client_error(error: Exception) -> Dict[str, str]:
+    return (getattr(error, "response", None) or {}).get("Error", {})
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """True for botocore client errors that retrying the same model will not fix"""
+    details = _client_error(error)
+    if details.get("Code") == "ValidationException":
+        message = details.get("Message", "").lower()
+        return any(text in message for text in MODEL_VALIDATION_MESSAGES)
+    return details.get("Code") in PERMANENT_ERROR_CODES
+
+
+def is_request_error(error: Exception) -> bool:
+    """True when the request itself was rejected, which says nothing about the model's health"""
+    return _client_error(error).get("Code") == "ValidationException" and not is_permanent_error(error)
+
+
+class CircuitBreaker:
+    """
+    Failure state of one model
+
+    Closed: calls go through and consecutive failures are counted. After
+    failure_threshold of them (or one permanent error) the breaker opens and
+    the model is skipped. Once reset_timeout has passed it is half-open: a
+    single probe call is let through, closing the breaker on success and
+    reopening it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.failed_at: Optional[float] = None
+        self.probing = False
+        self.successes = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        """Whether a call may be sent now (an open breaker turns half-open when its timeout has passed)"""
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return self.state == CLOSED
+
+    def due(self, now: float) -> bool:
+        """Whether an available model should be retried ahead of the last good one"""
+        if self.state == HALF_OPEN:
+            return True
+        return self.failed_at is None or now - self.failed_at >= self.reset_timeout
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.failed_at = None
+        self.probing = False
+        self.successes += 1
+
+    def record_failure(self, now: float, error: Optional[str] = None, permanent: bool = False):
+        self.failures += 1
+        self.total_failures += 1
+        self.last_error = error
+        self.failed_at = now
+        self.probing = False
+        if permanent or self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = now
+
+
+class ModelRouter:
+    """
+    Chooses which models to try, in order, so calls skip models known to be failing
+
+    The last model that answered is tried first. A more preferred model is
+    tried before it when its breaker is due for a probe or, if still closed,
+    its last failure is reset_timeout old, so the preferred model is picked
+    up again once it recovers. Safe to share between threads.
+    """
+
+    def __init__(self, model_ids: Sequence[str] = DEFAULT_MODEL_IDS, failure_threshold: int = 3,
+                 reset_timeout: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.model_ids = list(model_ids)
+        self.breakers = {model_id: CircuitBreaker(failure_threshold, reset_timeout) for model_id in self.model_ids}
+        self.last_good: Optional[str] = None
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[str]:
+        """
+        Models to try for the next call, best first; empty when every breaker is open
+
+        A half-open model in the list is reserved for this caller's probe until
+        its result is recorded.
+        """
+        with self._lock:
+            now = self._clock()
+            available = [m for m in self.model_ids if self.breakers[m].available(now)]
+            if self.last_good in available:
+                # Only more preferred models due for a retry go ahead of the last good one
+                probes = [m for m in available[:available.index(self.last_good)] if self.breakers[m].due(now)]
+                rest = [m for m in available if m != self.last_good and m not in probes]
+                available = probes + [self.last_good] + rest
+            for model_id in available:
+                if self.breakers[model_id].state == HALF_OPEN:
+                    self.breakers[model_id].probing = True
+            return available
+
+    def release(self, model_ids: Sequence[str]):
+        """Give back probe reservations for candidates that were not called"""
+        with self._lock:
+            for model_id in model_ids:
+                self.breakers[model_id].probing = False
+
+    def record_success(self, model_id: str):
+        with self._lock:
+            self.breakers[model_id].record_success()
+            self.last_good = model_id
+
+    def record_failure(self, model_id: str, error: Optional[Exception] = None):
+        """Count a failed call against the model, unless the request itself was at fault"""
+        with self._lock:
+            if error is not None and is_request_error(error):
+                self.breakers[model_id].probing = False
+                self.breakers[model_id].last_error = str(error)
+                return
+            self.breakers[model_id].record_failure(self._clock(), None if error is None else str(error),
+                                                   error is not None and is_permanent_error(error))
+            if self.last_good == model_id and self.breakers[model_id].state == OPEN:
+                self.last_good = None
+
+    def state(self) -> Dict[str, Any]:
+        """Breaker state per model for monitoring"""
+        with self._lock:
+            now = self._clock()
+            models = []
+            for model_id in self.model_ids:
+                breaker = self.breakers[model_id]
+                retry_in = None
+                if breaker.state == OPEN:
+                    retry_in = round(max(0.0, breaker.reset_timeout - (now - breaker.opened_at)), 1)
+                models.append({
+                    "model_id": model_id,
+                    "state": breaker.state,
+                    "consecutive_failures": breaker.failures,
+                    "failures": breaker.total_failures,
+                    "successes": breaker.successes,
+                    "retry_in_seconds": retry_in,
+                    "last_error": breaker.last_error
+                })
+            return {"last_good": self.last_good, "models": models}
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized bulk grader for exported player submissions
+エクスポートされた提出データの一括採点ツール
+
+Usage:
+    python bulk_grader.py submissions.jsonl -o graded.jsonl
+    python bulk_grader.py submissions.csv -o graded.csv --chunk-size 50000
+"""
+
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Iterator, Optional, TextIO
+
+import numpy as np
+
+from languages import get_scenarios
+from rubric import Rubric, RubricTable, get_rubric
+from scoring import accepted_answer_keys
+
+DEFAULT_CHUNK_SIZE = 10000
+OUTPUT_FIELDS = ["player", "scenario_id", "score", "grade", "correct_ratio", "error"]
+
+
+def parse_services(value: Any) -> List[str]:
+    """Accept either a JSON list or a comma-separated string of services"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [s.strip() for s in value.split(",") if s.strip()]
+    return [str(s).strip() for s in value if str(s).strip()]
+
+
+def read_submissions(stream: TextIO, file_format: str) -> Iterator[Dict[str, Any]]:
+    """Stream (player, scenario_id, services) rows from a JSONL or CSV file"""
+    if file_format == "csv":
+        rows = csv.DictReader(stream)
+    else:
+        rows = (json.loads(line) for line in stream if line.strip())
+
+    for row in rows:
+        yield parse_submission(row)
+
+
+def parse_submission(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one raw JSONL/CSV row into player, scenario_id and services"""
+    scenario_id = row.get("scenario_id")
+    try:
+        scenario_id = int(scenario_id)
+    except (TypeError, ValueError):
+        scenario_id = None
+    return {
+        "player": row.get("player", ""),
+        "scenario_id": scenario_id,
+        "services": parse_services(row.get("services"))
+    }
+
+
+def iter_chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group rows into lists of at most chunk_size"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class AnswerKeyMatrix:
+    """
+    Scenario answer keys as a NumPy boolean matrix (answer keys x answer-key services)
+    シナリオの正解をNumPyのブール行列として保持
+
+    Every accepted answer key (correct_services plus alternative_services) is
+    one row, so a chunk is matched against all of them with one matrix product.
+    """
+
+    def __init__(self, scenarios: List[Dict[str, Any]], rubric: Optional[Rubric] = None):
+        answer_keys = [accepted_answer_keys(scenario) for scenario in scenarios]
+        self.columns: Dict[str, int] = {}
+        for scenario_keys in answer_keys:
+            for services in scenario_keys:
+                for service in services:
+                    self.columns.setdefault(service, len(self.columns))
+
+        self.rows = {scenario["id"]: row for row, scenario in enumerate(scenarios)}
+        flat_keys = [services for scenario_keys in answer_keys for services in scenario_keys]
+        self.keys = np.zeros((len(flat_keys), len(self.columns)), dtype=bool)
+        for key_row, services in enumerate(flat_keys):
+            self.keys[key_row, [self.columns[s] for s in services]] = True
+        self.key_sizes = self.keys.sum(axis=1)
+        self.key_columns = self.keys.T.astype(np.float32)
+
+        # key_index[scenario row, k] = matrix row of the scenario's k-th answer key,
+        # padded with its primary key (ties keep the earlier key, so padding never wins)
+        max_keys = max((len(scenario_keys) for scenario_keys in answer_keys), default=1)
+        self.key_index = np.zeros((len(scenarios), max_keys), dtype=np.intp)
+        first = 0
+        for row, scenario_keys in enumerate(answer_keys):
+            self.key_index[row] = first
+            self.key_index[row, :len(scenario_keys)] = np.arange(first, first + len(scenario_keys))
+            first += len(scenario_keys)
+        self.max_scores = np.array([scenario["max_score"] for scenario in scenarios], dtype=np.float64)
+
+        # Scenarios sharing a compiled rubric table are graded together
+        rubric = rubric or get_rubric()
+        tables: List[RubricTable] = []
+        table_ids = []
+        for scenario in scenarios:
+            table = rubric.for_scenario(scenario["id"])
+            if table not in tables:
+                tables.append(table)
+            table_ids.append(tables.index(table))
+        self.table_ids = np.array(table_ids, dtype=np.intp)
+        grade_dtype = f"U{max(len(g) for t in tables for g in t.grades)}" if tables else "U1"
+        self.tables = [
+            (np.array(t.cutoffs, dtype=np.float64), np.array(t.grades, dtype=grade_dtype),
+             np.array(t.penalties, dtype=np.float64), t.penalty_step)
+            for t in tables
+        ]
+
+    def encode(self, chunk: List[Dict[str, Any]]):
+        """Encode a chunk into a boolean selection matrix plus per-row metadata"""
+        selection = np.zeros((len(chunk), len(self.columns)), dtype=bool)
+        scenario_rows = np.zeros(len(chunk), dtype=np.intp)
+        valid = np.zeros(len(chunk), dtype=bool)
+        distinct = np.zeros(len(chunk), dtype=np.int64)
+
+        columns = self.columns
+        rows = self.rows
+        hit_rows = []
+        hit_cols = []
+        for i, submission in enumerate(chunk):
+            row = rows.get(submission["scenario_id"])
+            if row is not None:
+                scenario_rows[i] = row
+                valid[i] = True
+            services = set(submission["services"])
+            distinct[i] = len(services)
+            for service in services:
+                col = columns.get(service)
+                if col is not None:
+                    hit_rows.append(i)
+                    hit_cols.append(col)
+        selection[hit_rows, hit_cols] = True
+        return selection, scenario_rows, valid, distinct
+
+    def grade(self, chunk: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Compute score, grade and correct_ratio column-wise for a chunk, against each row's best answer key"""
+        selection, scenario_rows, valid, distinct = self.encode(chunk)
+        # matches[i, k] = number of services submission i shares with answer key k (exact in float32)
+        matches = (selection.astype(np.float32) @ self.key_columns).astype(np.int64)
+        row_numbers = np.arange(len(chunk))
+        base_scores = self.max_scores[scenario_rows]
+
+        best_score = best_ratio = best_key = None
+        for k in range(self.key_index.shape[1]):
+            key_rows = self.key_index[scenario_rows, k]
+            matched = matches[row_numbers, key_rows]
+            key_sizes = self.key_sizes[key_rows]
+            correct_ratio = np.divide(matched, key_sizes, out=np.zeros(len(chunk)), where=key_sizes > 0)
+            penalty = self._by_table(scenario_rows, self._penalty, distinct - matched)
+            score = np.maximum(0, np.trunc(base_scores * correct_ratio - penalty)).astype(np.int64)
+
+            if best_score is None:
+                best_score, best_ratio, best_key = score, correct_ratio, np.zeros(len(chunk), dtype=np.intp)
+            else:
+                better = (score > best_score) | ((score == best_score) & (correct_ratio > best_ratio))
+                best_score = np.where(better, score, best_score)
+                best_ratio = np.where(better, correct_ratio, best_ratio)
+                best_key = np.where(better, k, best_key)
+
+        return {
+            "score": best_score,
+            "grade": self._by_table(scenario_rows, self._grade, best_ratio),
+            "correct_ratio": best_ratio * 100,
+            "answer_key": best_key,
+            "valid": valid
+        }
+
+    def _by_table(self, scenario_rows: np.ndarray, apply, column: np.ndarray) -> np.ndarray:
+        """Apply a per-rubric-table function to each group of rows sharing a table"""
+        if len(self.tables) == 1:
+            return apply(self.tables[0], column)
+        result = None
+        table_ids = self.table_ids[scenario_rows]
+        for table_id, table in enumerate(self.tables):
+            rows = table_ids == table_id
+            if rows.any():
+                values = apply(table, column[rows])
+                if result is None:
+                    result = np.empty(len(column), dtype=values.dtype)
+                result[rows] = values
+        return result
+
+    @staticmethod
+    def _penalty(table, extra: np.ndarray) -> np.ndarray:
+        _, _, penalties, step = table
+        last = len(penalties) - 1
+        return penalties[np.minimum(extra, last)] + np.maximum(extra - last, 0) * step
+
+    @staticmethod
+    def _grade(table, correct_ratio: np.ndarray) -> np.ndarray:
+        cutoffs, grades, _, _ = table
+        return grades[np.searchsorted(cutoffs, correct_ratio, side="right")]
+
+
+def result_row(submission: Dict[str, Any], score: Optional[int] = None, grade: str = "",
+               correct_ratio: Optional[float] = None) -> Dict[str, Any]:
+    """Build one output row; a missing score marks an invalid scenario"""
+    if score is None:
+        return {
+            "player": submission["player"],
+            "scenario_id": submission["scenario_id"],
+            "score": "",
+            "grade": "",
+            "correct_ratio": "",
+            "error": "Invalid scenario ID"
+        }
+    return {
+        "player": submission["player"],
+        "scenario_id": submission["scenario_id"],
+        "score": score,
+        "grade": grade,
+        "correct_ratio": round(correct_ratio, 1),
+        "error": ""
+    }
+
+
+def write_results(writer, chunk: List[Dict[str, Any]], graded: Dict[str, np.ndarray]):
+    """Write one graded chunk, matching evaluate_architecture output values"""
+    columns = zip(
+        chunk,
+        graded["score"].tolist(),
+        graded["grade"].tolist(),
+        graded["correct_ratio"].tolist(),
+        graded["valid"].tolist()
+    )
+    for submission, score, grade, correct_ratio, valid in columns:
+        if valid:
+            writer(result_row(submission, score, grade, correct_ratio))
+        else:
+            writer(result_row(submission))
+
+
+def make_writer(stream: TextIO, file_format: str):
+    """Return a function that writes one result row in the requested format"""
+    if file_format == "csv":
+        csv_writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+        csv_writer.writeheader()
+        return csv_writer.writerow
+
+    def write_json(row):
+        stream.write(format_jsonl_row(row))
+    return write_json
+
+
+def format_jsonl_row(row: Dict[str, Any]) -> str:
+    """Serialize one result row as a JSONL line, omitting empty fields"""
+    if not row["error"]:
+        row = {k: v for k, v in row.items() if k != "error"}
+    else:
+        row = {"player": row["player"], "scenario_id": row["scenario_id"], "error": row["error"]}
+    return json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def grade_file(input_stream: TextIO, output_stream: TextIO, input_format: str = "jsonl",
+               output_format: str = "jsonl", language: str = "en",
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Grade every submission in input_stream chunk by chunk
+
+    Returns:
+        Number of rows graded
+    """
+    matrix = AnswerKeyMatrix(get_scenarios(language))
+    writer = make_writer(output_stream, output_format)
+
+    total = 0
+    for chunk in iter_chunks(read_submissions(input_stream, input_format), chunk_size):
+        write_results(writer, chunk, matrix.grade(chunk))
+        total += len(chunk)
+    return total
+
+
+def detect_format(path: Optional[str], default: str = "jsonl") -> str:
+    """Guess jsonl/csv from a file extension"""
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk re-grade exported quiz submissions")
+    parser.add_argument("input", help="JSONL or CSV file with player, scenario_id, services columns ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("--language", default="en", help="Scenario language (default: en)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        total = grade_file(input_stream, output_stream, input_format, output_format,
+                           args.language, args.chunk_size)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"✅ Graded {total} submissions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
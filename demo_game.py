@@ -7,6 +7,10 @@ Strands Agent なしで動作する簡易版
 import json
 import random
 from typing import Dict, List, Any
+from pricing import estimate_cost
+from requirement_index import REQUIREMENT_INDEX
+from scoring import ScoringKernel
+from service_catalog import catalog_for
 
 # ゲームデータ
 SCENARIOS = [
@@ -77,125 +81,34 @@ AWS_SERVICES = {
     "Management": ["CloudFormation", "Systems Manager", "Auto Scaling"]
 }
 
+GRADE_COMMENTS = {
+    "S": "🌟 素晴らしい！完璧に近いアーキテクチャです。",
+    "A": "👏 とても良いアーキテクチャです。",
+    "B": "👍 良いアーキテクチャですが、改善の余地があります。",
+    "C": "📚 基本的な要件は満たしていますが、重要な要素が不足しています。",
+    "D": "🔄 アーキテクチャの見直しが必要です。"
+}
+
+# 正解サービスをビットマスクとして事前にコンパイル
+SCORING_KERNEL = ScoringKernel(AWS_SERVICES, SCENARIOS)
+
 def check_architecture_cost(services: List[str], region: str = "us-east-1") -> Dict[str, Any]:
-    """選択されたAWSサービス構成の概算月額コストを計算"""
-    service_costs = {
-        "EC2": 30.37,  # t3.medium
-        "RDS": 33.58,  # db.t3.small
-        "ALB": 22.27,
-        "S3": 23.00,
-        "CloudFront": 85.00,
-        "Lambda": 20.00,
-        "DynamoDB": 25.00,
-        "API Gateway": 35.00,
-        "EKS": 72.00,
-        "Kinesis": 15.00,
-        "Redshift": 180.00,
-        "SageMaker": 50.00,
-        "Auto Scaling": 0.00,  # 無料
-        "ACM": 0.00,  # 無料
-        "WAF": 5.00,
-        "CloudWatch": 10.00,
-        "X-Ray": 5.00,
-        "EMR": 100.00,
-        "Glue": 44.00,
-        "QuickSight": 18.00,
-        "App Mesh": 0.00,
-        "Secrets Manager": 0.40
-    }
-    
-    total_cost = 0
-    cost_breakdown = {}
-    
-    for service in services:
-        cost = service_costs.get(service, 0)
-        cost_breakdown[service] = cost
-        total_cost += cost
-    
-    return {
-        "total_monthly_cost": round(total_cost, 2),
-        "cost_breakdown": cost_breakdown,
-        "region": region,
-        "currency": "USD"
-    }
+    """選択されたAWSサービス構成の概算月額コストを計算（他のゲームと同じ料金ストアを使用）"""
+    return estimate_cost(services, region)
 
 def evaluate_architecture(selected_services: List[str], scenario_id: int) -> Dict[str, Any]:
     """選択されたアーキテクチャを評価してスコアを計算"""
-    scenario = next((s for s in SCENARIOS if s["id"] == scenario_id), None)
-    if not scenario:
+    evaluation = SCORING_KERNEL.evaluate(selected_services, scenario_id)
+    if evaluation is None:
         return {"error": "Invalid scenario ID"}
     
-    correct_services = set(scenario["correct_services"])
-    selected_services_set = set(selected_services)
-    
-    # 正解したサービス
-    correct_matches = correct_services.intersection(selected_services_set)
-    # 不正解（余分なサービス）
-    incorrect_services = selected_services_set - correct_services
-    # 見逃したサービス
-    missed_services = correct_services - selected_services_set
-    
-    # スコア計算
-    base_score = scenario["max_score"]
-    correct_ratio = len(correct_matches) / len(correct_services) if correct_services else 0
-    penalty = len(incorrect_services) * 10
-    
-    final_score = max(0, int(base_score * correct_ratio - penalty))
-    
     # 評価コメント生成
-    if correct_ratio >= 0.9:
-        grade = "S"
-        comment = "🌟 素晴らしい！完璧に近いアーキテクチャです。"
-    elif correct_ratio >= 0.7:
-        grade = "A"
-        comment = "👏 とても良いアーキテクチャです。"
-    elif correct_ratio >= 0.5:
-        grade = "B"
-        comment = "👍 良いアーキテクチャですが、改善の余地があります。"
-    elif correct_ratio >= 0.3:
-        grade = "C"
-        comment = "📚 基本的な要件は満たしていますが、重要な要素が不足しています。"
-    else:
-        grade = "D"
-        comment = "🔄 アーキテクチャの見直しが必要です。"
-    
-    return {
-        "score": final_score,
-        "grade": grade,
-        "comment": comment,
-        "correct_services": list(correct_matches),
-        "incorrect_services": list(incorrect_services),
-        "missed_services": list(missed_services),
-        "correct_ratio": round(correct_ratio * 100, 1)
-    }
+    evaluation["comment"] = GRADE_COMMENTS.get(evaluation["grade"], "")
+    return evaluation
 
 def get_service_recommendations(requirements: List[str]) -> Dict[str, List[str]]:
     """要件に基づいてAWSサービスの推奨を提供"""
-    requirement_mapping = {
-        "高可用性": ["ALB", "Auto Scaling", "Multi-AZ RDS"],
-        "自動スケーリング": ["Auto Scaling", "ECS", "Lambda"],
-        "データベース": ["RDS", "DynamoDB", "ElastiCache"],
-        "静的コンテンツ配信": ["S3", "CloudFront"],
-        "SSL証明書": ["ACM", "ALB"],
-        "コンテナオーケストレーション": ["EKS", "ECS", "Fargate"],
-        "API管理": ["API Gateway", "ALB"],
-        "ログ集約": ["CloudWatch Logs", "Kinesis"],
-        "メトリクス監視": ["CloudWatch", "X-Ray"],
-        "セキュリティ": ["WAF", "Shield", "IAM"],
-        "ストリーミングデータ処理": ["Kinesis", "MSK"],
-        "データレイク": ["S3", "Lake Formation"],
-        "バッチ処理": ["EMR", "Batch", "Glue"],
-        "データウェアハウス": ["Redshift", "Athena"],
-        "可視化": ["QuickSight", "Grafana"],
-        "機械学習": ["SageMaker", "Bedrock"]
-    }
-    
-    recommendations = {}
-    for req in requirements:
-        if req in requirement_mapping:
-            recommendations[req] = requirement_mapping[req]
-    
-    return recommendations
+    return REQUIREMENT_INDEX.recommend(requirements, "ja")
 
 def display_services():
     """利用可能なAWSサービス一覧を表示"""
@@ -218,23 +131,15 @@ def validate_service_input(selected_input, available_services):
     """
     ユーザーの入力を検証し、提案以外のサービスがある場合はYes/Noで確認
     """
-    # 全ての利用可能なサービスのリストを作成
-    all_services = []
-    for services in available_services.values():
-        all_services.extend(services)
-    
-    selected_services = [s.strip() for s in selected_input.split(",") if s.strip()]
-    unknown_services = []
-    
-    # 提案にないサービスをチェック
-    for service in selected_services:
-        if service not in all_services:
-            unknown_services.append(service)
+    validation = catalog_for(available_services).validate(selected_input)
+    selected_services, unknown_services = validation["services"], validation["unknown"]
     
     if unknown_services:
         print(f"\n⚠️  以下のサービスは提案リストにありません:")
         for service in unknown_services:
-            print(f"  • {service}")
+            suggestions = validation["suggestions"][service]
+            hint = f" (もしかして: {', '.join(suggestions)})" if suggestions else ""
+            print(f"  • {service}{hint}")
         
         while True:
             confirm = input("\nこれらのサービスを含めて続行しますか？ (Yes/No): ").strip().lower()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Process-pool grading pipeline for large exam exports
+大規模な試験データ向けのマルチプロセス採点パイプライン
+
+Usage:
+    python grading_pipeline.py exam.jsonl -o graded.jsonl --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Any, Iterator, Optional, TextIO, Union
+
+from bulk_grader import (
+    DEFAULT_CHUNK_SIZE, OUTPUT_FIELDS, detect_format, format_jsonl_row, parse_submission, result_row
+)
+from languages import get_scenarios
+from rubric import Rubric, get_rubric
+from scoring import ScoringKernel
+
+# Scoring kernel installed once per worker process by _init_worker
+_worker_kernel = None
+
+
+def _init_worker(scenarios: List[Dict[str, Any]], rubric_definition: Dict[str, Any]):
+    """Build the answer-key and rubric tables once when a worker process starts"""
+    global _worker_kernel
+    # Answer-key services are enough for scoring; anything else counts as an extra service.
+    # The rubric is passed explicitly so spawned workers grade with the parent's active rubric.
+    _worker_kernel = ScoringKernel({}, scenarios, Rubric(rubric_definition))
+
+
+def _grade_chunk(payload: list, input_format: str, output_format: str) -> Union[str, List[Dict[str, Any]]]:
+    """
+    Parse, grade and serialize one chunk inside a worker
+
+    JSONL input arrives as raw lines so that parsing also runs in parallel.
+    JSONL output is returned as one text block; CSV output as row dicts.
+    """
+    if input_format == "jsonl":
+        submissions = [parse_submission(json.loads(line)) for line in payload if line.strip()]
+    else:
+        submissions = payload
+
+    results = _worker_kernel.score_batch((s["scenario_id"], s["services"]) for s in submissions)
+    rows = []
+    for submission, result in zip(submissions, results):
+        if result is None:
+            rows.append(result_row(submission))
+        else:
+            score, grade, correct_ratio = result
+            rows.append(result_row(submission, score, grade, correct_ratio * 100))
+
+    if output_format == "jsonl":
+        return "".join(format_jsonl_row(row) for row in rows)
+    return rows
+
+
+def _read_payloads(stream: TextIO, input_format: str, chunk_size: int) -> Iterator[list]:
+    """Split the input into chunks: raw lines for JSONL, parsed rows for CSV"""
+    if input_format == "csv":
+        rows = (parse_submission(row) for row in csv.DictReader(stream))
+    else:
+        rows = iter(stream)
+    while True:
+        payload = list(islice(rows, chunk_size))
+        if not payload:
+            return
+        yield payload
+
+
+def run_pipeline(input_stream: TextIO, output_stream: TextIO, input_format: str = "jsonl",
+                 output_format: str = "jsonl", language: str = "en",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Grade submissions across a process pool, writing results in input order
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    regardless of input size.
+
+    Returns:
+        Summary with row count, elapsed seconds and rows/sec
+    """
+    workers = workers or os.cpu_count() or 1
+    if output_format == "csv":
+        csv_writer = csv.DictWriter(output_stream, fieldnames=OUTPUT_FIELDS)
+        csv_writer.writeheader()
+
+    def write(result) -> int:
+        if output_format == "csv":
+            csv_writer.writerows(result)
+            return len(result)
+        output_stream.write(result)
+        return result.count("\n")
+
+    start = time.perf_counter()
+    total = 0
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(get_scenarios(language), get_rubric().definition)) as executor:
+        for payload in _read_payloads(input_stream, input_format, chunk_size):
+            pending.append(executor.submit(_grade_chunk, payload, input_format, output_format))
+            if len(pending) >= workers * 2:
+                total += write(pending.popleft().result())
+        while pending:
+            total += write(pending.popleft().result())
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "workers": workers
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Grade large submission exports on all CPU cores")
+    parser.add_argument("input", help="JSONL or CSV file with player, scenario_id, services columns ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("--language", default="en", help="Scenario language (default: en)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_pipeline(input_stream, output_stream, input_format, output_format,
+                               args.language, args.chunk_size, args.workers)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"✅ Graded {summary['rows']} submissions in {summary['elapsed_seconds']}s "
+          f"({summary['rows_per_second']} rows/sec, {summary['workers']} workers)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,7 @@ LANGUAGES = {
             
             # Validation
             "unknown_services_warning": "⚠️  以下のサービスは提案リストにありません:",
+            "did_you_mean": "もしかして: {services}",
             "continue_with_unknown": "これらのサービスを含めて続行しますか？ (Yes/No): ",
             "retry_service_selection": "サービス選択をやり直してください。",
             "yes_no_prompt": "❌ 'Yes' または 'No' で答えてください。",
@@ -80,6 +81,10 @@ LANGUAGES = {
                 "correct_services": [
                     "EC2", "ALB", "Auto Scaling", "RDS", "S3", "CloudFront", "ACM"
                 ],
+                "alternative_services": [
+                    ["ECS", "Fargate", "ALB", "RDS", "S3", "CloudFront", "ACM"],
+                    ["Lambda", "API Gateway", "DynamoDB", "S3", "CloudFront", "ACM"]
+                ],
                 "difficulty": "初級",
                 "max_score": 100
             },
@@ -98,6 +103,9 @@ LANGUAGES = {
                 "correct_services": [
                     "EKS", "App Mesh", "API Gateway", "CloudWatch", "X-Ray", "WAF", "Secrets Manager"
                 ],
+                "alternative_services": [
+                    ["ECS", "Fargate", "App Mesh", "API Gateway", "CloudWatch", "X-Ray", "WAF", "Secrets Manager"]
+                ],
                 "difficulty": "上級",
                 "max_score": 200
             },
@@ -116,6 +124,9 @@ LANGUAGES = {
                 "correct_services": [
                     "Kinesis", "S3", "EMR", "Redshift", "QuickSight", "SageMaker", "Glue"
                 ],
+                "alternative_services": [
+                    ["Kinesis", "S3", "Glue", "Athena", "QuickSight", "SageMaker"]
+                ],
                 "difficulty": "中級",
                 "max_score": 150
             }
@@ -152,6 +163,7 @@ LANGUAGES = {
             
             # Validation
             "unknown_services_warning": "⚠️  The following services are not in the suggested list:",
+            "did_you_mean": "did you mean: {services}?",
             "continue_with_unknown": "Do you want to continue with these services? (Yes/No): ",
             "retry_service_selection": "Please retry service selection.",
             "yes_no_prompt": "❌ Please answer with 'Yes' or 'No'.",
@@ -197,6 +209,10 @@ LANGUAGES = {
                 "correct_services": [
                     "EC2", "ALB", "Auto Scaling", "RDS", "S3", "CloudFront", "ACM"
                 ],
+                "alternative_services": [
+                    ["ECS", "Fargate", "ALB", "RDS", "S3", "CloudFront", "ACM"],
+                    ["Lambda", "API Gateway", "DynamoDB", "S3", "CloudFront", "ACM"]
+                ],
                 "difficulty": "Beginner",
                 "max_score": 100
             },
@@ -215,6 +231,9 @@ LANGUAGES = {
                 "correct_services": [
                     "EKS", "App Mesh", "API Gateway", "CloudWatch", "X-Ray", "WAF", "Secrets Manager"
                 ],
+                "alternative_services": [
+                    ["ECS", "Fargate", "App Mesh", "API Gateway", "CloudWatch", "X-Ray", "WAF", "Secrets Manager"]
+                ],
                 "difficulty": "Advanced",
                 "max_score": 200
             },
@@ -233,6 +252,9 @@ LANGUAGES = {
                 "correct_services": [
                     "Kinesis", "S3", "EMR", "Redshift", "QuickSight", "SageMaker", "Glue"
                 ],
+                "alternative_services": [
+                    ["Kinesis", "S3", "Glue", "Athena", "QuickSight", "SageMaker"]
+                ],
                 "difficulty": "Intermediate",
                 "max_score": 150
             }
@@ -256,7 +278,57 @@ def get_message(language_code, key, **kwargs):
         return message.format(**kwargs)
     return message
 
+class ScenarioCatalog:
+    """Scenario index built once at load time: lookup by (language, id) and buckets by difficulty"""
+    
+    def __init__(self, scenarios_by_language, default_language="en"):
+        self.default_language = default_language
+        self._scenarios = {}
+        self._by_id = {}
+        self._by_difficulty = {}
+        for code, scenarios in scenarios_by_language.items():
+            self._scenarios[code] = scenarios
+            for scenario in scenarios:
+                self._by_id[(code, scenario["id"])] = scenario
+                self._by_difficulty.setdefault((code, scenario["difficulty"]), []).append(scenario)
+    
+    def _resolve(self, language_code):
+        return language_code if language_code in self._scenarios else self.default_language
+    
+    def scenarios(self, language_code):
+        """All scenarios in the given language"""
+        return self._scenarios[self._resolve(language_code)]
+    
+    def get(self, language_code, scenario_id):
+        """Scenario by ID, or None if it does not exist"""
+        return self._by_id.get((self._resolve(language_code), scenario_id))
+    
+    def by_difficulty(self, language_code, difficulty):
+        """Scenarios with the given (localized) difficulty label"""
+        return self._by_difficulty.get((self._resolve(language_code), difficulty), [])
+
+SCENARIO_CATALOG = ScenarioCatalog({code: lang["scenarios"] for code, lang in LANGUAGES.items()})
+_scenario_reload_callbacks = []
+
+def on_scenarios_reloaded(callback):
+    """Register a callback to run after reload_scenarios() rebuilds the catalog"""
+    _scenario_reload_callbacks.append(callback)
+
+def reload_scenarios():
+    """Rebuild the scenario catalog from LANGUAGES and notify dependents (scoring kernels, caches)"""
+    global SCENARIO_CATALOG
+    SCENARIO_CATALOG = ScenarioCatalog({code: lang["scenarios"] for code, lang in LANGUAGES.items()})
+    for callback in _scenario_reload_callbacks:
+        callback()
+
 def get_scenarios(language_code):
     """Get scenarios in specified language"""
-    config = get_language_config(language_code)
-    return config["scenarios"]
+    return SCENARIO_CATALOG.scenarios(language_code)
+
+def get_scenario(language_code, scenario_id):
+    """Get a single scenario by ID in specified language"""
+    return SCENARIO_CATALOG.get(language_code, scenario_id)
+
+def get_scenarios_by_difficulty(language_code, difficulty):
+    """Get scenarios of the given difficulty in specified language"""
+    return SCENARIO_CATALOG.by_difficulty(language_code, difficulty)
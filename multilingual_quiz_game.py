@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 import json
 import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from strands import Agent, tool
 from strands_tools import use_aws, calculator, generate_image
-from languages import get_supported_languages, get_language_config, get_message, get_scenarios
+from languages import get_supported_languages, get_language_config, get_message, get_scenarios, get_scenarios_by_difficulty
+from optimizer import pareto_frontier, cheapest_for_grade, min_cost_cover, optimize_commitments
+from pricing import compare_regions, cost_sweep, estimate_cost, estimate_costs, simulate_cost
+from requirement_index import REQUIREMENT_INDEX
+from scoring import build_language_kernels
+from service_catalog import catalog_for, service_completion
+from service_recommender import SERVICE_RECOMMENDER
+from tool_cache import LRUCache, memoize, cost_key, evaluation_key
 
 AWS_SERVICES = {
     "Compute": ["EC2", "Lambda", "ECS", "EKS", "Fargate", "Batch"],
@@ -18,6 +25,13 @@ AWS_SERVICES = {
     "Management": ["CloudFormation", "Systems Manager", "Auto Scaling"]
 }
 
+# Answer keys compiled to bitmasks once per language
+SCORING_KERNELS = build_language_kernels(AWS_SERVICES)
+
+# Memoized tool results, cleared when scenario or pricing data is reloaded
+COST_CACHE = LRUCache("multilingual_quiz_game.check_architecture_cost", maxsize=4096, depends_on=("pricing",))
+EVALUATION_CACHE = LRUCache("multilingual_quiz_game.evaluate_architecture", maxsize=4096, depends_on=("scenarios", "rubric"))
+
 class MultilingualQuizGame:
     def __init__(self):
         self.score = 0
@@ -113,8 +127,16 @@ Please respond in English for all interactions.
             model="anthropic.claude-3-haiku-20240307-v1:0",
             tools=[
                 check_architecture_cost,
+                check_architecture_costs,
+                compare_region_costs,
+                sweep_architecture_cost,
+                simulate_architecture_cost,
                 evaluate_architecture, 
                 get_service_recommendations,
+                match_requirements,
+                recommend_services_for_text,
+                get_cost_score_frontier,
+                get_commitment_plan,
                 calculator,
                 generate_image
             ],
@@ -131,13 +153,17 @@ Please respond in English for all interactions.
         
     def get_scenario(self, difficulty: str = None) -> Dict:
         """Get scenario in current language"""
-        scenarios = get_scenarios(self.language)
         if difficulty:
-            scenarios = [s for s in scenarios if s["difficulty"] == difficulty]
+            scenarios = get_scenarios_by_difficulty(self.language, difficulty)
+        else:
+            scenarios = get_scenarios(self.language)
         return random.choice(scenarios)
 
 @tool
-def check_architecture_cost(services: List[str], region: str = "us-east-1") -> Dict[str, Any]:
+@memoize(COST_CACHE, cost_key)
+def check_architecture_cost(services: List[str], region: str = "us-east-1",
+                            instance_types: Optional[Dict[str, str]] = None,
+                            usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """
     Calculate estimated monthly cost for selected AWS services configuration
     選択されたAWSサービス構成の概算月額コストを計算
@@ -145,50 +171,100 @@ def check_architecture_cost(services: List[str], region: str = "us-east-1") -> D
     Args:
         services: List of selected AWS services / 選択されたAWSサービスのリスト
         region: AWS region / AWSリージョン
+        instance_types: Optional instance type per service, e.g. {"EC2": "m5.large"} /
+            サービスごとのインスタンスタイプ（任意）
+        usage: Optional usage dimensions: requests, storage_gb, transfer_gb, instance_hours /
+            利用量（リクエスト数、保存GB、転送GB、インスタンス時間、任意）
     
     Returns:
         Dictionary containing cost information / コスト情報を含む辞書
     """
-    # Simplified cost calculation (actual Pricing API would be more complex)
-    service_costs = {
-        "EC2": {"t3.medium": 30.37, "m5.large": 70.08, "c5.xlarge": 156.82},
-        "RDS": {"db.t3.micro": 16.79, "db.t3.small": 33.58, "db.m5.large": 140.16},
-        "ALB": 22.27,
-        "S3": 23.00,  # 1TB standard storage
-        "CloudFront": 85.00,  # 1TB data transfer
-        "Lambda": 20.00,  # 1M requests
-        "DynamoDB": 25.00,  # 25 RCU/WCU
-        "API Gateway": 35.00,  # 1M requests
-        "EKS": 72.00,  # cluster cost
-        "Kinesis": 15.00,  # 1 shard
-        "Redshift": 180.00,  # dc2.large
-        "SageMaker": 50.00   # ml.t3.medium
-    }
+    return estimate_cost(services, region, instance_types, usage)
+
+@tool
+def check_architecture_costs(architectures: List[List[str]], region: str = "us-east-1",
+                             instance_types: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Calculate estimated monthly costs for many candidate architectures at once
+    複数の候補アーキテクチャの概算月額コストを一括計算
     
-    total_cost = 0
-    cost_breakdown = {}
+    Args:
+        architectures: List of service lists, one per architecture / アーキテクチャごとのサービスリスト
+        region: AWS region / AWSリージョン
+        instance_types: Optional instance type per service / サービスごとのインスタンスタイプ（任意）
     
-    for service in services:
-        if service in service_costs:
-            if isinstance(service_costs[service], dict):
-                # Services with instance types like EC2, RDS
-                cost = list(service_costs[service].values())[0]  # Default to smallest config
-            else:
-                cost = service_costs[service]
-            
-            cost_breakdown[service] = cost
-            total_cost += cost
-        else:
-            cost_breakdown[service] = 0  # Unknown services cost $0
+    Returns:
+        One cost result per architecture, same format as check_architecture_cost /
+        アーキテクチャごとのコスト情報（check_architecture_cost と同じ形式）
+    """
+    return estimate_costs(architectures, region, instance_types)
+
+@tool
+def compare_region_costs(services: List[str], regions: Optional[List[str]] = None,
+                         instance_types: Optional[Dict[str, str]] = None,
+                         usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Compare the monthly cost of one architecture across AWS regions in a single call
+    1回の呼び出しでリージョンごとの月額コストを比較
     
-    return {
-        "total_monthly_cost": round(total_cost, 2),
-        "cost_breakdown": cost_breakdown,
-        "region": region,
-        "currency": "USD"
-    }
+    Args:
+        services: List of selected AWS services / 選択されたAWSサービスのリスト
+        regions: Regions to compare, all supported regions by default / 比較するリージョン（既定は全リージョン）
+        instance_types: Optional instance type per service / サービスごとのインスタンスタイプ（任意）
+        usage: Optional usage dimensions / 利用量（任意）
+    
+    Returns:
+        Region x service cost matrix, per-region totals and the cheapest region /
+        リージョン×サービスのコスト行列、リージョン別合計、最安リージョン
+    """
+    return compare_regions(services, regions, instance_types, usage)
 
 @tool
+def sweep_architecture_cost(services: List[str], sweep: Dict[str, List[float]], region: str = "us-east-1",
+                            instance_types: Optional[Dict[str, str]] = None,
+                            usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    What-if monthly cost of one architecture over a grid of usage values
+    利用量の組み合わせごとの月額コストを一括計算（what-if 分析）
+    
+    Args:
+        services: List of selected AWS services / 選択されたAWSサービスのリスト
+        sweep: Values per usage dimension, e.g. {"requests": [1e5, 1e6, 1e7]} /
+            利用量ごとの試算値
+        region: AWS region / AWSリージョン
+        instance_types: Optional instance type per service / サービスごとのインスタンスタイプ（任意）
+        usage: Fixed values for dimensions that are not swept / 固定する利用量（任意）
+    
+    Returns:
+        Monthly cost for every combination of the swept values / 各組み合わせの月額コスト
+    """
+    return cost_sweep(services, sweep, region, instance_types, usage)
+
+@tool
+def simulate_architecture_cost(services: List[str], distributions: Dict[str, Dict[str, Any]],
+                               region: str = "us-east-1", instance_types: Optional[Dict[str, str]] = None,
+                               usage: Optional[Dict[str, float]] = None, trials: int = 100000) -> Dict[str, Any]:
+    """
+    Monthly cost distribution of one architecture when usage is uncertain (Monte Carlo)
+    利用量が不確実な場合の月額コスト分布をモンテカルロ法で試算
+    
+    Args:
+        services: List of selected AWS services / 選択されたAWSサービスのリスト
+        distributions: Distribution per usage dimension, e.g.
+            {"requests": {"distribution": "lognormal", "median": 1e6, "sigma": 0.5}};
+            kinds: fixed, uniform, triangular, normal, lognormal / 利用量ごとの確率分布
+        region: AWS region / AWSリージョン
+        instance_types: Optional instance type per service / サービスごとのインスタンスタイプ（任意）
+        usage: Fixed values for dimensions that are not simulated / 固定する利用量（任意）
+        trials: Number of simulated months, at most 1,000,000 / 試行回数（最大1,000,000）
+    
+    Returns:
+        Cost quantiles (p50, p95, ...) and a histogram / コストの分位点とヒストグラム
+    """
+    return simulate_cost(services, distributions, region, instance_types, usage, trials)
+
+@tool
+@memoize(EVALUATION_CACHE, evaluation_key)
 def evaluate_architecture(selected_services: List[str], scenario_id: int, language: str = "en") -> Dict[str, Any]:
     """
     Evaluate selected architecture and calculate score
@@ -202,57 +278,65 @@ def evaluate_architecture(selected_services: List[str], scenario_id: int, langua
     Returns:
         Evaluation results and score / 評価結果とスコア
     """
-    scenarios = get_scenarios(language)
-    scenario = next((s for s in scenarios if s["id"] == scenario_id), None)
-    if not scenario:
+    kernel = SCORING_KERNELS.get(language, SCORING_KERNELS["en"])
+    evaluation = kernel.evaluate(selected_services, scenario_id)
+    if evaluation is None:
         return {"error": "Invalid scenario ID"}
     
-    correct_services = set(scenario["correct_services"])
-    selected_services_set = set(selected_services)
-    
-    # Correct matches
-    correct_matches = correct_services.intersection(selected_services_set)
-    # Incorrect services (extra services)
-    incorrect_services = selected_services_set - correct_services
-    # Missed services
-    missed_services = correct_services - selected_services_set
-    
-    # Score calculation
-    base_score = scenario["max_score"]
-    correct_ratio = len(correct_matches) / len(correct_services)
-    penalty = len(incorrect_services) * 10  # 10 points penalty per extra service
+    # Generate evaluation comment
+    evaluation["comment"] = get_message(language, f"grade_{evaluation['grade'].lower()}_comment")
+    return evaluation
+
+@tool
+def get_cost_score_frontier(scenario_id: int, target_grade: str = "S", language: str = "en") -> Dict[str, Any]:
+    """
+    Find the cheapest architectures for each achievable score
+    各スコアを達成できる最も安価なアーキテクチャを探索
     
-    final_score = max(0, int(base_score * correct_ratio - penalty))
+    Args:
+        scenario_id: Scenario ID / シナリオID
+        target_grade: Grade the cheapest architecture must reach (S/A/B/C/D) / 最安構成が満たすべきグレード
+        language: Language code / 言語コード
     
-    # Generate evaluation comment
-    if correct_ratio >= 0.9:
-        grade = "S"
-        comment = get_message(language, "grade_s_comment")
-    elif correct_ratio >= 0.7:
-        grade = "A"
-        comment = get_message(language, "grade_a_comment")
-    elif correct_ratio >= 0.5:
-        grade = "B"
-        comment = get_message(language, "grade_b_comment")
-    elif correct_ratio >= 0.3:
-        grade = "C"
-        comment = get_message(language, "grade_c_comment")
-    else:
-        grade = "D"
-        comment = get_message(language, "grade_d_comment")
+    Returns:
+        Pareto frontier of monthly cost vs. score and the cheapest architecture reaching the target grade /
+        月額コストとスコアのパレートフロンティア、および目標グレードを満たす最安構成
+    """
+    kernel = SCORING_KERNELS.get(language, SCORING_KERNELS["en"])
+    frontier = pareto_frontier(kernel, scenario_id)
+    if frontier is None:
+        return {"error": "Invalid scenario ID"}
+    grades = kernel.rubric_table(scenario_id).ranking
+    if str(target_grade).strip().upper() not in grades:
+        return {"error": f"Unknown grade: {target_grade}", "grades": list(grades)}
     
     return {
-        "score": final_score,
-        "grade": grade,
-        "comment": comment,
-        "correct_services": list(correct_matches),
-        "incorrect_services": list(incorrect_services),
-        "missed_services": list(missed_services),
-        "correct_ratio": round(correct_ratio * 100, 1)
+        "frontier": frontier,
+        "cheapest_for_target_grade": cheapest_for_grade(kernel, scenario_id, target_grade),
+        "currency": "USD"
     }
 
 @tool
-def get_service_recommendations(requirements: List[str], language: str = "en") -> Dict[str, List[str]]:
+def get_commitment_plan(cost_breakdown: Dict[str, float], usage_profile: Optional[Dict[str, List[float]]] = None,
+                        term: str = "1yr") -> Dict[str, Any]:
+    """
+    Cheapest mix of on-demand, Reserved Instances and a Savings Plan for a cost breakdown
+    オンデマンド・リザーブドインスタンス・Savings Plans の最適な組み合わせを算出
+    
+    Args:
+        cost_breakdown: Per-service monthly cost from check_architecture_cost / check_architecture_cost のサービス別コスト
+        usage_profile: Demand per time slot relative to the breakdown, e.g. {"EC2": [1, 1, 2, 0.5]} /
+            時間帯ごとの利用量（コスト内訳を1.0とした比率、任意）
+        term: Commitment term, "1yr" or "3yr" / 契約期間
+    
+    Returns:
+        Reservation coverage, hourly Savings Plan commitment and expected savings /
+        リザーブド比率、Savings Plans の時間単価コミットメント、想定削減額
+    """
+    return optimize_commitments(cost_breakdown, usage_profile, term)
+
+@tool
+def get_service_recommendations(requirements: List[str], language: str = "en", minimize_cost: bool = False) -> Dict[str, Any]:
     """
     Provide AWS service recommendations based on requirements
     要件に基づいてAWSサービスの推奨を提供
@@ -260,59 +344,48 @@ def get_service_recommendations(requirements: List[str], language: str = "en") -
     Args:
         requirements: List of requirements / 要件のリスト
         language: Language code / 言語コード
+        minimize_cost: Return the cheapest service set covering all requirements instead /
+            すべての要件を満たす最安のサービス構成を返す
     
     Returns:
-        Recommended services by category / カテゴリ別の推奨サービス
+        Recommended services by category, or the cheapest covering set with per-requirement coverage /
+        カテゴリ別の推奨サービス、または要件ごとの充足内訳付きの最安構成
     """
-    recommendations = {}
-    
-    # English requirement mapping
-    en_requirement_mapping = {
-        "High availability": ["ALB", "Auto Scaling", "Multi-AZ RDS"],
-        "Auto scaling": ["Auto Scaling", "ECS", "Lambda"],
-        "Database": ["RDS", "DynamoDB", "ElastiCache"],
-        "Static content delivery": ["S3", "CloudFront"],
-        "SSL certificate": ["ACM", "ALB"],
-        "Container orchestration": ["EKS", "ECS", "Fargate"],
-        "API management": ["API Gateway", "ALB"],
-        "Log aggregation": ["CloudWatch Logs", "Kinesis"],
-        "Metrics monitoring": ["CloudWatch", "X-Ray"],
-        "Security": ["WAF", "Shield", "IAM"],
-        "Streaming data processing": ["Kinesis", "MSK"],
-        "Data lake": ["S3", "Lake Formation"],
-        "Batch processing": ["EMR", "Batch", "Glue"],
-        "Data warehouse": ["Redshift", "Athena"],
-        "Visualization": ["QuickSight", "Grafana"],
-        "Machine learning": ["SageMaker", "Bedrock"]
-    }
+    if minimize_cost:
+        return min_cost_cover(requirements, REQUIREMENT_INDEX.recommend(requirements, language))
     
-    # Japanese requirement mapping
-    ja_requirement_mapping = {
-        "高可用性": ["ALB", "Auto Scaling", "Multi-AZ RDS"],
-        "自動スケーリング": ["Auto Scaling", "ECS", "Lambda"],
-        "データベース": ["RDS", "DynamoDB", "ElastiCache"],
-        "静的コンテンツ配信": ["S3", "CloudFront"],
-        "SSL証明書": ["ACM", "ALB"],
-        "コンテナオーケストレーション": ["EKS", "ECS", "Fargate"],
-        "API管理": ["API Gateway", "ALB"],
-        "ログ集約": ["CloudWatch Logs", "Kinesis"],
-        "メトリクス監視": ["CloudWatch", "X-Ray"],
-        "セキュリティ": ["WAF", "Shield", "IAM"],
-        "ストリーミングデータ処理": ["Kinesis", "MSK"],
-        "データレイク": ["S3", "Lake Formation"],
-        "バッチ処理": ["EMR", "Batch", "Glue"],
-        "データウェアハウス": ["Redshift", "Athena"],
-        "可視化": ["QuickSight", "Grafana"],
-        "機械学習": ["SageMaker", "Bedrock"]
-    }
+    return REQUIREMENT_INDEX.recommend(requirements, language)
+
+@tool
+def match_requirements(requirements: List[str], language: str = "en", top_k: int = 3) -> Dict[str, Any]:
+    """
+    Find the known requirements closest to free-text requirement phrases
+    自由記述の要件に最も近い既知の要件を検索
+    
+    Args:
+        requirements: Requirement phrases, in any supported language / 要件の表現（どの言語でも可）
+        language: Language code for the returned names / 返す要件名の言語コード
+        top_k: Matches to return per phrase / 表現ごとの候補数
     
-    requirement_mapping = ja_requirement_mapping if language == "ja" else en_requirement_mapping
+    Returns:
+        Scored candidate requirements (1.0 = exact) for each phrase / 表現ごとのスコア付き候補（1.0は完全一致）
+    """
+    return {req: REQUIREMENT_INDEX.fuzzy_matches(req, language, top_k) for req in requirements}
+
+@tool
+def recommend_services_for_text(text: str, top_k: int = 7) -> List[Dict[str, Any]]:
+    """
+    Rank AWS services for a free-text scenario or requirement description (local TF-IDF, no LLM)
+    自由記述のシナリオや要件からAWSサービスを順位付け（ローカルTF-IDF、LLM不要）
     
-    for req in requirements:
-        if req in requirement_mapping:
-            recommendations[req] = requirement_mapping[req]
+    Args:
+        text: Scenario description and requirements, in English or Japanese / シナリオの説明と要件（英語または日本語）
+        top_k: Number of services to return / 返すサービス数
     
-    return recommendations
+    Returns:
+        Services with cosine similarity scores, best first / 類似度スコア付きのサービス（高い順）
+    """
+    return SERVICE_RECOMMENDER.recommend(text, top_k)
 
 def get_player_name(language):
     """Get player name as required input"""
@@ -328,23 +401,15 @@ def validate_service_input(selected_input, available_services, language):
     """
     Validate user input and confirm with Yes/No if there are services not in suggestions
     """
-    # Create list of all available services
-    all_services = []
-    for services in available_services.values():
-        all_services.extend(services)
-    
-    selected_services = [s.strip() for s in selected_input.split(",") if s.strip()]
-    unknown_services = []
-    
-    # Check for services not in suggestions
-    for service in selected_services:
-        if service not in all_services:
-            unknown_services.append(service)
+    validation = catalog_for(available_services).validate(selected_input)
+    selected_services, unknown_services = validation["services"], validation["unknown"]
     
     if unknown_services:
         print(f"\n{get_message(language, 'unknown_services_warning')}")
         for service in unknown_services:
-            print(f"  • {service}")
+            suggestions = validation["suggestions"][service]
+            hint = f" ({get_message(language, 'did_you_mean', services=', '.join(suggestions))})" if suggestions else ""
+            print(f"  • {service}{hint}")
         
         while True:
             print(f"\n{get_message(language, 'continue_with_unknown')}", end="", flush=True)
@@ -426,7 +491,8 @@ def main():
                     print(get_message(game.language, "service_example"))
                     print(f"{get_message(game.language, 'service_selection')}", end="", flush=True)
                     
-                    selected_input = input().strip()
+                    with service_completion(catalog_for(AWS_SERVICES)):
+                        selected_input = input().strip()
                     if not selected_input:
                         print(get_message(game.language, "no_services_selected"))
                         continue
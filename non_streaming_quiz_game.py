@@ -4,10 +4,19 @@ Non-streaming version of multilingual quiz game
 ストリーミングを使用しない多言語クイズゲーム
 """
 
+import asyncio
+import functools
 import json
+import weakref
 import boto3
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from bedrock_models import DEFAULT_MODEL_IDS, ModelRouter
 from languages import get_supported_languages, get_language_config, get_message, get_scenarios
+from pricing import estimate_cost
+from scoring import build_language_kernels
+from service_catalog import catalog_for, service_completion
+from tool_cache import LRUCache, memoize, cost_key, evaluation_key
 
 AWS_SERVICES = {
     "Compute": ["EC2", "Lambda", "ECS", "EKS", "Fargate", "Batch"],
@@ -21,14 +30,24 @@ AWS_SERVICES = {
     "Management": ["CloudFormation", "Systems Manager", "Auto Scaling"]
 }
 
+SCORING_KERNELS = build_language_kernels(AWS_SERVICES)
+
+# Memoized tool results, cleared when scenario or pricing data is reloaded
+COST_CACHE = LRUCache("non_streaming_quiz_game.check_architecture_cost", maxsize=4096, depends_on=("pricing",))
+EVALUATION_CACHE = LRUCache("non_streaming_quiz_game.evaluate_architecture", maxsize=4096, depends_on=("scenarios", "rubric"))
+
 class NonStreamingQuizGame:
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 8):
         self.score = 0
         self.level = 1
         self.current_scenario = None
         self.player_name = ""
         self.language = "en"
         self.bedrock_client = None
+        self.model_router = ModelRouter(DEFAULT_MODEL_IDS)
+        self.max_concurrency = max_concurrency  # Bedrock calls in flight at once (boto3 clients are thread-safe)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limits = weakref.WeakKeyDictionary()
         
     def select_language(self):
         """Language selection interface"""
@@ -71,47 +90,123 @@ class NonStreamingQuizGame:
             self.bedrock_client = None
         
     def call_claude(self, message: str) -> str:
-        """Call Claude model directly using Bedrock client"""
+        """
+        Call Claude model directly using Bedrock client (blocks until the answer arrives)
+        
+        Blocking inside a running event loop would stall every other task on
+        it, so there this raises RuntimeError; await call_claude_async instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.call_claude_async(message))
+        raise RuntimeError("call_claude cannot block a running event loop; await call_claude_async instead")
+    
+    async def call_claude_async(self, message: str) -> str:
+        """
+        Call Claude without blocking the event loop
+        
+        invoke_model runs on a bounded thread pool and at most max_concurrency
+        calls per event loop are in flight; the rest wait their turn. A call
+        whose task is cancelled keeps running on its thread, so it holds its
+        slot until it finishes and its outcome is still recorded.
+        """
         if not self.bedrock_client:
             return "Sorry, AI assistant is not available. Please check your AWS configuration."
         
         try:
-            # Try Claude 3.7 Sonnet first
-            model_ids = [
-                "us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-                "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-                "us.anthropic.claude-3-5-sonnet-20240620-v1:0"
-            ]
-            
-            for model_id in model_ids:
-                try:
-                    body = {
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 2000,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": message
-                            }
-                        ]
-                    }
-                    
-                    response = self.bedrock_client.invoke_model(
-                        modelId=model_id,
-                        body=json.dumps(body)
-                    )
-                    
-                    response_body = json.loads(response['body'].read())
-                    return response_body['content'][0]['text']
-                    
-                except Exception as e:
-                    print(f"❌ Failed with {model_id}: {str(e)}")
-                    continue
+            body = self._request_body(message)
+            loop = asyncio.get_running_loop()
+            limit = self._concurrency_limit(loop)
+            await limit.acquire()
+            holding = True
+            try:
+                # Healthy models in order of preference, starting from the last one that answered
+                model_ids = self.model_router.candidates()
+                if not model_ids:
+                    return "Sorry, AI assistant is temporarily unavailable. All models are failing; please try again later."
+                
+                for i, model_id in enumerate(model_ids):
+                    future = loop.run_in_executor(self._bedrock_executor(), self._invoke_model, model_id, body)
+                    try:
+                        text = await asyncio.shield(future)
+                        self.model_router.record_success(model_id)
+                        self.model_router.release(model_ids[i + 1:])
+                        return text
+                        
+                    except asyncio.CancelledError:
+                        self.model_router.release(model_ids[i + 1:])
+                        # The slot passes to the abandoned call and is freed when its thread finishes
+                        holding = False
+                        future.add_done_callback(functools.partial(self._abandoned_call_done, limit, model_id))
+                        raise
+                    except Exception as e:
+                        self.model_router.record_failure(model_id, e)
+                        print(f"❌ Failed with {model_id}: {str(e)}")
+                        continue
+            finally:
+                if holding:
+                    limit.release()
             
             return "Sorry, unable to connect to AI assistant. All models failed."
             
         except Exception as e:
             return f"Error calling AI assistant: {str(e)}"
+    
+    async def call_claude_many(self, messages: List[str]) -> List[str]:
+        """Answers to several prompts sent concurrently, in the order of messages"""
+        return list(await asyncio.gather(*(self.call_claude_async(message) for message in messages)))
+    
+    def close(self, wait: bool = True):
+        """Shut down the Bedrock worker threads; a later call starts a new pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+    
+    @staticmethod
+    def _request_body(message: str) -> str:
+        return json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 2000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": message
+                }
+            ]
+        })
+    
+    def _invoke_model(self, model_id: str, body: str) -> str:
+        """Blocking Bedrock call, run on the worker threads"""
+        response = self.bedrock_client.invoke_model(modelId=model_id, body=body)
+        response_body = json.loads(response['body'].read())
+        return response_body['content'][0]['text']
+    
+    def _bedrock_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="bedrock")
+        return self._executor
+    
+    def _abandoned_call_done(self, limit: asyncio.Semaphore, model_id: str, future: asyncio.Future):
+        """Record the outcome of a call whose caller was cancelled, then free its slot"""
+        limit.release()
+        if future.cancelled():
+            self.model_router.release([model_id])
+        elif future.exception() is not None:
+            self.model_router.record_failure(model_id, future.exception())
+        else:
+            self.model_router.record_success(model_id)
+    
+    def _concurrency_limit(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop, and call_claude runs each call on a fresh one
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.max_concurrency)
+        return limit
+    
+    def model_status(self) -> Dict[str, Any]:
+        """Circuit breaker state of each model, for monitoring"""
+        return self.model_router.state()
         
     def start_game(self, player_name: str):
         """Start the game with player name"""
@@ -121,89 +216,23 @@ class NonStreamingQuizGame:
         print(get_message(self.language, "welcome_message", player_name=player_name))
         print("=" * 60)
 
-def check_architecture_cost(services: List[str], region: str = "us-east-1") -> Dict[str, Any]:
+@memoize(COST_CACHE, cost_key)
+def check_architecture_cost(services: List[str], region: str = "us-east-1",
+                            instance_types: Optional[Dict[str, str]] = None,
+                            usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """Calculate estimated monthly cost for selected AWS services configuration"""
-    service_costs = {
-        "EC2": {"t3.medium": 30.37, "m5.large": 70.08, "c5.xlarge": 156.82},
-        "RDS": {"db.t3.micro": 16.79, "db.t3.small": 33.58, "db.m5.large": 140.16},
-        "ALB": 22.27,
-        "S3": 23.00,
-        "CloudFront": 85.00,
-        "Lambda": 20.00,
-        "DynamoDB": 25.00,
-        "API Gateway": 35.00,
-        "EKS": 72.00,
-        "Kinesis": 15.00,
-        "Redshift": 180.00,
-        "SageMaker": 50.00
-    }
-    
-    total_cost = 0
-    cost_breakdown = {}
-    
-    for service in services:
-        if service in service_costs:
-            if isinstance(service_costs[service], dict):
-                cost = list(service_costs[service].values())[0]
-            else:
-                cost = service_costs[service]
-            cost_breakdown[service] = cost
-            total_cost += cost
-        else:
-            cost_breakdown[service] = 0
-    
-    return {
-        "total_monthly_cost": round(total_cost, 2),
-        "cost_breakdown": cost_breakdown,
-        "region": region,
-        "currency": "USD"
-    }
+    return estimate_cost(services, region, instance_types, usage)
 
+@memoize(EVALUATION_CACHE, evaluation_key)
 def evaluate_architecture(selected_services: List[str], scenario_id: int, language: str = "en") -> Dict[str, Any]:
     """Evaluate selected architecture and calculate score"""
-    scenarios = get_scenarios(language)
-    scenario = next((s for s in scenarios if s["id"] == scenario_id), None)
-    if not scenario:
+    kernel = SCORING_KERNELS.get(language, SCORING_KERNELS["en"])
+    evaluation = kernel.evaluate(selected_services, scenario_id)
+    if evaluation is None:
         return {"error": "Invalid scenario ID"}
     
-    correct_services = set(scenario["correct_services"])
-    selected_services_set = set(selected_services)
-    
-    correct_matches = correct_services.intersection(selected_services_set)
-    incorrect_services = selected_services_set - correct_services
-    missed_services = correct_services - selected_services_set
-    
-    base_score = scenario["max_score"]
-    correct_ratio = len(correct_matches) / len(correct_services)
-    penalty = len(incorrect_services) * 10
-    
-    final_score = max(0, int(base_score * correct_ratio - penalty))
-    
-    if correct_ratio >= 0.9:
-        grade = "S"
-        comment = get_message(language, "grade_s_comment")
-    elif correct_ratio >= 0.7:
-        grade = "A"
-        comment = get_message(language, "grade_a_comment")
-    elif correct_ratio >= 0.5:
-        grade = "B"
-        comment = get_message(language, "grade_b_comment")
-    elif correct_ratio >= 0.3:
-        grade = "C"
-        comment = get_message(language, "grade_c_comment")
-    else:
-        grade = "D"
-        comment = get_message(language, "grade_d_comment")
-    
-    return {
-        "score": final_score,
-        "grade": grade,
-        "comment": comment,
-        "correct_services": list(correct_matches),
-        "incorrect_services": list(incorrect_services),
-        "missed_services": list(missed_services),
-        "correct_ratio": round(correct_ratio * 100, 1)
-    }
+    evaluation["comment"] = get_message(language, f"grade_{evaluation['grade'].lower()}_comment")
+    return evaluation
 
 def get_player_name(language):
     """Get player name as required input"""
@@ -217,21 +246,15 @@ def get_player_name(language):
 
 def validate_service_input(selected_input, available_services, language):
     """Validate user input and confirm with Yes/No if there are services not in suggestions"""
-    all_services = []
-    for services in available_services.values():
-        all_services.extend(services)
-    
-    selected_services = [s.strip() for s in selected_input.split(",") if s.strip()]
-    unknown_services = []
-    
-    for service in selected_services:
-        if service not in all_services:
-            unknown_services.append(service)
+    validation = catalog_for(available_services).validate(selected_input)
+    selected_services, unknown_services = validation["services"], validation["unknown"]
     
     if unknown_services:
         print(f"\n{get_message(language, 'unknown_services_warning')}")
         for service in unknown_services:
-            print(f"  • {service}")
+            suggestions = validation["suggestions"][service]
+            hint = f" ({get_message(language, 'did_you_mean', services=', '.join(suggestions))})" if suggestions else ""
+            print(f"  • {service}{hint}")
         
         while True:
             print(f"\n{get_message(language, 'continue_with_unknown')}", end="", flush=True)
@@ -328,7 +351,8 @@ Please recommend the most suitable AWS services for this scenario and briefly ex
                     print(get_message(game.language, "service_example"))
                     print(f"{get_message(game.language, 'service_selection')}", end="", flush=True)
                     
-                    selected_input = input().strip()
+                    with service_completion(catalog_for(AWS_SERVICES)):
+                        selected_input = input().strip()
                     if not selected_input:
                         print(get_message(game.language, "no_services_selected"))
                         continue
@@ -405,6 +429,7 @@ Please provide constructive feedback and improvement suggestions for this select
             print(f"\n\n{get_message(game.language, 'game_interrupted')}")
             break
     
+    game.close(wait=False)
     print(f"\n{get_message(game.language, 'game_end', player_name=player_name)}")
 
 if __name__ == "__main__":
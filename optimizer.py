@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Cost-versus-score and purchase-commitment optimization over the service catalog
+サービスカタログ上のコスト対スコア最適化と購入オプション最適化
+"""
+
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pricing import service_cost
+from scoring import ScoringKernel
+
+
+def pareto_frontier(kernel: ScoringKernel, scenario_id: int,
+                    cost_of: Callable[[str], float] = service_cost) -> Optional[List[Dict[str, Any]]]:
+    """
+    Pareto frontier of (monthly cost, score) for a scenario
+
+    The whole catalog is the search space, but a submission is scored against
+    its best answer key and any service outside that key only adds cost and a
+    penalty, so every optimal subset lies inside one accepted answer key.
+    Each key is searched with a 0/1 dynamic program over the number of matched
+    services, which is what the score depends on, and the candidates from all
+    keys are merged.
+
+    Returns:
+        Frontier points ordered by cost, or None for an unknown scenario
+    """
+    key_masks = kernel.key_masks.get(scenario_id)
+    if key_masks is None:
+        return None
+
+    candidates = []
+    for key_mask in key_masks:
+        key_services = kernel.universe.decode(key_mask)
+        # best[m] = (cheapest cost of picking m answer-key services, the services picked)
+        best = [(0.0, [])] + [(float("inf"), [])] * len(key_services)
+        for service in key_services:
+            cost = cost_of(service)
+            for m in range(len(key_services), 0, -1):
+                candidate = best[m - 1][0] + cost
+                if candidate < best[m][0]:
+                    best[m] = (candidate, best[m - 1][1] + [service])
+        candidates.extend(best)
+
+    points = []
+    for cost, services in candidates:
+        score, grade, correct_ratio = kernel.score(services, scenario_id)
+        points.append({
+            "services": services,
+            "monthly_cost": round(cost, 2),
+            "score": score,
+            "grade": grade,
+            "correct_ratio": round(correct_ratio * 100, 1)
+        })
+
+    # Sorted by cost (higher score first on ties), a point survives only if it beats every cheaper score
+    frontier = []
+    for point in sorted(points, key=lambda p: (p["monthly_cost"], -p["score"])):
+        if not frontier or point["score"] > frontier[-1]["score"]:
+            frontier.append(point)
+    return frontier
+
+
+def cheapest_for_grade(kernel: ScoringKernel, scenario_id: int, grade: str = "S",
+                       cost_of: Callable[[str], float] = service_cost) -> Optional[Dict[str, Any]]:
+    """Cheapest architecture that earns at least the given grade (any case), or None if none does or the grade is unknown"""
+    frontier = pareto_frontier(kernel, scenario_id, cost_of)
+    if not frontier:
+        return None
+    ranking = kernel.rubric_table(scenario_id).ranking
+    grade = str(grade).strip().upper()
+    if grade not in ranking:
+        return None
+    acceptable = set(ranking[:ranking.index(grade) + 1])
+    return next((point for point in frontier if point["grade"] in acceptable), None)
+
+
+EXACT_COVER_LIMIT = 12  # solve exactly up to this many requirements, greedy beyond
+
+
+def _greedy_cover(requirements: List[str], covers: Dict[str, frozenset], cents: Dict[str, int]) -> List[str]:
+    """Classic greedy weighted set cover: repeatedly pick the lowest cost per newly covered requirement"""
+    uncovered = set(requirements)
+    chosen = []
+    while uncovered:
+        best, best_ratio = None, None
+        for service, covered in covers.items():
+            gain = len(covered & uncovered)
+            if not gain or service in chosen:
+                continue
+            ratio = (cents[service] / gain, -gain, service)
+            if best_ratio is None or ratio < best_ratio:
+                best, best_ratio = service, ratio
+        if best is None:
+            break
+        chosen.append(best)
+        uncovered -= covers[best]
+    return chosen
+
+
+def _exact_cover(requirements: List[str], covers: Dict[str, frozenset], cents: Dict[str, int],
+                 upper_bound: List[str]) -> List[str]:
+    """Branch and bound on the uncovered requirement with the fewest candidate services"""
+    candidates = {req: sorted(s for s, covered in covers.items() if req in covered) for req in requirements}
+
+    # Costs compare as (cents, number of services) so cheaper wins and fewer services break ties
+    best = [list(upper_bound), (sum(cents[s] for s in upper_bound), len(upper_bound))]
+
+    def search(uncovered: frozenset, chosen: List[str], cost: tuple):
+        if cost >= best[1]:
+            return
+        if not uncovered:
+            best[0], best[1] = list(chosen), cost
+            return
+        req = min(uncovered, key=lambda r: (len(candidates[r]), r))
+        for service in candidates[req]:
+            chosen.append(service)
+            search(uncovered - covers[service], chosen, (cost[0] + cents[service], cost[1] + 1))
+            chosen.pop()
+
+    search(frozenset(r for r in requirements if candidates[r]), [], (0, 0))
+    return best[0]
+
+
+def min_cost_cover(requirements: List[str], requirement_mapping: Dict[str, List[str]],
+                   cost_of: Callable[[str], float] = service_cost) -> Dict[str, Any]:
+    """
+    Cheapest set of services covering every requirement (weighted set cover)
+
+    Weights come from the price table, with fewer services breaking ties, so
+    unpriced services are preferred but not piled on. Up to EXACT_COVER_LIMIT
+    requirements are solved exactly by branch and bound seeded with the greedy
+    answer; larger instances use the greedy approximation.
+
+    Returns:
+        Chosen services, their total monthly cost, which chosen services cover
+        each requirement, requirements no service covers, and the method used
+    """
+    requirements = list(dict.fromkeys(requirements))
+    covers: Dict[str, set] = {}
+    for req in requirements:
+        for service in requirement_mapping.get(req, []):
+            covers.setdefault(service, set()).add(req)
+    covers = {service: frozenset(reqs) for service, reqs in covers.items()}
+
+    cents = {service: int(round(cost_of(service) * 100)) for service in covers}
+
+    chosen = _greedy_cover(requirements, covers, cents)
+    method = "greedy"
+    if len(requirements) <= EXACT_COVER_LIMIT:
+        chosen = _exact_cover(requirements, covers, cents, chosen)
+        method = "exact"
+
+    coverage = {req: [s for s in chosen if req in covers[s]] for req in requirements}
+    return {
+        "services": chosen,
+        "total_monthly_cost": round(sum(cents[s] for s in chosen) / 100, 2),
+        "coverage": {req: services for req, services in coverage.items() if services},
+        "uncovered": [req for req, services in coverage.items() if not services],
+        "method": method
+    }
+
+
+# Discount off on-demand for no-upfront commitments (simplified)
+RESERVED_DISCOUNTS: Dict[str, Dict[str, float]] = {
+    "1yr": {"EC2": 0.40, "RDS": 0.42, "Redshift": 0.45, "ElastiCache": 0.38},
+    "3yr": {"EC2": 0.60, "RDS": 0.62, "Redshift": 0.70, "ElastiCache": 0.58}
+}
+# Compute Savings Plans share one hourly commitment across these services
+SAVINGS_PLAN_DISCOUNTS: Dict[str, Dict[str, float]] = {
+    "1yr": {"EC2": 0.34, "Fargate": 0.30, "Lambda": 0.12},
+    "3yr": {"EC2": 0.54, "Fargate": 0.52, "Lambda": 0.17}
+}
+HOURS_PER_MONTH = 730
+SNAP_TOLERANCE = 1e-4  # reservation coverage is reported to 4 decimals
+
+
+class _CommitmentModel:
+    """
+    Expected monthly cost of reserving r[s] units of each RI-eligible service plus
+    a Savings Plan commitment of h dollars per time slot
+
+    Demand is measured in units of the service's cost breakdown (1.0 = the
+    breakdown cost rate) for each of T equally long slots of the month.
+    Reservations are used first, the Savings Plan then covers the remaining
+    spend at its discounted rate (highest discount first, as AWS applies it)
+    and whatever is left is paid on-demand.
+    """
+
+    def __init__(self, costs: np.ndarray, demand: np.ndarray, ri: np.ndarray, sp: np.ndarray):
+        self.costs, self.demand, self.ri, self.sp = costs, demand, ri, sp
+        self.slot_cost = costs / demand.shape[0]  # on-demand cost of one unit for one slot
+        self.sp_order = [s for s in np.argsort(-sp, kind="stable") if sp[s] > 0]
+
+    def evaluate(self, r: np.ndarray, h: float) -> Tuple[float, np.ndarray, np.ndarray]:
+        """(total cost, Savings Plan spend used per slot, on-demand cost per service)"""
+        residual = np.maximum(self.demand - r, 0)
+        on_demand = residual * self.slot_cost
+        remaining = np.full(self.demand.shape[0], h)
+        for s in self.sp_order:
+            spend = on_demand[:, s] * (1 - self.sp[s])
+            covered = np.minimum(spend, remaining)
+            remaining -= covered
+            on_demand[:, s] -= covered / (1 - self.sp[s])
+        reserved = float(np.sum(r * self.costs * (1 - self.ri)))
+        used = h - remaining
+        return reserved + h * self.demand.shape[0] + float(on_demand.sum()), used, on_demand.sum(axis=0)
+
+    def best_plan(self, r: np.ndarray) -> float:
+        """
+        Optimal Savings Plan commitment for fixed reservations
+
+        In each slot the commitment covers the eligible spend segment by
+        segment, each on-demand dollar saved being worth 1 / (1 - discount)
+        commitment dollars. The cost falls while the summed marginal saving
+        over all slots exceeds the T dollars another unit of commitment costs.
+        """
+        slots = self.demand.shape[0]
+        if not self.sp_order:
+            return 0.0
+        residual = np.maximum(self.demand - r, 0) * self.slot_cost
+        spend = np.array([residual[:, s] * (1 - self.sp[s]) for s in self.sp_order])
+        ends = np.cumsum(spend, axis=0)
+        worth = np.repeat(1 / (1 - self.sp[self.sp_order]), slots)
+        starts = np.vstack((np.zeros((1, slots)), ends[:-1]))
+        positions = np.concatenate((starts.ravel(), ends.ravel()))
+        deltas = np.concatenate((worth, -worth))
+        order = np.argsort(positions, kind="stable")
+        positions, saving = positions[order], np.cumsum(deltas[order])
+        # Marginal saving just above each distinct position
+        last = np.append(positions[1:] != positions[:-1], True)
+        positions, saving = positions[last], saving[last]
+        stop = np.flatnonzero(saving <= slots)
+        return float(positions[stop[0]]) if len(stop) else float(positions[-1])
+
+    def plan_cost(self, r: np.ndarray) -> Tuple[float, float]:
+        """(total cost, commitment) with the best Savings Plan for these reservations"""
+        h = self.best_plan(r)
+        return self.evaluate(r, h)[0], h
+
+
+def _golden_section(f: Callable[[float], float], low: float, high: float, tolerance: float = 1e-6) -> float:
+    """Minimizer of a convex function on [low, high]"""
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = low, high
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = f(c), f(d)
+    while b - a > tolerance:
+        if fc <= fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = f(d)
+    # The ends are candidates too, a piecewise linear minimum often sits on one
+    return min((low, high, (a + b) / 2), key=f)
+
+
+def optimize_commitments(cost_breakdown: Dict[str, float], usage_profile: Optional[Dict[str, Sequence[float]]] = None,
+                         term: str = "1yr", max_rounds: int = 20) -> Dict[str, Any]:
+    """
+    Cheapest mix of on-demand, Reserved Instances and a Compute Savings Plan
+
+    Args:
+        cost_breakdown: Per-service monthly cost, as returned by check_architecture_cost
+        usage_profile: Demand per time slot for each service, relative to its
+            breakdown cost (e.g. 24 hourly values; 1.0 = the breakdown rate).
+            Services without a profile run steadily at 1.0.
+        term: Commitment term, "1yr" or "3yr"
+        max_rounds: Limit on rounds over services eligible for both commitments
+
+    The expected cost is convex and piecewise linear in the commitments.
+    Reservations for services the Savings Plan does not cover are independent
+    and solved exactly over their demand levels; the plan commitment is solved
+    exactly for given reservations (_CommitmentModel.best_plan). Reservations
+    for services eligible for both (EC2 with the default tables) are found by
+    golden-section search, which is exact up to the search tolerance for one
+    such service and alternates between them when there are several.
+
+    Returns:
+        Reservation coverage per service, the hourly Savings Plan commitment,
+        remaining on-demand cost and the expected monthly saving
+    """
+    if term not in RESERVED_DISCOUNTS:
+        return {"error": f"Unknown term: {term}", "terms": list(RESERVED_DISCOUNTS)}
+    usage_profile = usage_profile or {}
+    unknown = [service for service in usage_profile if service not in cost_breakdown]
+    if unknown:
+        return {"error": f"Usage profile for a service without cost: {unknown[0]}"}
+    lengths = {len(profile) for profile in usage_profile.values()}
+    if len(lengths) > 1 or 0 in lengths:
+        return {"error": "Usage profiles must be non-empty and equally long"}
+    if any(value < 0 for profile in usage_profile.values() for value in profile):
+        return {"error": "Usage must not be negative"}
+    if any(cost < 0 for cost in cost_breakdown.values()):
+        return {"error": "Costs must not be negative"}
+
+    services = list(cost_breakdown)
+    slots = lengths.pop() if lengths else 1
+    costs = np.array([cost_breakdown[s] for s in services], dtype=np.float64)
+    demand = np.ones((slots, len(services)))
+    for col, service in enumerate(services):
+        if service in usage_profile:
+            demand[:, col] = usage_profile[service]
+    ri = np.array([RESERVED_DISCOUNTS[term].get(s, 0.0) for s in services])
+    sp = np.array([SAVINGS_PLAN_DISCOUNTS[term].get(s, 0.0) for s in services])
+    model = _CommitmentModel(costs, demand, ri, sp)
+
+    r = np.zeros(len(services))
+    reservable = (ri > 0) & (costs > 0)
+    for col in np.flatnonzero(reservable & (sp == 0)):
+        def cost_at(level, col=col):
+            trial = r.copy()
+            trial[col] = level
+            return model.evaluate(trial, 0.0)[0]
+        r[col] = min(np.unique(np.concatenate(([0.0], demand[:, col]))), key=cost_at)
+
+    coupled = np.flatnonzero(reservable & (sp > 0))
+    best = model.plan_cost(r)[0]
+    for _ in range(max_rounds if len(coupled) > 1 else 1):
+        improved = False
+        for col in coupled:
+            def cost_at(level, col=col):
+                trial = r.copy()
+                trial[col] = level
+                return model.plan_cost(trial)[0]
+            level = _golden_section(cost_at, 0.0, float(demand[:, col].max()))
+            # The search stops within its tolerance of a kink; land on the demand level it was closing in on
+            levels = np.concatenate(([0.0], demand[:, col]))
+            nearest = float(levels[np.argmin(np.abs(levels - level))])
+            if abs(nearest - level) <= SNAP_TOLERANCE and cost_at(nearest) <= cost_at(level) + 1e-9:
+                level = nearest
+            cost = cost_at(level)
+            if cost < best - 1e-9:
+                r[col], best, improved = level, cost, True
+        if not improved:
+            break
+
+    h = model.best_plan(r)
+    total, used, on_demand = model.evaluate(r, h)
+    baseline = float(np.sum(demand * costs) / slots)
+    hours_per_slot = HOURS_PER_MONTH / slots
+    return {
+        "term": term,
+        "on_demand_monthly_cost": round(baseline, 2),
+        "optimized_monthly_cost": round(total, 2),
+        "monthly_savings": round(baseline - total, 2),
+        "savings_percent": round((baseline - total) / baseline * 100, 1) if baseline else 0.0,
+        "reserved_instances": {
+            service: {"coverage": round(float(r[col]), 4),
+                      "monthly_cost": round(float(r[col] * costs[col] * (1 - ri[col])), 2),
+                      "discount": float(ri[col])}
+            for col, service in enumerate(services) if r[col] > 0
+        },
+        "savings_plan": {
+            "hourly_commitment": round(h / hours_per_slot, 4),
+            "monthly_commitment": round(h * slots, 2),
+            "utilization": round(float(used.sum() / (h * slots)) * 100, 1) if h else 0.0
+        },
+        "on_demand": {service: round(float(on_demand[col]), 2) for col, service in enumerate(services)},
+        "currency": "USD"
+    }
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline ingestion of AWS Price List bulk offer files into a local SQLite price DB
+AWS Price List の一括オファーファイルをローカルのSQLite料金DBに取り込むツール
+
+Usage:
+    python price_ingest.py AmazonEC2.json AmazonRDS.csv -o prices.db
+
+Offer files are streamed (JSON entry by entry, CSV row by row), so multi-GB
+files never have to fit in memory. Only SKUs of services the quiz knows
+about are kept. Load the result with pricing.load_pricing("prices.db").
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Any, Iterator, Optional, Set, TextIO, Tuple
+
+HOURS_PER_MONTH = 730
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters read per JSON refill
+BATCH_SIZE = 5000  # rows per executemany
+
+# Offer code -> (quiz service name, product families worth keeping or None for all)
+OFFER_SERVICES: Dict[str, Tuple[str, Optional[Set[str]]]] = {
+    "AmazonEC2": ("EC2", {"Compute Instance"}),
+    "AmazonRDS": ("RDS", {"Database Instance"}),
+    "AWSELB": ("ALB", {"Load Balancer-Application"}),
+    "AmazonS3": ("S3", {"Storage"}),
+    "AmazonCloudFront": ("CloudFront", {"Data Transfer"}),
+    "AWSLambda": ("Lambda", {"Serverless"}),
+    "AmazonDynamoDB": ("DynamoDB", None),
+    "AmazonApiGateway": ("API Gateway", None),
+    "AmazonEKS": ("EKS", None),
+    "AmazonECS": ("ECS", None),
+    "AmazonKinesis": ("Kinesis", None),
+    "AmazonRedshift": ("Redshift", {"Compute Instance"}),
+    "AmazonSageMaker": ("SageMaker", None),
+    "AmazonElastiCache": ("ElastiCache", {"Cache Instance"}),
+    "AmazonDocDB": ("DocumentDB", {"Database Instance"}),
+    "AmazonEFS": ("EFS", None),
+    "AmazonEMR": ("EMR", None),
+    "AWSGlue": ("Glue", None),
+    "AmazonAthena": ("Athena", None),
+    "AmazonCloudWatch": ("CloudWatch", None),
+    "AmazonRoute53": ("Route 53", None),
+    "awswaf": ("WAF", None),
+    "AWSSecretsManager": ("Secrets Manager", None)
+}
+
+# Normalized attribute name -> accepted values; products without the attribute pass
+PRODUCT_FILTERS: Dict[str, Set[str]] = {
+    "operatingsystem": {"Linux"},
+    "tenancy": {"Shared"},
+    "preinstalledsw": {"NA"},
+    "capacitystatus": {"Used"},
+    "licensemodel": {"No license required", "No License required"},
+    "deploymentoption": {"Single-AZ"},
+    "databaseengine": {"MySQL", "Redis"}
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    service TEXT NOT NULL,
+    instance_type TEXT NOT NULL,
+    region TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    price_per_unit REAL NOT NULL,
+    monthly_price REAL,
+    sku TEXT NOT NULL,
+    description TEXT
+)
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS idx_prices_lookup ON prices (service, region, instance_type)"
+
+_WHITESPACE = re.compile(r"\s*")
+# A bracket, or a string up to its closing quote (group 1 is empty while the string runs past the buffer)
+_STRUCTURE = re.compile(r'[{}\[\]]|"[^"\\]*(?:\\.[^"\\]*)*(")?')
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(")?')
+_SCALAR_END = re.compile(r"[\s,:\]}]")
+
+
+def _norm(name: str) -> str:
+    """Normalize JSON (operatingSystem) and CSV (Operating System) attribute names alike"""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class JsonStream:
+    """
+    Incremental reader over one large JSON document
+
+    entries() walks the keys of an object without materializing it; the
+    caller consumes each value with value(), skip() or a nested entries() call.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.chars_read = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.chars_read - len(self.buffer) + self.pos}")
+        self.pos += 1
+
+    def _scan(self, keep: bool) -> int:
+        """
+        Buffer offset just past the value at self.pos, reading more input as needed
+
+        Brackets and string state are tracked incrementally, so every character
+        is looked at once however the value is split across chunks. With keep
+        the value stays buffered from self.pos for decoding; without it the
+        scanned part is dropped at each refill.
+        """
+        i = self.pos
+        depth = 0
+        in_string = False
+        scalar = self.buffer[i] not in '{["'
+        while True:
+            if scalar:
+                match = _SCALAR_END.search(self.buffer, i)
+                if match is not None:
+                    return match.start()
+                i = len(self.buffer)
+            elif in_string:
+                match = _STRING_REST.match(self.buffer, i)
+                i = match.end()
+                if match.group(1):
+                    in_string = False
+                    if depth == 0:
+                        return i
+                    continue
+            else:
+                match = _STRUCTURE.search(self.buffer, i)
+                if match is not None:
+                    i = match.end()
+                    token = match.group()
+                    if token[0] == '"':
+                        in_string = not match.group(1)
+                    elif token in "{[":
+                        depth += 1
+                    else:
+                        depth -= 1
+                    if depth == 0 and not in_string:
+                        return i
+                    continue
+                i = len(self.buffer)
+            if not keep:
+                self.pos = i
+            start = self.pos
+            if not self._fill():
+                if scalar:
+                    return len(self.buffer)
+                raise ValueError(f"Unexpected end of input at offset {self.chars_read}")
+            i -= start
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        if not self.peek():
+            raise ValueError(f"Unexpected end of input at offset {self.chars_read}")
+        end = self._scan(keep=True)
+        value, _ = self._decoder.raw_decode(self.buffer, self.pos)
+        self.pos = end
+        return value
+
+    def skip(self):
+        """Step over the next JSON value without decoding it, holding no more than a chunk in memory"""
+        if not self.peek():
+            raise ValueError(f"Unexpected end of input at offset {self.chars_read}")
+        self.pos = self._scan(keep=False)
+
+    def entries(self) -> Iterator[str]:
+        """Yield each key of the object at the current position"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed object near key {key!r}")
+
+
+def keep_product(offer_code: str, product_family: str, attributes: Dict[str, str]) -> bool:
+    """Whether a product SKU is relevant to the quiz services"""
+    service = OFFER_SERVICES.get(offer_code)
+    if service is None:
+        return False
+    families = service[1]
+    if families is not None and product_family not in families:
+        return False
+    for name, value in attributes.items():
+        accepted = PRODUCT_FILTERS.get(_norm(name))
+        if accepted is not None and value not in accepted:
+            return False
+    return True
+
+
+def product_key(offer_code: str, attributes: Dict[str, str]) -> Optional[Tuple[str, str, str]]:
+    """(service, instance type, region) of a kept product, or None when it has no region"""
+    normalized = {_norm(k): v for k, v in attributes.items()}
+    region = normalized.get("regioncode")
+    if not region:
+        return None
+    return OFFER_SERVICES[offer_code][0], normalized.get("instancetype", ""), region
+
+
+def price_row(key: Tuple[str, str, str], sku: str, unit: str, price_per_unit: float, description: str = "") -> Tuple:
+    """Build one prices row; hourly prices also get a monthly price"""
+    monthly_price = round(price_per_unit * HOURS_PER_MONTH, 4) if unit == "Hrs" else None
+    return key + (unit, price_per_unit, monthly_price, sku, description)
+
+
+def read_json_offer(stream: TextIO, stats: Dict[str, int], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple]:
+    """
+    Stream OnDemand price rows from a JSON offer file
+
+    AWS offer files list "products" before "terms", so relevant SKUs are
+    known by the time their terms arrive.
+    """
+    reader = JsonStream(stream, chunk_size)
+    offer_code = ""
+    # Only the compact key of each kept SKU is held until its terms arrive
+    products: Dict[str, Tuple[str, str, str]] = {}
+    try:
+        for key in reader.entries():
+            if key == "offerCode":
+                offer_code = reader.value()
+            elif key == "products":
+                for sku in reader.entries():
+                    product = reader.value()
+                    stats["records"] += 1
+                    attributes = product.get("attributes", {})
+                    code = offer_code or attributes.get("servicecode", "")
+                    if keep_product(code, product.get("productFamily", ""), attributes):
+                        key_fields = product_key(code, attributes)
+                        if key_fields is not None:
+                            products[sku] = key_fields
+            elif key == "terms":
+                for term_type in reader.entries():
+                    if term_type != "OnDemand":
+                        reader.skip()  # Reserved terms are most of the file
+                        continue
+                    for sku in reader.entries():
+                        offers = reader.value()
+                        stats["records"] += 1
+                        key_fields = products.get(sku)
+                        if key_fields is None:
+                            continue
+                        for offer in offers.values():
+                            for dimension in offer.get("priceDimensions", {}).values():
+                                if dimension.get("beginRange", "0") != "0":
+                                    continue  # keep the first pricing tier
+                                usd = dimension.get("pricePerUnit", {}).get("USD")
+                                if usd is None:
+                                    continue
+                                yield price_row(key_fields, sku, dimension.get("unit", ""), float(usd),
+                                                dimension.get("description", ""))
+            else:
+                reader.skip()
+    finally:
+        stats["chars"] += reader.chars_read
+
+
+def read_csv_offer(stream: TextIO, stats: Dict[str, int]) -> Iterator[Tuple]:
+    """Stream OnDemand price rows from a CSV offer file (metadata lines precede the header)"""
+    reader = csv.reader(stream)
+    offer_code = ""
+    header = None
+    for row in reader:
+        if len(row) >= 2 and row[0] == "OfferCode":
+            offer_code = row[1]
+        if row and row[0] == "SKU":
+            header = row
+            break
+    if header is None:
+        return
+    columns = {_norm(name): i for i, name in enumerate(header)}
+    col = lambda name: columns.get(name)
+    sku_col, term_col, unit_col = col("sku"), col("termtype"), col("unit")
+    price_col, range_col = col("priceperunit"), col("startingrange")
+    family_col, service_col, description_col = col("productfamily"), col("servicecode"), col("pricedescription")
+    attribute_cols = [(name, i) for i, name in enumerate(header)]
+
+    for row in reader:
+        stats["records"] += 1
+        if len(row) != len(header) or row[term_col] != "OnDemand":
+            continue
+        if range_col is not None and row[range_col] not in ("", "0"):
+            continue
+        code = offer_code or (row[service_col] if service_col is not None else "")
+        attributes = {name: row[i] for name, i in attribute_cols if row[i]}
+        family = row[family_col] if family_col is not None else ""
+        if not keep_product(code, family, attributes):
+            continue
+        try:
+            price = float(row[price_col])
+        except ValueError:
+            continue
+        key_fields = product_key(code, attributes)
+        if key_fields is not None:
+            yield price_row(key_fields, row[sku_col], row[unit_col], price,
+                            row[description_col] if description_col is not None else "")
+
+
+def ingest(paths: List[str], db_path: str, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Ingest offer files into db_path, replacing its prices table
+
+    Returns:
+        Summary with rows written, records scanned, throughput and DB size
+    """
+    started = time.perf_counter()
+    stats = {"records": 0, "chars": 0}
+    connection = sqlite3.connect(db_path)
+    rows_written = 0
+    bytes_read = 0
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("DROP TABLE IF EXISTS prices")
+        connection.execute(SCHEMA)
+        for path in paths:
+            bytes_read += os.path.getsize(path)
+            reader = read_csv_offer if path.lower().endswith(".csv") else read_json_offer
+            with open(path, newline="", encoding="utf-8") as stream:
+                batch = []
+                for row in reader(stream, stats):
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        connection.executemany("INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                        rows_written += len(batch)
+                        batch = []
+                if batch:
+                    connection.executemany("INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    rows_written += len(batch)
+        # Building the index after the bulk insert is much faster than maintaining it per row
+        connection.execute(INDEX)
+        connection.commit()
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "files": len(paths),
+        "records_scanned": stats["records"],
+        "rows_written": rows_written,
+        "bytes_read": bytes_read,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(stats["records"] / elapsed) if elapsed else 0,
+        "mb_per_second": round(bytes_read / elapsed / 1e6, 2) if elapsed else 0,
+        "db_size_bytes": os.path.getsize(db_path)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest AWS Price List offer files into a local SQLite price DB")
+    parser.add_argument("offers", nargs="+", help="Offer files (.json or .csv) downloaded from the AWS Price List bulk API")
+    parser.add_argument("-o", "--output", default="prices.db", help="SQLite database to write (default: prices.db)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    summary = ingest(args.offers, args.output, args.batch_size)
+    print(f"✅ Wrote {summary['rows_written']} price rows from {summary['records_scanned']} records "
+          f"in {summary['elapsed_seconds']}s", file=sys.stderr)
+    print(f"   Throughput: {summary['records_per_second']} records/s, {summary['mb_per_second']} MB/s", file=sys.stderr)
+    print(f"   Database: {args.output} ({summary['db_size_bytes'] / 1e6:.2f} MB)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
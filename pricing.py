@@ -0,0 +1,769 @@
+# -*- coding: utf-8 -*-
+"""
+Region-aware price store behind check_architecture_cost
+check_architecture_cost が参照するリージョン別料金ストア
+"""
+
+import json
+import math
+import mmap
+import sqlite3
+import struct
+from array import array
+from typing import Dict, List, Any, Callable, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_REGION = "us-east-1"
+
+# Simplified monthly prices in USD for us-east-1 (actual Pricing API would be more complex)
+SERVICE_COSTS: Dict[str, Union[float, Dict[str, float]]] = {
+    "EC2": {"t3.medium": 30.37, "m5.large": 70.08, "c5.xlarge": 156.82},
+    "RDS": {"db.t3.micro": 16.79, "db.t3.small": 33.58, "db.m5.large": 140.16},
+    "ALB": 22.27,
+    "S3": 23.00,  # 1TB standard storage
+    "CloudFront": 85.00,  # 1TB data transfer
+    "Lambda": 20.00,  # 1M requests
+    "DynamoDB": 25.00,  # 25 RCU/WCU
+    "API Gateway": 35.00,  # 1M requests
+    "EKS": 72.00,  # cluster cost
+    "Kinesis": 15.00,  # 1 shard
+    "Redshift": 180.00,  # dc2.large
+    "SageMaker": 50.00,  # ml.t3.medium
+    "EMR": 100.00,
+    "Glue": 44.00,  # 10 DPU-hours per day
+    "QuickSight": 18.00,  # 1 author
+    "CloudWatch": 10.00,
+    "X-Ray": 5.00,
+    "WAF": 5.00,  # 1 web ACL
+    "Secrets Manager": 0.40  # 1 secret
+}
+
+# Approximate regional price level relative to us-east-1
+REGION_PRICE_FACTORS: Dict[str, float] = {
+    "us-east-1": 1.0,
+    "us-east-2": 1.0,
+    "us-west-1": 1.12,
+    "us-west-2": 1.0,
+    "ca-central-1": 1.06,
+    "eu-west-1": 1.08,
+    "eu-west-2": 1.12,
+    "eu-central-1": 1.14,
+    "ap-northeast-1": 1.22,
+    "ap-northeast-3": 1.22,
+    "ap-southeast-1": 1.18,
+    "ap-southeast-2": 1.2,
+    "ap-south-1": 1.05,
+    "sa-east-1": 1.45
+}
+
+USAGE_DIMENSIONS = ("requests", "storage_gb", "transfer_gb", "instance_hours")
+
+# Service -> (usage dimension its price scales with, quantity the listed monthly price covers)
+USAGE_REFERENCE: Dict[str, Tuple[str, float]] = {
+    "EC2": ("instance_hours", 730),
+    "RDS": ("instance_hours", 730),
+    "ALB": ("instance_hours", 730),
+    "EKS": ("instance_hours", 730),
+    "Redshift": ("instance_hours", 730),
+    "SageMaker": ("instance_hours", 730),
+    "Kinesis": ("instance_hours", 730),  # shard hours
+    "DynamoDB": ("instance_hours", 730),  # provisioned capacity hours
+    "S3": ("storage_gb", 1024),
+    "CloudFront": ("transfer_gb", 1024),
+    "Lambda": ("requests", 1000000),
+    "API Gateway": ("requests", 1000000)
+}
+
+_FILE_MAGIC = b"AWSPRICE"
+_HEADER = struct.Struct("<8sII")  # magic, header JSON length, row count
+
+
+class PricingStore:
+    """
+    Price rows (service, instance type, region, unit, price) held in compact columns
+    サービス・インスタンスタイプ・リージョン・単位ごとの料金を列形式で保持
+
+    Strings are interned into small lookup tables and the columns are typed
+    arrays, so the store can also be written to a file and mapped back with
+    mmap. A dictionary over (service, instance type, region) gives O(1) lookups.
+    Flat-priced services use "" as their instance type.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, str, float]] = ()):
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.service_col = array("H")
+        self.instance_col = array("H")
+        self.region_col = array("H")
+        self.unit_col = array("H")
+        self.prices: Any = array("d")
+        self._mmap = None
+        for service, instance_type, region, unit, price in rows:
+            self.service_col.append(self._intern(service))
+            self.instance_col.append(self._intern(instance_type))
+            self.region_col.append(self._intern(region))
+            self.unit_col.append(self._intern(unit))
+            self.prices.append(price)
+        self._build_index()
+
+    def _intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self._string_ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+    def _build_index(self):
+        strings = self.strings
+        self._index: Dict[Tuple[str, str, str], int] = {}
+        # Default instance type per service is the first one listed
+        self._default_instance: Dict[str, str] = {}
+        self._instance_types: Dict[str, List[str]] = {}
+        self.regions: List[str] = []
+        seen_regions = set()
+        for row in range(len(self.prices)):
+            service = strings[self.service_col[row]]
+            instance_type = strings[self.instance_col[row]]
+            region = strings[self.region_col[row]]
+            self._index[service, instance_type, region] = row
+            self._default_instance.setdefault(service, instance_type)
+            instance_types = self._instance_types.setdefault(service, [])
+            if instance_type not in instance_types:
+                instance_types.append(instance_type)
+            if region not in seen_regions:
+                seen_regions.add(region)
+                self.regions.append(region)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __contains__(self, service: str) -> bool:
+        return service in self._default_instance
+
+    def instance_types(self, service: str) -> List[str]:
+        """Priced instance types of a service, default first ([""] for flat-priced services)"""
+        return list(self._instance_types.get(service, []))
+
+    def default_instance(self, service: str) -> Optional[str]:
+        return self._default_instance.get(service)
+
+    def price(self, service: str, region: str = DEFAULT_REGION,
+              instance_type: Optional[str] = None) -> Optional[float]:
+        """Monthly price of one service, or None when the combination is not priced"""
+        if instance_type is None:
+            instance_type = self._default_instance.get(service)
+            if instance_type is None:
+                return None
+        row = self._index.get((service, instance_type, region))
+        return None if row is None else self.prices[row]
+
+    def unit(self, service: str, region: str = DEFAULT_REGION, instance_type: Optional[str] = None) -> Optional[str]:
+        if instance_type is None:
+            instance_type = self._default_instance.get(service, "")
+        row = self._index.get((service, instance_type, region))
+        return None if row is None else self.strings[self.unit_col[row]]
+
+    def price_matrix(self, services: Sequence[str], regions: Sequence[str],
+                     instance_types: Optional[Dict[str, str]] = None) -> np.ndarray:
+        """
+        Region x service monthly prices gathered from the price column in one indexing step
+
+        Cells for combinations that are not priced are NaN.
+        """
+        instance_types = instance_types or {}
+        rows = np.full((len(regions), len(services)), -1, dtype=np.intp)
+        for col, service in enumerate(services):
+            instance_type = instance_types.get(service, self._default_instance.get(service))
+            if instance_type is None:
+                continue
+            for row, region in enumerate(regions):
+                rows[row, col] = self._index.get((service, instance_type, region), -1)
+        prices = np.frombuffer(self.prices, dtype=np.float64) if len(self.prices) else np.zeros(1)
+        return np.where(rows >= 0, prices[np.maximum(rows, 0)], np.nan)
+
+    def rows(self) -> Iterable[Tuple[str, str, str, str, float]]:
+        """Iterate (service, instance type, region, unit, price) rows in storage order"""
+        strings = self.strings
+        for row in range(len(self.prices)):
+            yield (strings[self.service_col[row]], strings[self.instance_col[row]],
+                   strings[self.region_col[row]], strings[self.unit_col[row]], self.prices[row])
+
+    @classmethod
+    def from_sqlite(cls, path: str, base: Optional["PricingStore"] = None) -> "PricingStore":
+        """
+        Overlay monthly prices from a database written by price_ingest.py on a base store
+
+        Rows without a monthly price (per-GB, per-request units) are left to the
+        base store, which defaults to the built-in table. A region found only in
+        the database takes the base store's us-east-1 prices for whatever it
+        does not price, so no service in it is left at $0. When several hourly
+        rows share a service, instance type and region (services without
+        instance types, such as EKS, list several hourly products), the lowest
+        price is used, whatever the ingestion order.
+        """
+        base = base or cls.from_table(SERVICE_COSTS, REGION_PRICE_FACTORS)
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            ingested = connection.execute(
+                "SELECT service, instance_type, region, MIN(monthly_price) FROM prices "
+                "WHERE monthly_price > 0 GROUP BY service, instance_type, region "
+                "ORDER BY service, instance_type, region"
+            ).fetchall()
+        finally:
+            connection.close()
+        base_rows = list(base.rows())
+        known = set(base.regions)
+        new_regions = sorted({region for _, _, region, _ in ingested} - known)
+        filled = [(service, instance_type, region, unit, price)
+                  for region in new_regions
+                  for service, instance_type, base_region, unit, price in base_rows if base_region == DEFAULT_REGION]
+        # Later rows win in the index, so ingested prices replace built-in ones
+        return cls(base_rows + filled + [(service, instance_type, region, "month", round(price, 2))
+                                         for service, instance_type, region, price in ingested])
+
+    @classmethod
+    def from_table(cls, service_costs: Dict[str, Union[float, Dict[str, float]]],
+                   region_factors: Dict[str, float]) -> "PricingStore":
+        """Expand a us-east-1 price table across regions using per-region price factors"""
+        def rows():
+            for region, factor in region_factors.items():
+                for service, cost in service_costs.items():
+                    # Services with instance types like EC2, RDS
+                    instance_costs = cost if isinstance(cost, dict) else {"": cost}
+                    for instance_type, base_price in instance_costs.items():
+                        yield service, instance_type, region, "month", round(base_price * factor, 2)
+        return cls(rows())
+
+    def save(self, path: str):
+        """Write the store in the binary column format read by load()"""
+        header = json.dumps({"strings": self.strings}, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_FILE_MAGIC, len(header), len(self)))
+            f.write(header)
+            for column in (self.service_col, self.instance_col, self.region_col, self.unit_col):
+                f.write(column.tobytes())
+            f.write(b"\0" * (-f.tell() % 8))  # align the price column
+            f.write(array("d", self.prices).tobytes())
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "PricingStore":
+        """
+        Load a store written by save()
+
+        With use_mmap the price column stays a view over the mapped file
+        instead of being copied into memory.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else f.read()
+        magic, header_size, count = _HEADER.unpack_from(data, 0)
+        if magic != _FILE_MAGIC:
+            raise ValueError(f"{path} is not a pricing store file")
+        offset = _HEADER.size
+        header = json.loads(bytes(data[offset:offset + header_size]).decode("utf-8"))
+        offset += header_size
+
+        store = cls()
+        store.strings = header["strings"]
+        store._string_ids = {value: i for i, value in enumerate(store.strings)}
+        columns = []
+        for _ in range(4):
+            column = array("H")
+            column.frombytes(bytes(data[offset:offset + 2 * count]))
+            columns.append(column)
+            offset += 2 * count
+        store.service_col, store.instance_col, store.region_col, store.unit_col = columns
+        offset += -offset % 8
+        if use_mmap:
+            store._mmap = data
+            store.prices = memoryview(data)[offset:offset + 8 * count].cast("d")
+        else:
+            store.prices = array("d")
+            store.prices.frombytes(data[offset:offset + 8 * count])
+        store._build_index()
+        return store
+
+
+_pricing_store = PricingStore.from_table(SERVICE_COSTS, REGION_PRICE_FACTORS)
+_pricing_reload_callbacks: List[Callable[[], None]] = []
+
+
+def get_pricing_store() -> PricingStore:
+    """Price store currently used by every cost estimate"""
+    return _pricing_store
+
+
+def load_pricing(path: Optional[str] = None, use_mmap: bool = True) -> PricingStore:
+    """
+    Replace the active price store
+
+    Args:
+        path: A file written by PricingStore.save, a .db/.sqlite file written by
+            price_ingest.py, or None for the built-in table
+        use_mmap: Map a saved store file instead of reading it into memory
+    """
+    global _pricing_store
+    if path is None:
+        _pricing_store = PricingStore.from_table(SERVICE_COSTS, REGION_PRICE_FACTORS)
+    elif path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        _pricing_store = PricingStore.from_sqlite(path)
+    else:
+        _pricing_store = PricingStore.load(path, use_mmap)
+    for callback in _pricing_reload_callbacks:
+        callback()
+    return _pricing_store
+
+
+def on_pricing_reloaded(callback: Callable[[], None]):
+    """Register a callback invoked after load_pricing replaces the price store"""
+    _pricing_reload_callbacks.append(callback)
+
+
+def service_cost(service: str, region: str = DEFAULT_REGION, instance_type: Optional[str] = None) -> float:
+    """Monthly cost of one service; the first listed instance type is the default, unpriced services cost $0"""
+    cost = _pricing_store.price(service, region, instance_type)
+    return 0 if cost is None else cost
+
+
+def _service_price(store: PricingStore, service: str, region: str,
+                   instance_types: Dict[str, str]) -> Union[float, Dict[str, Any]]:
+    """Price of one service, or the error dict check_architecture_cost reports for it"""
+    instance_type = instance_types.get(service)
+    if instance_type is not None and not isinstance(instance_type, str):
+        return {"error": f"Instance type for {service} must be a name: {instance_type!r}"}
+    cost = store.price(service, region, instance_type)
+    if cost is None:
+        if instance_type is not None and service in store:
+            return {"error": f"Unknown instance type for {service}: {instance_type}",
+                    "instance_types": store.instance_types(service)}
+        cost = 0
+    return cost
+
+
+def _to_cents(cost: float) -> int:
+    return int(round(cost * 100))
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """value as a finite float (tool calls may pass numbers as strings), None when it is not numeric"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _usage_error(usage: Optional[Dict[str, float]]) -> Optional[Dict[str, Any]]:
+    """Error dict for unknown, non-numeric or negative usage values, None when usage is valid"""
+    for dimension, value in (usage or {}).items():
+        if dimension not in USAGE_DIMENSIONS:
+            return {"error": f"Unknown usage dimension: {dimension}", "usage_dimensions": list(USAGE_DIMENSIONS)}
+        number = _as_number(value)
+        if number is None:
+            return {"error": f"Usage must be a number: {dimension}"}
+        if number < 0:
+            return {"error": f"Usage must not be negative: {dimension}"}
+    return None
+
+
+def _usage_scale(service: str, usage: Optional[Dict[str, float]]) -> Optional[float]:
+    """Multiplier on the listed price for the given usage, or None when no usage applies"""
+    reference = USAGE_REFERENCE.get(service)
+    if reference is None or not usage or reference[0] not in usage:
+        return None
+    dimension, quantity = reference
+    return float(usage[dimension]) / quantity
+
+
+def _service_cents(store: PricingStore, service: str, region: str, instance_types: Dict[str, str],
+                   usage: Optional[Dict[str, float]]) -> Union[Tuple[float, int], Dict[str, Any]]:
+    """(breakdown cost, cents) of one service at the given usage, or an error dict"""
+    cost = _service_price(store, service, region, instance_types)
+    if isinstance(cost, dict):
+        return cost
+    scale = _usage_scale(service, usage)
+    if scale is None:
+        return cost, _to_cents(cost)
+    # Scale whole cents so cost_sweep can reproduce the same rounding on arrays
+    cents = int(round(_to_cents(cost) * scale))
+    return cents / 100, cents
+
+
+def estimate_cost(services: List[str], region: str = DEFAULT_REGION,
+                  instance_types: Optional[Dict[str, str]] = None,
+                  usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Total and per-service monthly cost in the check_architecture_cost result format
+
+    usage may set any of USAGE_DIMENSIONS; services priced by that dimension
+    scale linearly from the quantity their listed price covers
+    (USAGE_REFERENCE), the rest keep their listed price.
+    """
+    store = _pricing_store
+    if region not in store.regions:
+        return {"error": f"Unsupported region: {region}", "supported_regions": store.regions}
+    error = _usage_error(usage)
+    if error is not None:
+        return error
+    instance_types = instance_types or {}
+    # Totals are summed in integer cents so estimate_costs can reproduce them exactly
+    total_cents = 0
+    cost_breakdown = {}
+
+    for service in services:
+        priced = _service_cents(store, service, region, instance_types, usage)
+        if isinstance(priced, dict):
+            return priced
+        cost_breakdown[service] = priced[0]
+        total_cents += priced[1]
+
+    result = {
+        "total_monthly_cost": round(total_cents / 100, 2),
+        "cost_breakdown": cost_breakdown,
+        "region": region,
+        "currency": "USD"
+    }
+    if usage:
+        result["usage"] = dict(usage)
+    return result
+
+
+def price_vector(services: Sequence[str], region: str = DEFAULT_REGION,
+                 instance_types: Optional[Dict[str, str]] = None,
+                 usage: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Monthly price in integer cents for each service column (unpriced services are 0)"""
+    store = _pricing_store
+    instance_types = instance_types or {}
+    cents = np.zeros(len(services), dtype=np.int64)
+    for column, service in enumerate(services):
+        priced = _service_cents(store, service, region, instance_types, usage)
+        cents[column] = 0 if isinstance(priced, dict) else priced[1]
+    return cents
+
+
+def batch_totals(membership: np.ndarray, services: Sequence[str], region: str = DEFAULT_REGION,
+                 instance_types: Optional[Dict[str, str]] = None,
+                 usage: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Monthly totals for an N x S membership matrix with one dot product
+
+    membership[i, j] is how many times architecture i uses services[j]
+    (booleans work too). Totals match estimate_cost exactly.
+    """
+    cents = np.asarray(membership).astype(np.int64) @ price_vector(services, region, instance_types, usage)
+    return cents / 100
+
+
+def estimate_costs(architectures: Union[Sequence[Sequence[str]], np.ndarray], region: str = DEFAULT_REGION,
+                   instance_types: Optional[Dict[str, str]] = None,
+                   services: Optional[Sequence[str]] = None,
+                   usage: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Batch version of estimate_cost
+
+    Args:
+        architectures: A list of service lists, or an N x S membership matrix
+            whose columns are named by services
+        region: AWS region
+        instance_types: Optional instance type per service, applied to every architecture
+        services: Column names when architectures is a matrix
+        usage: Optional usage dimensions, applied to every architecture
+
+    Returns:
+        One estimate_cost-compatible result per architecture
+    """
+    store = _pricing_store
+    error = None
+    if region not in store.regions:
+        error = {"error": f"Unsupported region: {region}", "supported_regions": store.regions}
+    else:
+        error = _usage_error(usage)
+    if error is not None:
+        return [dict(error) for _ in range(len(architectures))]
+    instance_types = instance_types or {}
+
+    if services is None:
+        # Build the membership matrix from the service lists (duplicates count twice, as in estimate_cost)
+        columns: Dict[str, int] = {}
+        cells = [[columns.setdefault(service, len(columns)) for service in arch] for arch in architectures]
+        services = list(columns)
+        membership = np.zeros((len(cells), len(services)), dtype=np.int64)
+        rows = np.repeat(np.arange(len(cells)), [len(c) for c in cells])
+        cols = np.array([col for c in cells for col in c], dtype=np.intp)
+        np.add.at(membership, (rows, cols), 1)
+        ordered = [[services[col] for col in c] for c in cells]
+    else:
+        membership = np.asarray(architectures).astype(np.int64)
+        ordered = [[services[col] for col in np.flatnonzero(row)] for row in membership]
+
+    totals = (membership @ price_vector(services, region, instance_types, usage)) / 100
+    priced = {service: _service_cents(store, service, region, instance_types, usage) for service in services}
+
+    results = []
+    for arch, total in zip(ordered, totals.tolist()):
+        error = next((priced[s] for s in arch if isinstance(priced[s], dict)), None)
+        if error is not None:
+            results.append(dict(error))
+            continue
+        result = {
+            "total_monthly_cost": round(total, 2),
+            "cost_breakdown": {service: priced[service][0] for service in arch},
+            "region": region,
+            "currency": "USD"
+        }
+        if usage:
+            result["usage"] = dict(usage)
+        results.append(result)
+    return results
+
+
+def cost_sweep(services: List[str], sweep: Dict[str, Sequence[float]], region: str = DEFAULT_REGION,
+               instance_types: Optional[Dict[str, str]] = None,
+               usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Monthly cost of one architecture over a grid of usage values, in one vectorized pass
+
+    Args:
+        services: Selected services
+        sweep: Values to sweep per usage dimension, e.g. {"requests": [1e5, 1e6, 1e7]};
+            several dimensions are combined as a grid
+        region: AWS region
+        instance_types: Optional instance type per service
+        usage: Fixed values for dimensions that are not swept
+
+    Returns:
+        Grid totals (nested lists indexed by the swept dimensions in order) and
+        per-service costs; every point matches estimate_cost at that usage
+    """
+    store = _pricing_store
+    if region not in store.regions:
+        return {"error": f"Unsupported region: {region}", "supported_regions": store.regions}
+    error = _usage_error(usage)
+    for dimension, values in sweep.items():
+        for value in values:
+            error = error or _usage_error({dimension: value})
+    if error is not None:
+        return error
+    instance_types = instance_types or {}
+    fixed = {k: v for k, v in (usage or {}).items() if k not in sweep}
+
+    dimensions = list(sweep)
+    axes = [np.asarray(sweep[dimension], dtype=np.float64) for dimension in dimensions]
+    grids = dict(zip(dimensions, np.meshgrid(*axes, indexing="ij"))) if axes else {}
+    shape = tuple(len(axis) for axis in axes)
+    total_cents = np.zeros(shape, dtype=np.int64)
+    cost_breakdown = {}
+
+    for service in dict.fromkeys(services):
+        price = _service_price(store, service, region, instance_types)
+        if isinstance(price, dict):
+            return price
+        reference = USAGE_REFERENCE.get(service)
+        if reference is not None and reference[0] in grids:
+            cents = np.rint(_to_cents(price) * (grids[reference[0]] / reference[1])).astype(np.int64)
+        else:
+            cents = np.full(shape, _service_cents(store, service, region, instance_types, fixed)[1], dtype=np.int64)
+        cost_breakdown[service] = (cents / 100).tolist()
+        total_cents += cents * services.count(service)
+
+    return {
+        "dimensions": dimensions,
+        "values": {dimension: axis.tolist() for dimension, axis in zip(dimensions, axes)},
+        "total_monthly_cost": np.round(total_cents / 100, 2).tolist(),
+        "cost_breakdown": cost_breakdown,
+        "usage": fixed,
+        "region": region,
+        "currency": "USD"
+    }
+
+
+# Distribution name -> (parameter names, sampler); samples are clipped at zero usage
+USAGE_DISTRIBUTIONS: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {
+    "fixed": (("value",), lambda rng, n, value: np.full(n, value, dtype=np.float64)),
+    "uniform": (("low", "high"), lambda rng, n, low, high: rng.uniform(low, high, n)),
+    "triangular": (("low", "mode", "high"), lambda rng, n, low, mode, high: rng.triangular(low, mode, high, n)),
+    "normal": (("mean", "std"), lambda rng, n, mean, std: rng.normal(mean, std, n)),
+    # median is the typical value, sigma the spread of log(usage)
+    "lognormal": (("median", "sigma"), lambda rng, n, median, sigma: rng.lognormal(np.log(median), sigma, n))
+}
+
+
+MAX_TRIALS = 1000000  # keeps one simulation's sample arrays to tens of MB
+MAX_BINS = 1000
+
+
+def _distribution_error(dimension: str, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Error dict for an invalid usage distribution, None when it can be sampled"""
+    if dimension not in USAGE_DIMENSIONS:
+        return {"error": f"Unknown usage dimension: {dimension}", "usage_dimensions": list(USAGE_DIMENSIONS)}
+    if not isinstance(spec, dict):
+        return {"error": f"Distribution for {dimension} must be an object such as "
+                         f'{{"distribution": "uniform", "low": 0, "high": 100}}'}
+    kind = spec.get("distribution")
+    if kind not in USAGE_DISTRIBUTIONS:
+        return {"error": f"Unknown distribution for {dimension}: {kind}", "distributions": list(USAGE_DISTRIBUTIONS)}
+    params = USAGE_DISTRIBUTIONS[kind][0]
+    missing = [param for param in params if param not in spec]
+    if missing:
+        return {"error": f"Missing parameters for {dimension}: {', '.join(missing)}", "parameters": list(params)}
+    values = {param: _as_number(spec[param]) for param in params}
+    if None in values.values():
+        return {"error": f"Distribution parameters must be numbers: {dimension}"}
+    if any(value < 0 for value in values.values()):
+        return {"error": f"Distribution parameters must not be negative: {dimension}"}
+    if kind == "lognormal" and values["median"] == 0:
+        return {"error": f"Lognormal median must be positive: {dimension}"}
+    if kind in ("uniform", "triangular") and values["low"] > values["high"]:
+        return {"error": f"low must not exceed high: {dimension}"}
+    if kind == "triangular" and not values["low"] <= values["mode"] <= values["high"]:
+        return {"error": f"mode must lie between low and high: {dimension}"}
+    return None
+
+
+def simulate_cost(services: List[str], distributions: Dict[str, Dict[str, Any]], region: str = DEFAULT_REGION,
+                  instance_types: Optional[Dict[str, str]] = None,
+                  usage: Optional[Dict[str, float]] = None, trials: int = 100000,
+                  quantiles: Sequence[float] = (0.05, 0.5, 0.9, 0.95, 0.99), bins: int = 20,
+                  seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Monte Carlo distribution of the monthly cost of one architecture under uncertain usage
+
+    Args:
+        services: Selected services
+        distributions: Distribution per usage dimension, e.g.
+            {"requests": {"distribution": "lognormal", "median": 1e6, "sigma": 0.5}};
+            see USAGE_DISTRIBUTIONS for the supported kinds and their parameters
+        region: AWS region
+        instance_types: Optional instance type per service
+        usage: Fixed values for dimensions that are not simulated
+        trials: Number of usage samples
+        quantiles: Cost quantiles to report, between 0 and 1
+        bins: Number of histogram bins
+        seed: Random seed for reproducible results
+
+    Returns:
+        Mean, standard deviation, quantiles (e.g. "p95") and a histogram of the
+        monthly total; each trial is priced like estimate_cost at the sampled usage
+    """
+    store = _pricing_store
+    if region not in store.regions:
+        return {"error": f"Unsupported region: {region}", "supported_regions": store.regions}
+    if not isinstance(distributions, dict):
+        return {"error": "distributions must map usage dimensions to distributions"}
+    error = _usage_error(usage)
+    for dimension, spec in distributions.items():
+        error = error or _distribution_error(dimension, spec)
+    if error is not None:
+        return error
+    counts = [_as_number(trials), _as_number(bins)]
+    if None in counts or min(counts) < 1:
+        return {"error": "trials and bins must be positive numbers"}
+    trials, bins = int(counts[0]), int(counts[1])
+    if trials > MAX_TRIALS or bins > MAX_BINS:
+        return {"error": f"At most {MAX_TRIALS} trials and {MAX_BINS} bins are supported"}
+    quantiles = [_as_number(q) for q in quantiles]
+    if any(q is None or not 0 <= q <= 1 for q in quantiles):
+        return {"error": "Quantiles must be between 0 and 1"}
+    instance_types = instance_types or {}
+    fixed = {k: v for k, v in (usage or {}).items() if k not in distributions}
+
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for dimension, spec in distributions.items():
+        params, sampler = USAGE_DISTRIBUTIONS[spec["distribution"]]
+        samples[dimension] = np.maximum(sampler(rng, trials, *(float(spec[param]) for param in params)), 0)
+
+    total_cents = np.zeros(trials, dtype=np.int64)
+    fixed_cents = 0
+    for service in dict.fromkeys(services):
+        price = _service_price(store, service, region, instance_types)
+        if isinstance(price, dict):
+            return price
+        count = services.count(service)
+        reference = USAGE_REFERENCE.get(service)
+        if reference is not None and reference[0] in samples:
+            total_cents += np.rint(_to_cents(price) * (samples[reference[0]] / reference[1])).astype(np.int64) * count
+        else:
+            fixed_cents += _service_cents(store, service, region, instance_types, fixed)[1] * count
+    totals = (total_cents + fixed_cents) / 100
+
+    counts, edges = np.histogram(totals, bins=bins)
+    return {
+        "trials": trials,
+        "mean": round(float(totals.mean()), 2),
+        "std": round(float(totals.std()), 2),
+        "min": round(float(totals.min()), 2),
+        "max": round(float(totals.max()), 2),
+        "quantiles": {f"p{q * 100:g}": round(float(v), 2)
+                      for q, v in zip(quantiles, np.quantile(totals, quantiles))},
+        "histogram": {"bin_edges": np.round(edges, 2).tolist(), "counts": counts.tolist()},
+        "distributions": {dimension: dict(spec) for dimension, spec in distributions.items()},
+        "usage": fixed,
+        "region": region,
+        "currency": "USD"
+    }
+
+
+def compare_regions(services: List[str], regions: Optional[Sequence[str]] = None,
+                    instance_types: Optional[Dict[str, str]] = None,
+                    usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Region x service cost matrix and per-region totals for one architecture
+
+    Args:
+        services: Selected services (duplicates count toward the totals)
+        regions: Regions to compare, all priced regions by default
+        instance_types: Optional instance type per service
+        usage: Optional usage dimensions, as in estimate_cost
+
+    Returns:
+        cost_matrix[i][j] is the monthly cost of services[j] in regions[i];
+        totals match estimate_cost for each region. Regions where an instance
+        type is not priced are listed under "errors" instead of being ranked.
+    """
+    store = _pricing_store
+    regions = list(store.regions if regions is None else regions)
+    unknown = [region for region in regions if region not in store.regions]
+    if unknown:
+        return {"error": f"Unsupported region: {unknown[0]}", "supported_regions": store.regions}
+    error = _usage_error(usage)
+    if error is not None:
+        return error
+    instance_types = instance_types or {}
+
+    columns = list(dict.fromkeys(services))
+    prices = store.price_matrix(columns, regions, instance_types)
+    # Same cent rounding as _service_cents, applied to the whole matrix
+    scales = np.array([1.0 if scale is None else scale
+                       for scale in (_usage_scale(service, usage) for service in columns)])
+    cents = np.rint(np.rint(np.nan_to_num(prices) * 100) * scales).astype(np.int64)
+
+    # A chosen instance type must be priced in the region, as in estimate_cost
+    pinned = np.array([service in instance_types and service in store for service in columns], dtype=bool)
+    missing = np.isnan(prices) & pinned
+    counts = np.array([services.count(service) for service in columns], dtype=np.int64)
+    totals = (cents @ counts) / 100
+
+    errors = {}
+    for row, col in zip(*np.nonzero(missing)):
+        service = columns[col]
+        errors.setdefault(regions[row], f"Unknown instance type for {service}: {instance_types[service]}")
+    total_monthly_cost = {region: round(total, 2) for region, total in zip(regions, totals.tolist())
+                          if region not in errors}
+    ranking = sorted(total_monthly_cost, key=total_monthly_cost.get)
+
+    result = {
+        "regions": regions,
+        "services": columns,
+        "cost_matrix": (cents / 100).tolist(),
+        "total_monthly_cost": total_monthly_cost,
+        "ranking": ranking,
+        "cheapest_region": ranking[0] if ranking else None,
+        "currency": "USD"
+    }
+    if errors:
+        result["errors"] = errors
+    if usage:
+        result["usage"] = dict(usage)
+    return result
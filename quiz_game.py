@@ -1,8 +1,14 @@
 import json
 import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from strands import Agent, tool
 from strands_tools import use_aws, calculator, generate_image
+from languages import ScenarioCatalog
+from pricing import estimate_cost
+from requirement_index import REQUIREMENT_INDEX
+from scoring import ScoringKernel
+from service_catalog import catalog_for, service_completion
+from tool_cache import LRUCache, memoize, cost_key, evaluation_key
 
 # ゲームデータ
 SCENARIOS = [
@@ -73,6 +79,23 @@ AWS_SERVICES = {
     "Management": ["CloudFormation", "Systems Manager", "Auto Scaling"]
 }
 
+GRADE_COMMENTS = {
+    "S": "素晴らしい！完璧に近いアーキテクチャです。",
+    "A": "とても良いアーキテクチャです。",
+    "B": "良いアーキテクチャですが、改善の余地があります。",
+    "C": "基本的な要件は満たしていますが、重要な要素が不足しています。",
+    "D": "アーキテクチャの見直しが必要です。"
+}
+
+# 正解サービスをビットマスクとして事前にコンパイル
+SCORING_KERNEL = ScoringKernel(AWS_SERVICES, SCENARIOS)
+# シナリオをIDと難易度で索引化
+SCENARIO_CATALOG = ScenarioCatalog({"ja": SCENARIOS}, default_language="ja")
+
+# 同一引数での繰り返し呼び出しを省くためのキャッシュ
+COST_CACHE = LRUCache("quiz_game.check_architecture_cost", maxsize=4096, depends_on=("pricing",))
+EVALUATION_CACHE = LRUCache("quiz_game.evaluate_architecture", maxsize=4096, depends_on=("rubric",))
+
 class QuizGame:
     def __init__(self):
         self.score = 0
@@ -89,63 +112,32 @@ class QuizGame:
         
     def get_scenario(self, difficulty: str = None) -> Dict:
         if difficulty:
-            scenarios = [s for s in SCENARIOS if s["difficulty"] == difficulty]
+            scenarios = SCENARIO_CATALOG.by_difficulty("ja", difficulty)
         else:
             scenarios = SCENARIOS
         return random.choice(scenarios)
 
 @tool
-def check_architecture_cost(services: List[str], region: str = "us-east-1") -> Dict[str, Any]:
+@memoize(COST_CACHE, cost_key)
+def check_architecture_cost(services: List[str], region: str = "us-east-1",
+                            instance_types: Optional[Dict[str, str]] = None,
+                            usage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """
     選択されたAWSサービス構成の概算月額コストを計算
     
     Args:
         services: 選択されたAWSサービスのリスト
         region: AWSリージョン
+        instance_types: サービスごとのインスタンスタイプ（任意、例: {"EC2": "m5.large"}）
+        usage: 利用量（任意、requests / storage_gb / transfer_gb / instance_hours）
     
     Returns:
         コスト情報を含む辞書
     """
-    # 簡易的なコスト計算（実際のPricing APIを使用する場合はより複雑になります）
-    service_costs = {
-        "EC2": {"t3.medium": 30.37, "m5.large": 70.08, "c5.xlarge": 156.82},
-        "RDS": {"db.t3.micro": 16.79, "db.t3.small": 33.58, "db.m5.large": 140.16},
-        "ALB": 22.27,
-        "S3": 23.00,  # 1TB standard storage
-        "CloudFront": 85.00,  # 1TB data transfer
-        "Lambda": 20.00,  # 1M requests
-        "DynamoDB": 25.00,  # 25 RCU/WCU
-        "API Gateway": 35.00,  # 1M requests
-        "EKS": 72.00,  # cluster cost
-        "Kinesis": 15.00,  # 1 shard
-        "Redshift": 180.00,  # dc2.large
-        "SageMaker": 50.00   # ml.t3.medium
-    }
-    
-    total_cost = 0
-    cost_breakdown = {}
-    
-    for service in services:
-        if service in service_costs:
-            if isinstance(service_costs[service], dict):
-                # EC2やRDSなど、インスタンスタイプがあるサービス
-                cost = list(service_costs[service].values())[0]  # デフォルトで最小構成
-            else:
-                cost = service_costs[service]
-            
-            cost_breakdown[service] = cost
-            total_cost += cost
-        else:
-            cost_breakdown[service] = 0  # 未知のサービスは0円
-    
-    return {
-        "total_monthly_cost": round(total_cost, 2),
-        "cost_breakdown": cost_breakdown,
-        "region": region,
-        "currency": "USD"
-    }
+    return estimate_cost(services, region, instance_types, usage)
 
 @tool
+@memoize(EVALUATION_CACHE, evaluation_key)
 def evaluate_architecture(selected_services: List[str], scenario_id: int) -> Dict[str, Any]:
     """
     選択されたアーキテクチャを評価してスコアを計算
@@ -157,53 +149,13 @@ def evaluate_architecture(selected_services: List[str], scenario_id: int) -> Dic
     Returns:
         評価結果とスコア
     """
-    scenario = next((s for s in SCENARIOS if s["id"] == scenario_id), None)
-    if not scenario:
+    evaluation = SCORING_KERNEL.evaluate(selected_services, scenario_id)
+    if evaluation is None:
         return {"error": "Invalid scenario ID"}
     
-    correct_services = set(scenario["correct_services"])
-    selected_services_set = set(selected_services)
-    
-    # 正解したサービス
-    correct_matches = correct_services.intersection(selected_services_set)
-    # 不正解（余分なサービス）
-    incorrect_services = selected_services_set - correct_services
-    # 見逃したサービス
-    missed_services = correct_services - selected_services_set
-    
-    # スコア計算
-    base_score = scenario["max_score"]
-    correct_ratio = len(correct_matches) / len(correct_services)
-    penalty = len(incorrect_services) * 10  # 余分なサービス1つにつき10点減点
-    
-    final_score = max(0, int(base_score * correct_ratio - penalty))
-    
     # 評価コメント生成
-    if correct_ratio >= 0.9:
-        grade = "S"
-        comment = "素晴らしい！完璧に近いアーキテクチャです。"
-    elif correct_ratio >= 0.7:
-        grade = "A"
-        comment = "とても良いアーキテクチャです。"
-    elif correct_ratio >= 0.5:
-        grade = "B"
-        comment = "良いアーキテクチャですが、改善の余地があります。"
-    elif correct_ratio >= 0.3:
-        grade = "C"
-        comment = "基本的な要件は満たしていますが、重要な要素が不足しています。"
-    else:
-        grade = "D"
-        comment = "アーキテクチャの見直しが必要です。"
-    
-    return {
-        "score": final_score,
-        "grade": grade,
-        "comment": comment,
-        "correct_services": list(correct_matches),
-        "incorrect_services": list(incorrect_services),
-        "missed_services": list(missed_services),
-        "correct_ratio": round(correct_ratio * 100, 1)
-    }
+    evaluation["comment"] = GRADE_COMMENTS.get(evaluation["grade"], "")
+    return evaluation
 
 @tool
 def get_service_recommendations(requirements: List[str]) -> Dict[str, List[str]]:
@@ -216,32 +168,7 @@ def get_service_recommendations(requirements: List[str]) -> Dict[str, List[str]]
     Returns:
         カテゴリ別の推奨サービス
     """
-    recommendations = {}
-    
-    requirement_mapping = {
-        "高可用性": ["ALB", "Auto Scaling", "Multi-AZ RDS"],
-        "自動スケーリング": ["Auto Scaling", "ECS", "Lambda"],
-        "データベース": ["RDS", "DynamoDB", "ElastiCache"],
-        "静的コンテンツ配信": ["S3", "CloudFront"],
-        "SSL証明書": ["ACM", "ALB"],
-        "コンテナオーケストレーション": ["EKS", "ECS", "Fargate"],
-        "API管理": ["API Gateway", "ALB"],
-        "ログ集約": ["CloudWatch Logs", "Kinesis"],
-        "メトリクス監視": ["CloudWatch", "X-Ray"],
-        "セキュリティ": ["WAF", "Shield", "IAM"],
-        "ストリーミングデータ処理": ["Kinesis", "MSK"],
-        "データレイク": ["S3", "Lake Formation"],
-        "バッチ処理": ["EMR", "Batch", "Glue"],
-        "データウェアハウス": ["Redshift", "Athena"],
-        "可視化": ["QuickSight", "Grafana"],
-        "機械学習": ["SageMaker", "Bedrock"]
-    }
-    
-    for req in requirements:
-        if req in requirement_mapping:
-            recommendations[req] = requirement_mapping[req]
-    
-    return recommendations
+    return REQUIREMENT_INDEX.recommend(requirements, "ja")
 
 # エージェントの作成
 quiz_agent = Agent(
@@ -290,23 +217,15 @@ def validate_service_input(selected_input, available_services):
     """
     ユーザーの入力を検証し、提案以外のサービスがある場合はYes/Noで確認
     """
-    # 全ての利用可能なサービスのリストを作成
-    all_services = []
-    for services in available_services.values():
-        all_services.extend(services)
-    
-    selected_services = [s.strip() for s in selected_input.split(",") if s.strip()]
-    unknown_services = []
-    
-    # 提案にないサービスをチェック
-    for service in selected_services:
-        if service not in all_services:
-            unknown_services.append(service)
+    validation = catalog_for(available_services).validate(selected_input)
+    selected_services, unknown_services = validation["services"], validation["unknown"]
     
     if unknown_services:
         print(f"\n⚠️  以下のサービスは提案リストにありません:")
         for service in unknown_services:
-            print(f"  • {service}")
+            suggestions = validation["suggestions"][service]
+            hint = f" (もしかして: {', '.join(suggestions)})" if suggestions else ""
+            print(f"  • {service}{hint}")
         
         while True:
             print(f"\nこれらのサービスを含めて続行しますか？ (Yes/No): ", end="", flush=True)
@@ -369,7 +288,8 @@ def main():
                     print("例: EC2, RDS, S3, CloudFront")
                     print("選択: ", end="", flush=True)
                     
-                    selected_input = input().strip()
+                    with service_completion(catalog_for(AWS_SERVICES)):
+                        selected_input = input().strip()
                     if not selected_input:
                         print("❌ サービスが選択されていません。")
                         continue
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Language-neutral requirement table with per-language names and a service inverted index
+言語に依存しない要件テーブル（言語別の表記とサービスからの逆引きインデックス）
+"""
+
+import heapq
+import unicodedata
+from typing import Dict, List, Any, Optional, Set
+
+# Requirement ID -> services that address it
+REQUIREMENT_SERVICES: Dict[str, List[str]] = {
+    "high_availability": ["ALB", "Auto Scaling", "Multi-AZ RDS"],
+    "auto_scaling": ["Auto Scaling", "ECS", "Lambda"],
+    "database": ["RDS", "DynamoDB", "ElastiCache"],
+    "static_content_delivery": ["S3", "CloudFront"],
+    "ssl_certificate": ["ACM", "ALB"],
+    "container_orchestration": ["EKS", "ECS", "Fargate"],
+    "api_management": ["API Gateway", "ALB"],
+    "log_aggregation": ["CloudWatch Logs", "Kinesis"],
+    "metrics_monitoring": ["CloudWatch", "X-Ray"],
+    "security": ["WAF", "Shield", "IAM"],
+    "streaming_data_processing": ["Kinesis", "MSK"],
+    "data_lake": ["S3", "Lake Formation"],
+    "batch_processing": ["EMR", "Batch", "Glue"],
+    "data_warehouse": ["Redshift", "Athena"],
+    "visualization": ["QuickSight", "Grafana"],
+    "machine_learning": ["SageMaker", "Bedrock"]
+}
+
+# Language code -> requirement ID -> name as written in scenarios; a new language only adds names
+REQUIREMENT_NAMES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "high_availability": "High availability",
+        "auto_scaling": "Auto scaling",
+        "database": "Database",
+        "static_content_delivery": "Static content delivery",
+        "ssl_certificate": "SSL certificate",
+        "container_orchestration": "Container orchestration",
+        "api_management": "API management",
+        "log_aggregation": "Log aggregation",
+        "metrics_monitoring": "Metrics monitoring",
+        "security": "Security",
+        "streaming_data_processing": "Streaming data processing",
+        "data_lake": "Data lake",
+        "batch_processing": "Batch processing",
+        "data_warehouse": "Data warehouse",
+        "visualization": "Visualization",
+        "machine_learning": "Machine learning"
+    },
+    "ja": {
+        "high_availability": "高可用性",
+        "auto_scaling": "自動スケーリング",
+        "database": "データベース",
+        "static_content_delivery": "静的コンテンツ配信",
+        "ssl_certificate": "SSL証明書",
+        "container_orchestration": "コンテナオーケストレーション",
+        "api_management": "API管理",
+        "log_aggregation": "ログ集約",
+        "metrics_monitoring": "メトリクス監視",
+        "security": "セキュリティ",
+        "streaming_data_processing": "ストリーミングデータ処理",
+        "data_lake": "データレイク",
+        "batch_processing": "バッチ処理",
+        "data_warehouse": "データウェアハウス",
+        "visualization": "可視化",
+        "machine_learning": "機械学習"
+    }
+}
+
+
+FUZZY_MIN_SCORE = 0.6  # Dice similarity a fuzzy match needs before it is treated as the requirement
+
+
+def _ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    Character n-grams of a normalized string, padded with boundary markers
+
+    Characters rather than words keep Japanese, which has no spaces, on the
+    same footing as English; NFKC folds full-width forms and casefold folds case.
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+    padded = f"\x02{normalized}\x03"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class RequirementIndex:
+    """Requirement lookups built once: localized name -> ID, ID -> services, service -> IDs"""
+
+    def __init__(self, requirement_services: Dict[str, List[str]], names_by_language: Dict[str, Dict[str, str]],
+                 default_language: str = "en"):
+        self.default_language = default_language
+        self._services = {req_id: list(services) for req_id, services in requirement_services.items()}
+        self._names = {code: dict(names) for code, names in names_by_language.items()}
+        self._ids = {code: {name: req_id for req_id, name in names.items()} for code, names in self._names.items()}
+        self._by_service: Dict[str, List[str]] = {}
+        for req_id, services in self._services.items():
+            for service in services:
+                self._by_service.setdefault(service, []).append(req_id)
+        self._mappings = {code: {name: self._services[req_id] for req_id, name in names.items()}
+                          for code, names in self._names.items()}
+        # Bigram postings over every name in every language for fuzzy matching
+        self._surfaces = [(name, code, req_id) for code, names in self._names.items() for req_id, name in names.items()]
+        self._gram_counts = []
+        self._postings: Dict[str, List[int]] = {}
+        for surface, (name, _, _) in enumerate(self._surfaces):
+            grams = _ngrams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(surface)
+
+    def _resolve(self, language_code: str) -> str:
+        return language_code if language_code in self._names else self.default_language
+
+    def requirement_id(self, name: str, language_code: str = "en") -> Optional[str]:
+        """ID of a localized requirement name, or None if it is not known"""
+        return self._ids[self._resolve(language_code)].get(name)
+
+    def name(self, requirement_id: str, language_code: str = "en") -> Optional[str]:
+        """Localized name of a requirement ID"""
+        return self._names[self._resolve(language_code)].get(requirement_id)
+
+    def services(self, requirement_id: str) -> List[str]:
+        """Services that address a requirement"""
+        return self._services.get(requirement_id, [])
+
+    def requirements_for(self, service: str) -> List[str]:
+        """IDs of the requirements a service addresses"""
+        return self._by_service.get(service, [])
+
+    def mapping(self, language_code: str = "en") -> Dict[str, List[str]]:
+        """Localized name -> services, the shape min_cost_cover expects"""
+        return self._mappings[self._resolve(language_code)]
+
+    def fuzzy_matches(self, text: str, language_code: str = "en", k: int = 3,
+                      min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Best k requirements for free text by Dice similarity of character bigrams
+
+        Names in every language are searched; a requirement appears once, under
+        its name in language_code when available.
+        """
+        grams = _ngrams(text)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for surface in self._postings.get(gram, ()):
+                shared[surface] = shared.get(surface, 0) + 1
+
+        language_code = self._resolve(language_code)
+        best: Dict[str, tuple] = {}
+        for surface, count in shared.items():
+            score = 2 * count / (len(grams) + self._gram_counts[surface])
+            name, code, req_id = self._surfaces[surface]
+            rank = (score, code == language_code)
+            if score >= min_score and (req_id not in best or rank > best[req_id][0]):
+                best[req_id] = (rank, name, code)
+
+        top = heapq.nlargest(k, best.items(), key=lambda item: item[1][0])
+        return [{"requirement_id": req_id, "name": self.name(req_id, language_code) or name,
+                 "matched": name, "language": code, "score": round(rank[0], 3)}
+                for req_id, (rank, name, code) in top]
+
+    def resolve(self, text: str, language_code: str = "en",
+                min_score: Optional[float] = FUZZY_MIN_SCORE) -> Optional[str]:
+        """Requirement ID for a name, falling back to the best fuzzy match (None disables fuzzy matching)"""
+        req_id = self.requirement_id(text, language_code)
+        if req_id is None and min_score is not None:
+            matches = self.fuzzy_matches(text, language_code, 1, min_score)
+            req_id = matches[0]["requirement_id"] if matches else None
+        return req_id
+
+    def recommend(self, requirements: List[str], language_code: str = "en",
+                  min_score: Optional[float] = FUZZY_MIN_SCORE) -> Dict[str, List[str]]:
+        """Services for each requirement as written, matched fuzzily unless min_score is None; unmatched ones are skipped"""
+        recommendations = {}
+        for req in requirements:
+            req_id = self.resolve(req, language_code, min_score)
+            if req_id is not None:
+                recommendations[req] = list(self._services[req_id])
+        return recommendations
+
+
+REQUIREMENT_INDEX = RequirementIndex(REQUIREMENT_SERVICES, REQUIREMENT_NAMES)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative grading rubric compiled into lookup tables
+グレード閾値と減点ルールの定義（ルックアップテーブルにコンパイル）
+
+A rubric definition is a plain dictionary (or JSON file):
+
+    {
+        "thresholds": {"S": 0.9, "A": 0.7, "B": 0.5, "C": 0.3},
+        "lowest_grade": "D",
+        "penalty_curve": [10],
+        "scenario_overrides": {"3": {"penalty_curve": [5, 10, 20]}}
+    }
+
+penalty_curve[k] is the penalty for the (k+1)-th extra service; the last
+value repeats for every extra service beyond the curve. Scenario overrides
+replace individual keys of the base definition for one scenario.
+"""
+
+import json
+from bisect import bisect_right
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+DEFAULT_RUBRIC: Dict[str, Any] = {
+    "thresholds": {"S": 0.9, "A": 0.7, "B": 0.5, "C": 0.3},
+    "lowest_grade": "D",
+    "penalty_curve": [10],  # 10 points penalty per extra service
+    "scenario_overrides": {}
+}
+
+PENALTY_TABLE_SIZE = 64  # cumulative penalties precomputed for up to this many extra services
+
+
+class RubricTable:
+    """
+    One compiled rubric: bisect threshold table plus cumulative penalty array
+    コンパイル済みの閾値テーブルと累積減点配列
+    """
+
+    def __init__(self, thresholds: Dict[str, float], lowest_grade: str, penalty_curve: Sequence[float]):
+        if not penalty_curve:
+            raise ValueError("penalty_curve must not be empty")
+        ordered = sorted(thresholds.items(), key=lambda item: item[1])
+        # cutoffs ascending; grades[i] applies when cutoffs[i-1] <= ratio < cutoffs[i]
+        self.cutoffs: List[float] = [cutoff for _, cutoff in ordered]
+        self.grades: List[str] = [lowest_grade] + [grade for grade, _ in ordered]
+        # Best grade first, e.g. ["S", "A", "B", "C", "D"]
+        self.ranking: List[str] = self.grades[::-1]
+
+        self.penalty_step = penalty_curve[-1]
+        self.penalties: List[float] = [0]
+        for k in range(PENALTY_TABLE_SIZE):
+            step = penalty_curve[k] if k < len(penalty_curve) else self.penalty_step
+            self.penalties.append(self.penalties[-1] + step)
+
+    def grade(self, correct_ratio: float) -> str:
+        """Map a correct ratio (0.0-1.0) to a grade"""
+        return self.grades[bisect_right(self.cutoffs, correct_ratio)]
+
+    def penalty(self, extra_count: int) -> float:
+        """Total penalty for the given number of extra services"""
+        penalties = self.penalties
+        if extra_count < len(penalties):
+            return penalties[extra_count]
+        return penalties[-1] + (extra_count - len(penalties) + 1) * self.penalty_step
+
+    def outcomes(self, key_size: int, base_score: int) -> List[Tuple[float, str, float]]:
+        """(unpenalized score, grade, correct_ratio) for every matched count of one answer key"""
+        result = []
+        for matched in range(key_size + 1):
+            correct_ratio = matched / key_size if key_size else 0
+            result.append((base_score * correct_ratio, self.grade(correct_ratio), correct_ratio))
+        return result
+
+    def score(self, base_score: int, correct_ratio: float, extra_count: int) -> int:
+        """Final score after penalties, never below zero"""
+        penalties = self.penalties
+        penalty = penalties[extra_count] if extra_count < len(penalties) else self.penalty(extra_count)
+        return max(0, int(base_score * correct_ratio - penalty))
+
+
+class Rubric:
+    """
+    A rubric definition compiled into a default table and per-scenario tables
+    シナリオ別の上書きを含むルーブリック
+    """
+
+    def __init__(self, definition: Optional[Dict[str, Any]] = None):
+        definition = dict(DEFAULT_RUBRIC, **(definition or {}))
+        self.definition = definition
+        self.default = self._compile(definition)
+        self.overrides: Dict[int, RubricTable] = {}
+        for scenario_id, override in definition.get("scenario_overrides", {}).items():
+            self.overrides[int(scenario_id)] = self._compile(dict(definition, **override))
+
+    @staticmethod
+    def _compile(definition: Dict[str, Any]) -> RubricTable:
+        return RubricTable(definition["thresholds"], definition["lowest_grade"], definition["penalty_curve"])
+
+    def for_scenario(self, scenario_id: Any) -> RubricTable:
+        """Compiled table for a scenario, falling back to the default table"""
+        return self.overrides.get(scenario_id, self.default)
+
+
+_active_rubric = Rubric()
+_rubric_change_callbacks: List[Callable[[], None]] = []
+
+
+def get_rubric() -> Rubric:
+    """Rubric currently used by every evaluation path"""
+    return _active_rubric
+
+
+def set_rubric(rubric: Any = None) -> Rubric:
+    """
+    Swap the active rubric at runtime
+
+    Args:
+        rubric: Rubric, definition dictionary, or None for the default rubric
+
+    Returns:
+        The newly active rubric
+    """
+    global _active_rubric
+    _active_rubric = rubric if isinstance(rubric, Rubric) else Rubric(rubric)
+    for callback in _rubric_change_callbacks:
+        callback()
+    return _active_rubric
+
+
+def load_rubric(path: str) -> Rubric:
+    """Load a rubric definition from a JSON file and make it active"""
+    with open(path, encoding="utf-8") as f:
+        return set_rubric(json.load(f))
+
+
+def on_rubric_changed(callback: Callable[[], None]):
+    """Register a callback invoked after set_rubric swaps the active rubric"""
+    _rubric_change_callbacks.append(callback)
+
+
+def grade_for_ratio(correct_ratio: float) -> str:
+    """Map a correct ratio (0.0-1.0) to a grade with the active default table"""
+    return _active_rubric.default.grade(correct_ratio)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Bitmask scoring kernel for AWS Architecture Quiz
+ビットマスクによるアーキテクチャ採点カーネル
+"""
+
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from languages import get_supported_languages, get_scenarios, on_scenarios_reloaded
+from rubric import Rubric, RubricTable, get_rubric, grade_for_ratio
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+class ServiceUniverse:
+    """Assigns every known service name a stable integer ID (its bit position)"""
+
+    def __init__(self, service_names: Iterable[str] = ()):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        for name in service_names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        """Register a service name and return its ID"""
+        service_id = self.ids.get(name)
+        if service_id is None:
+            service_id = len(self.names)
+            self.ids[name] = service_id
+            self.names.append(name)
+        return service_id
+
+    def encode(self, services: Iterable[str]) -> Tuple[int, List[str]]:
+        """Encode services as a bitmask, returning names outside the universe separately"""
+        ids = self.ids
+        mask = 0
+        unknown = []
+        for service in services:
+            service_id = ids.get(service)
+            if service_id is None:
+                if service not in unknown:
+                    unknown.append(service)
+            else:
+                mask |= 1 << service_id
+        return mask, unknown
+
+    def decode(self, mask: int) -> List[str]:
+        """Decode a bitmask back into service names in ID order"""
+        names = self.names
+        result = []
+        while mask:
+            low_bit = mask & -mask
+            result.append(names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return result
+
+
+class ScoringKernel:
+    """
+    Scores submissions against scenario answer keys stored as bitmasks
+    シナリオの正解をビットマスクとして保持し、popcountで採点する
+
+    A scenario may accept alternative architectures through an optional
+    "alternative_services" list of answer keys; submissions are scored against
+    whichever key (correct_services first) gives the best result.
+
+    Grades and penalties come from the given rubric, or from the active rubric
+    (rubric.get_rubric) at scoring time when none is given.
+    """
+
+    def __init__(self, services: Dict[str, List[str]], scenarios: List[Dict[str, Any]],
+                 rubric: Optional[Rubric] = None):
+        self.rubric = rubric
+        names = [name for category_services in services.values() for name in category_services]
+        for scenario in scenarios:
+            for accepted_services in accepted_answer_keys(scenario):
+                names.extend(accepted_services)
+        self.universe = ServiceUniverse(names)
+
+        # scenario_id -> (rubric table, outcomes by matched count per answer key), filled lazily
+        self._compiled: Dict[int, Tuple[RubricTable, List[List[Tuple[float, str, float]]]]] = {}
+
+        # scenario_id -> (primary answer key mask, answer key size, max score)
+        self.answer_keys: Dict[int, Tuple[int, int, int]] = {}
+        # scenario_id -> masks of every accepted answer key, primary first
+        self.key_masks: Dict[int, Tuple[int, ...]] = {}
+        for scenario in scenarios:
+            masks = tuple(self.universe.encode(services)[0] for services in accepted_answer_keys(scenario))
+            self.key_masks[scenario["id"]] = masks
+            self.answer_keys[scenario["id"]] = (masks[0], _popcount(masks[0]), scenario["max_score"])
+
+    def score(self, selected_services: Iterable[str], scenario_id: int) -> Optional[Tuple[int, str, float]]:
+        """Return (score, grade, correct_ratio) or None for an unknown scenario"""
+        key_masks = self.key_masks.get(scenario_id)
+        if key_masks is None:
+            return None
+        mask, unknown = self.universe.encode(selected_services)
+        return self._best_match(mask, len(unknown), key_masks, self._outcomes(scenario_id))[1:]
+
+    def score_batch(self, submissions: Iterable[Tuple[int, Iterable[str]]]) -> List[Optional[Tuple[int, str, float]]]:
+        """
+        Score many (scenario_id, selected_services) submissions in one call
+
+        Returns:
+            (score, grade, correct_ratio) per submission, None for unknown scenarios
+        """
+        all_key_masks = self.key_masks
+        encode = self.universe.encode
+        best_match = self._best_match
+        # Resolve the rubric once per scenario for the whole batch
+        compiled = {scenario_id: self._outcomes(scenario_id) for scenario_id in all_key_masks}
+        results = []
+        append = results.append
+        for scenario_id, selected_services in submissions:
+            key_masks = all_key_masks.get(scenario_id)
+            if key_masks is None:
+                append(None)
+                continue
+            mask, unknown = encode(selected_services)
+            append(best_match(mask, len(unknown), key_masks, compiled[scenario_id])[1:])
+        return results
+
+    def evaluate(self, selected_services: Iterable[str], scenario_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate a submission with the same fields as evaluate_architecture (minus the comment)
+
+        answer_key is the index of the best-matching key: 0 for correct_services,
+        i for alternative_services[i - 1].
+
+        Returns:
+            Evaluation dictionary, or None for an unknown scenario
+        """
+        key_masks = self.key_masks.get(scenario_id)
+        if key_masks is None:
+            return None
+        mask, unknown = self.universe.encode(selected_services)
+        key_index, final_score, grade, correct_ratio = self._best_match(
+            mask, len(unknown), key_masks, self._outcomes(scenario_id))
+        key_mask = key_masks[key_index]
+
+        return {
+            "score": final_score,
+            "grade": grade,
+            "correct_services": self.universe.decode(mask & key_mask),
+            "incorrect_services": self.universe.decode(mask & ~key_mask) + unknown,
+            "missed_services": self.universe.decode(key_mask & ~mask),
+            "correct_ratio": round(correct_ratio * 100, 1),
+            "answer_key": key_index
+        }
+
+    def live_scorer(self, scenario_id: int) -> Optional["LiveScorer"]:
+        """Create an incremental scorer for a scenario, or None for an unknown scenario"""
+        key_masks = self.key_masks.get(scenario_id)
+        if key_masks is None:
+            return None
+        return LiveScorer(self.universe, key_masks, self._outcomes(scenario_id))
+
+    def rubric_table(self, scenario_id: int) -> RubricTable:
+        """Compiled rubric table that applies to a scenario"""
+        return (self.rubric or get_rubric()).for_scenario(scenario_id)
+
+    def _outcomes(self, scenario_id: int):
+        """Rubric table and per-matched-count outcomes for each answer key, recompiled when the rubric changes"""
+        table = self.rubric_table(scenario_id)
+        compiled = self._compiled.get(scenario_id)
+        if compiled is None or compiled[0] is not table:
+            base_score = self.answer_keys[scenario_id][2]
+            compiled = (table, [table.outcomes(_popcount(key_mask), base_score)
+                                for key_mask in self.key_masks[scenario_id]])
+            self._compiled[scenario_id] = compiled
+        return compiled
+
+    @staticmethod
+    def _best_match(mask: int, unknown_count: int, key_masks: Tuple[int, ...], compiled) -> Tuple[int, int, str, float]:
+        """Return (answer key index, score, grade, correct_ratio) for the best-scoring answer key"""
+        table, key_outcomes = compiled
+        penalties = table.penalties
+        selected_count = _popcount(mask) + unknown_count
+        if len(key_masks) == 1:
+            # Common case: a single answer key
+            matched = _popcount(mask & key_masks[0])
+            raw_score, grade, correct_ratio = key_outcomes[0][matched]
+            extra = selected_count - matched
+            penalty = penalties[extra] if extra < len(penalties) else table.penalty(extra)
+            return 0, max(0, int(raw_score - penalty)), grade, correct_ratio
+
+        best = None
+        for key_index, key_mask in enumerate(key_masks):
+            matched = _popcount(mask & key_mask)
+            raw_score, grade, correct_ratio = key_outcomes[key_index][matched]
+            # Everything selected outside this key counts as an extra service
+            extra = selected_count - matched
+            penalty = penalties[extra] if extra < len(penalties) else table.penalty(extra)
+            final_score = max(0, int(raw_score - penalty))
+            # Highest score wins, then highest ratio; ties keep the earlier key
+            if best is None or final_score > best[1] or (final_score == best[1] and correct_ratio > best[3]):
+                best = (key_index, final_score, grade, correct_ratio)
+        return best
+
+
+def accepted_answer_keys(scenario: Dict[str, Any]) -> List[List[str]]:
+    """correct_services followed by any alternative_services answer keys"""
+    return [scenario["correct_services"]] + list(scenario.get("alternative_services", []))
+
+
+class LiveScorer:
+    """
+    Incremental scorer updated as the player adds or removes services
+    サービスの追加・削除ごとにスコアを更新するライブ採点
+
+    Each update costs O(number of answer keys); the best-matching key is
+    recomputed lazily on the next read.
+    """
+
+    def __init__(self, universe: ServiceUniverse, key_masks: Tuple[int, ...], compiled):
+        self.universe = universe
+        self.key_masks = key_masks
+        self.table, self.key_outcomes = compiled
+        self.mask = 0
+        self.unknown: Dict[str, None] = {}  # insertion-ordered set of names outside the universe
+        self.selected_count = 0
+        self.matched_counts = [0] * len(key_masks)
+        self._best: Optional[Tuple[int, int, str, float]] = None
+
+    def add(self, service: str) -> bool:
+        """Add a service; returns False if it was already selected"""
+        service_id = self.universe.ids.get(service)
+        if service_id is None:
+            if service in self.unknown:
+                return False
+            self.unknown[service] = None
+        else:
+            bit = 1 << service_id
+            if self.mask & bit:
+                return False
+            self.mask |= bit
+            self._count_matches(bit, 1)
+        self.selected_count += 1
+        self._best = None
+        return True
+
+    def remove(self, service: str) -> bool:
+        """Remove a service; returns False if it was not selected"""
+        service_id = self.universe.ids.get(service)
+        if service_id is None:
+            if service not in self.unknown:
+                return False
+            del self.unknown[service]
+        else:
+            bit = 1 << service_id
+            if not self.mask & bit:
+                return False
+            self.mask ^= bit
+            self._count_matches(bit, -1)
+        self.selected_count -= 1
+        self._best = None
+        return True
+
+    def _count_matches(self, bit: int, delta: int):
+        matched_counts = self.matched_counts
+        for key_index, key_mask in enumerate(self.key_masks):
+            if key_mask & bit:
+                matched_counts[key_index] += delta
+
+    def _best_match(self) -> Tuple[int, int, str, float]:
+        if self._best is None:
+            penalties = self.table.penalties
+            for key_index, matched in enumerate(self.matched_counts):
+                raw_score, grade, correct_ratio = self.key_outcomes[key_index][matched]
+                extra = self.selected_count - matched
+                penalty = penalties[extra] if extra < len(penalties) else self.table.penalty(extra)
+                final_score = max(0, int(raw_score - penalty))
+                best = self._best
+                if best is None or final_score > best[1] or (final_score == best[1] and correct_ratio > best[3]):
+                    self._best = (key_index, final_score, grade, correct_ratio)
+        return self._best
+
+    @property
+    def answer_key(self) -> int:
+        return self._best_match()[0]
+
+    @property
+    def key_mask(self) -> int:
+        return self.key_masks[self.answer_key]
+
+    @property
+    def matched_count(self) -> int:
+        return self.matched_counts[self.answer_key]
+
+    @property
+    def extra_count(self) -> int:
+        return self.selected_count - self.matched_count
+
+    @property
+    def missed_count(self) -> int:
+        return _popcount(self.key_mask) - self.matched_count
+
+    @property
+    def correct_ratio(self) -> float:
+        return self._best_match()[3]
+
+    @property
+    def projected_score(self) -> int:
+        return self._best_match()[1]
+
+    @property
+    def grade(self) -> str:
+        return self._best_match()[2]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state in the same shape as ScoringKernel.evaluate"""
+        key_mask = self.key_mask
+        return {
+            "score": self.projected_score,
+            "grade": self.grade,
+            "correct_services": self.universe.decode(self.mask & key_mask),
+            "incorrect_services": self.universe.decode(self.mask & ~key_mask) + list(self.unknown),
+            "missed_services": self.universe.decode(key_mask & ~self.mask),
+            "correct_ratio": round(self.correct_ratio * 100, 1),
+            "answer_key": self.answer_key
+        }
+
+
+def build_language_kernels(services: Dict[str, List[str]]) -> Dict[str, ScoringKernel]:
+    """Build one scoring kernel per supported language, rebuilt in place when scenarios reload"""
+    kernels: Dict[str, ScoringKernel] = {}
+
+    def rebuild():
+        kernels.update({code: ScoringKernel(services, get_scenarios(code)) for code, _ in get_supported_languages()})
+
+    rebuild()
+    on_scenarios_reloaded(rebuild)
+    return kernels
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Service catalog index used to validate and canonicalize entered service names
+入力されたサービス名を検証・正規化するサービスカタログインデックス
+"""
+
+import re
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+# Long names and spellings that normalization alone does not map to the catalog name
+SERVICE_ALIASES: Dict[str, str] = {
+    "Elastic Compute Cloud": "EC2",
+    "Elastic Container Service": "ECS",
+    "Elastic Kubernetes Service": "EKS",
+    "Simple Storage Service": "S3",
+    "Elastic Block Store": "EBS",
+    "Elastic File System": "EFS",
+    "Relational Database Service": "RDS",
+    "Application Load Balancer": "ALB",
+    "Network Load Balancer": "NLB",
+    "Virtual Private Cloud": "VPC",
+    "Identity and Access Management": "IAM",
+    "Web Application Firewall": "WAF",
+    "Certificate Manager": "ACM",
+    "Key Management Service": "KMS",
+    "Elastic MapReduce": "EMR",
+    "EC2 Auto Scaling": "Auto Scaling",
+    "SSM": "Systems Manager",
+    "Kinesis Data Streams": "Kinesis"
+}
+
+_VENDOR_PREFIX = re.compile(r"^(?:amazon|aws)(?=.)")
+_SEPARATORS = re.compile(r"[\s\-_./]+")
+
+
+def normalize_service_name(name: str) -> str:
+    """
+    Lookup key that ignores case, width, spacing, punctuation and an Amazon/AWS prefix
+
+    "Route 53", "route53", "ＲＯＵＴＥ５３" and "Amazon Route 53" share a key.
+    """
+    key = _SEPARATORS.sub("", unicodedata.normalize("NFKC", name).casefold())
+    return _VENDOR_PREFIX.sub("", key)
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Levenshtein distance, a metric, so the BK-tree can prune with the triangle inequality
+
+    With a limit the computation stops as soon as the distance is known to
+    exceed it and limit + 1 is returned.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over strings for nearest-neighbour search by edit distance
+
+    Each child edge is labelled with its distance to the parent; a query within
+    radius r of the target only needs children whose label is within r of the
+    query's distance to the parent.
+    """
+
+    def __init__(self, words=()):
+        self._root: Optional[list] = None  # [word, {distance: child}]
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str):
+        if self._root is None:
+            self._root = [word, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[int, str]]:
+        """(distance, word) for every stored word within radius, closest first"""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            # Beyond this distance neither the node nor any child can match
+            limit = radius + max(children, default=0)
+            distance = edit_distance(word, node_word, limit)
+            if distance > limit:
+                continue
+            if distance <= radius:
+                found.append((distance, node_word))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(found)
+
+
+class PrefixTrie:
+    """
+    Character trie whose nodes store every completion below them, so a lookup is one walk down the prefix
+
+    Keys and prefixes are compared by normalize_service_name, the key the
+    alias map uses, so "route53", "Secrets  M" or "amazon s" complete like
+    "Route 53", "Secrets M" and "S". Several keys (a name and its aliases) may
+    complete to the same value.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        self._root: Dict[str, Any] = {"": []}  # "" holds the completions, other keys are characters
+        for key, value in entries:
+            self.add(key, value)
+
+    def add(self, key: str, value: str):
+        node = self._root
+        for char in normalize_service_name(key):
+            if value not in node[""]:
+                node[""].append(value)
+                node[""].sort()
+            node = node.setdefault(char, {"": []})
+        if value not in node[""]:
+            node[""].append(value)
+            node[""].sort()
+
+    def complete(self, prefix: str) -> List[str]:
+        """Values of every key starting with prefix, in sorted order (a new list the caller may change)"""
+        node = self._root
+        for char in normalize_service_name(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+        return list(node[""])
+
+
+class ServiceCatalog:
+    """Canonical service names, an alias map over normalized spellings and the category of each service"""
+
+    def __init__(self, services_by_category: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None):
+        self.names = frozenset(service for services in services_by_category.values() for service in services)
+        self._category = {service: category for category, services in services_by_category.items()
+                          for service in services}
+        self._aliases: Dict[str, str] = {}
+        for service in self._category:
+            self._add_alias(service, service)
+        for alias, service in (SERVICE_ALIASES if aliases is None else aliases).items():
+            if service in self.names:
+                self._add_alias(alias, service)
+        self._tree = BKTree(self._aliases)
+        self._name_trie = PrefixTrie((service, service) for service in self._category)
+        self._alias_trie = PrefixTrie((alias, service) for alias, service in
+                                      (SERVICE_ALIASES if aliases is None else aliases).items() if service in self.names)
+
+    def _add_alias(self, alias: str, service: str):
+        key = normalize_service_name(alias)
+        existing = self._aliases.setdefault(key, service)
+        if existing != service:
+            raise ValueError(f"Alias {alias!r} is ambiguous between {existing} and {service}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Catalog name for any accepted spelling, or None if the service is not in the catalog"""
+        if name in self.names:
+            return name
+        return self._aliases.get(normalize_service_name(name))
+
+    def category(self, name: str) -> Optional[str]:
+        """Category of a service, accepting any spelling"""
+        return self._category.get(self.canonical(name))
+
+    def suggest(self, name: str, k: int = 3, max_distance: Optional[int] = None) -> List[str]:
+        """
+        Catalog names closest to a misspelled service, best first ("did you mean")
+
+        Distances are measured between normalized spellings of the input and of
+        every catalog name and alias. By default about one edit in three
+        characters is tolerated, at most three.
+        """
+        key = normalize_service_name(name)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = min(3, max(1, len(key) // 3))
+        suggestions: List[str] = []
+        for _, alias in self._tree.search(key, max_distance):
+            service = self._aliases[alias]
+            if service not in suggestions:
+                suggestions.append(service)
+            if len(suggestions) == k:
+                break
+        return suggestions
+
+    def complete(self, prefix: str) -> List[str]:
+        """Catalog names starting with prefix (compared as normalize_service_name keys), then names with an alias that does"""
+        by_name = self._name_trie.complete(prefix)
+        by_alias = [service for service in self._alias_trie.complete(prefix) if service not in by_name]
+        return by_name + by_alias
+
+    def completer(self, text: str, state: int) -> Optional[str]:
+        """readline completer for the service after the last comma, keeping the spacing typed before it"""
+        stripped = text.lstrip()
+        matches = self.complete(stripped)
+        return text[:len(text) - len(stripped)] + matches[state] if state < len(matches) else None
+
+    def parse(self, selected_input: str) -> Tuple[List[str], List[str]]:
+        """
+        Split comma-separated input into services and canonicalize each one
+
+        Returns:
+            (all entered services, catalog names where known and as typed otherwise;
+             the entries that are not in the catalog)
+        """
+        selected_services = []
+        unknown_services = []
+        for entry in selected_input.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            canonical = self.canonical(entry)
+            if canonical is None:
+                unknown_services.append(entry)
+            selected_services.append(canonical or entry)
+        return selected_services, unknown_services
+
+    def validate(self, selected_input: str) -> Dict[str, Any]:
+        """Parsed services, the unknown entries and ranked "did you mean" suggestions for each of them"""
+        selected_services, unknown_services = self.parse(selected_input)
+        return {
+            "services": selected_services,
+            "unknown": unknown_services,
+            "suggestions": {entry: self.suggest(entry) for entry in unknown_services}
+        }
+
+
+_catalogs: Dict[int, Tuple[Dict[str, List[str]], ServiceCatalog]] = {}
+
+
+def catalog_for(services_by_category: Dict[str, List[str]]) -> ServiceCatalog:
+    """Catalog for a category -> services table, built on first use and reused afterwards"""
+    cached = _catalogs.get(id(services_by_category))
+    if cached is None or cached[0] is not services_by_category:
+        cached = (services_by_category, ServiceCatalog(services_by_category))
+        _catalogs[id(services_by_category)] = cached
+    return cached[1]
+
+
+@contextmanager
+def service_completion(catalog: ServiceCatalog) -> Iterator[None]:
+    """
+    Tab-complete service names in input() while the block runs, then restore the previous completer
+
+    Commas delimit the completed token. Without the readline module (e.g. on
+    Windows) input works as before, just without completion.
+    """
+    try:
+        import readline
+    except ImportError:
+        yield
+        return
+    previous = readline.get_completer(), readline.get_completer_delims()
+    readline.set_completer(catalog.completer)
+    readline.set_completer_delims(",")
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    try:
+        yield
+    finally:
+        readline.set_completer(previous[0])
+        readline.set_completer_delims(previous[1])
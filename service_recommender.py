@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Local TF-IDF recommender from free-text scenarios to AWS services
+自由記述のシナリオからAWSサービスを推薦するローカルTF-IDFレコメンダー
+"""
+
+import math
+import re
+import unicodedata
+from typing import Dict, List, Any, Iterable, Optional
+
+import numpy as np
+
+from requirement_index import REQUIREMENT_NAMES, REQUIREMENT_SERVICES
+
+# Short English and Japanese descriptions of what each service is used for
+SERVICE_CORPUS: Dict[str, Dict[str, str]] = {
+    "EC2": {"en": "Virtual server instances for web applications and general compute, resizable capacity",
+            "ja": "Webアプリケーションや汎用処理向けの仮想サーバー、インスタンス"},
+    "Lambda": {"en": "Serverless functions that run code on events without managing servers, pay per request",
+               "ja": "サーバー管理不要のサーバーレス関数、イベント駆動でコードを実行、リクエスト課金"},
+    "ECS": {"en": "Container orchestration service to run Docker containers and microservices",
+            "ja": "Dockerコンテナとマイクロサービスを実行するコンテナオーケストレーション"},
+    "EKS": {"en": "Managed Kubernetes for container orchestration of large microservices",
+            "ja": "大規模マイクロサービス向けのマネージドKubernetes、コンテナオーケストレーション"},
+    "Fargate": {"en": "Serverless compute engine for containers without managing servers or clusters",
+                "ja": "サーバーやクラスターを管理しないコンテナ向けサーバーレス実行環境"},
+    "Batch": {"en": "Batch processing jobs scheduled on managed compute",
+              "ja": "マネージドな計算資源でバッチ処理ジョブを実行"},
+    "S3": {"en": "Object storage for static content, backups, data lake files and images",
+           "ja": "静的コンテンツ、バックアップ、データレイク、画像のオブジェクトストレージ"},
+    "EBS": {"en": "Block storage volumes attached to EC2 instances",
+            "ja": "EC2インスタンスに接続するブロックストレージ"},
+    "EFS": {"en": "Shared file storage mounted by many instances and containers",
+            "ja": "複数のインスタンスやコンテナで共有するファイルストレージ"},
+    "FSx": {"en": "Managed high performance file systems such as Windows and Lustre",
+            "ja": "WindowsやLustreなどの高性能マネージドファイルシステム"},
+    "RDS": {"en": "Managed relational database such as MySQL and PostgreSQL with Multi-AZ high availability",
+            "ja": "MySQLやPostgreSQLのマネージドリレーショナルデータベース、マルチAZで高可用性"},
+    "DynamoDB": {"en": "Serverless NoSQL key value database with single digit millisecond latency at any scale",
+                 "ja": "サーバーレスのNoSQLキーバリューデータベース、低レイテンシで大規模"},
+    "ElastiCache": {"en": "In-memory cache with Redis or Memcached to speed up database reads and sessions",
+                    "ja": "RedisやMemcachedのインメモリキャッシュ、データベース読み込みとセッションを高速化"},
+    "Redshift": {"en": "Data warehouse for analytics and SQL queries over large data",
+                 "ja": "大量データの分析とSQLクエリのためのデータウェアハウス"},
+    "DocumentDB": {"en": "Managed document database compatible with MongoDB JSON documents",
+                   "ja": "MongoDB互換のJSONドキュメントデータベース"},
+    "VPC": {"en": "Private isolated network with subnets and security groups",
+            "ja": "サブネットとセキュリティグループを持つ分離されたプライベートネットワーク"},
+    "ALB": {"en": "Application load balancer distributing HTTP traffic across instances for high availability",
+            "ja": "HTTPトラフィックを分散するアプリケーションロードバランサー、高可用性"},
+    "NLB": {"en": "Network load balancer for TCP and UDP traffic with ultra low latency",
+            "ja": "TCPとUDP向けの低レイテンシなネットワークロードバランサー"},
+    "CloudFront": {"en": "Content delivery network CDN caching static content and video at the edge worldwide",
+                   "ja": "静的コンテンツや動画をエッジでキャッシュして配信するCDN、グローバル配信"},
+    "Route 53": {"en": "DNS domain name service with health checks and routing",
+                 "ja": "ヘルスチェックとルーティングを備えたDNSドメインネームサービス"},
+    "API Gateway": {"en": "API management to create, publish and secure REST and WebSocket APIs",
+                    "ja": "RESTやWebSocket APIを作成・公開・保護するAPI管理"},
+    "App Mesh": {"en": "Service mesh for traffic control and observability between microservices",
+                 "ja": "マイクロサービス間の通信制御と可観測性のためのサービスメッシュ"},
+    "IAM": {"en": "Identity and access management for users, roles and permissions security",
+            "ja": "ユーザー、ロール、権限を管理するアクセス管理、セキュリティ"},
+    "WAF": {"en": "Web application firewall protecting against SQL injection and attacks, security",
+            "ja": "SQLインジェクションなどの攻撃を防ぐWebアプリケーションファイアウォール、セキュリティ"},
+    "Shield": {"en": "DDoS protection for applications, security",
+               "ja": "アプリケーションをDDoS攻撃から保護、セキュリティ"},
+    "ACM": {"en": "SSL TLS certificate management for HTTPS",
+            "ja": "HTTPS向けのSSL TLS証明書管理"},
+    "Secrets Manager": {"en": "Store and rotate database passwords, API keys and secrets securely",
+                        "ja": "データベースのパスワードやAPIキーなどのシークレットを安全に保管・ローテーション"},
+    "KMS": {"en": "Encryption key management for data encryption at rest",
+            "ja": "保存データの暗号化のための暗号鍵管理"},
+    "CloudWatch": {"en": "Metrics monitoring, alarms, dashboards and log aggregation",
+                   "ja": "メトリクス監視、アラーム、ダッシュボード、ログ集約"},
+    "X-Ray": {"en": "Distributed tracing to debug and monitor microservices requests",
+              "ja": "マイクロサービスのリクエストを追跡する分散トレーシング、監視"},
+    "CloudTrail": {"en": "Audit log of API calls for governance and compliance",
+                   "ja": "API呼び出しの監査ログ、ガバナンスとコンプライアンス"},
+    "Config": {"en": "Track resource configuration changes and compliance rules",
+               "ja": "リソース設定の変更履歴とコンプライアンスルールの評価"},
+    "Kinesis": {"en": "Real-time streaming data processing and ingestion of events and logs",
+                "ja": "リアルタイムのストリーミングデータ処理、イベントやログの取り込み"},
+    "EMR": {"en": "Managed Hadoop and Spark clusters for big data batch processing",
+            "ja": "ビッグデータのバッチ処理のためのマネージドHadoopとSparkクラスター"},
+    "Glue": {"en": "Serverless ETL and data catalog for data lake batch processing",
+             "ja": "データレイクのためのサーバーレスETLとデータカタログ、バッチ処理"},
+    "Athena": {"en": "Serverless SQL queries directly on data in S3 for analytics",
+               "ja": "S3上のデータに直接SQLクエリを実行するサーバーレス分析"},
+    "QuickSight": {"en": "Business intelligence dashboards and data visualization",
+                   "ja": "BIダッシュボードとデータの可視化"},
+    "SageMaker": {"en": "Build, train and deploy machine learning models",
+                  "ja": "機械学習モデルの構築、学習、デプロイ"},
+    "Bedrock": {"en": "Generative AI with foundation models and large language models",
+                "ja": "基盤モデルと大規模言語モデルによる生成AI"},
+    "Rekognition": {"en": "Image and video analysis with face and object detection",
+                    "ja": "顔や物体を検出する画像・動画分析"},
+    "Comprehend": {"en": "Natural language processing for sentiment and entity extraction from text",
+                   "ja": "テキストの感情分析とエンティティ抽出を行う自然言語処理"},
+    "CloudFormation": {"en": "Infrastructure as code templates to provision resources",
+                       "ja": "テンプレートでリソースを構築するInfrastructure as Code"},
+    "Systems Manager": {"en": "Operations management, patching and parameter store for instances",
+                        "ja": "インスタンスの運用管理、パッチ適用、パラメータストア"},
+    "Auto Scaling": {"en": "Automatically scale capacity with demand for scalability and high availability",
+                     "ja": "需要に合わせて自動スケーリング、拡張性と高可用性"}
+}
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+_CJK = re.compile(r"[぀-ヿ㐀-鿿ｦ-ﾟ]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Latin words plus character bigrams of Japanese runs
+
+    Japanese is not segmented into words, so overlapping bigrams stand in for
+    them (a single-character run is kept as a unigram).
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    tokens = _WORD.findall(text)
+    for run in _CJK.findall(text):
+        tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+    return tokens
+
+
+class ServiceRecommender:
+    """
+    Services ranked by cosine similarity between TF-IDF vectors of a query and each service document
+
+    The service x term matrix is sparse and kept column-wise: for every term
+    the rows that contain it and their L2-normalized weights. Scoring a query
+    only touches the columns of its own terms.
+    """
+
+    def __init__(self, documents: Dict[str, str]):
+        self.services = list(documents)
+        tokenized = [tokenize(text) for text in documents.values()]
+        document_frequency: Dict[str, int] = {}
+        for tokens in tokenized:
+            for term in set(tokens):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        count = len(tokenized)
+        # Smoothed IDF as in scikit-learn, so terms in every document still count a little
+        self.idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        rows: Dict[str, List[int]] = {}
+        weights: Dict[str, List[float]] = {}
+        for row, tokens in enumerate(tokenized):
+            vector = self._weigh(tokens)
+            for term, weight in vector.items():
+                rows.setdefault(term, []).append(row)
+                weights.setdefault(term, []).append(weight)
+        self._columns = {term: (np.array(rows[term], dtype=np.intp), np.array(weights[term]))
+                         for term in rows}
+
+    def _weigh(self, tokens: Iterable[str]) -> Dict[str, float]:
+        """L2-normalized sublinear TF-IDF weights of known terms"""
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            if token in self.idf:
+                counts[token] = counts.get(token, 0) + 1
+        vector = {term: (1 + math.log(n)) * self.idf[term] for term, n in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of the text to every service, in self.services order"""
+        scores = np.zeros(len(self.services))
+        for term, weight in self._weigh(tokenize(text)).items():
+            rows, column = self._columns[term]
+            scores[rows] += weight * column
+        return scores
+
+    def recommend(self, text: str, k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top k services for free text, best first"""
+        scores = self.scores(text)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [{"service": self.services[i], "score": round(float(scores[i]), 3)}
+                for i in top if scores[i] > min_score]
+
+    def recommend_for_scenario(self, scenario: Dict[str, Any], k: int = 7) -> List[Dict[str, Any]]:
+        """Top k services for a scenario's description and requirements"""
+        text = " ".join([scenario.get("description", "")] + list(scenario.get("requirements", [])))
+        return self.recommend(text, k)
+
+
+def build_service_documents(corpus: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, str]:
+    """One document per service: its descriptions plus every requirement name it addresses, in all languages"""
+    corpus = SERVICE_CORPUS if corpus is None else corpus
+    documents = {service: " ".join(texts.values()) for service, texts in corpus.items()}
+    for req_id, services in REQUIREMENT_SERVICES.items():
+        names = " ".join(names[req_id] for names in REQUIREMENT_NAMES.values() if req_id in names)
+        for service in services:
+            if service in documents:
+                documents[service] += " " + names
+    return documents
+
+
+SERVICE_RECOMMENDER = ServiceRecommender(build_service_documents())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the vectorized bulk grader
+一括採点ツールのテストスクリプト
+"""
+
+import csv
+import io
+import json
+import random
+from bulk_grader import grade_file
+from languages import get_scenarios
+from non_streaming_quiz_game import AWS_SERVICES, evaluate_architecture
+
+def make_submissions(count, seed=3):
+    rng = random.Random(seed)
+    pool = [s for services in AWS_SERVICES.values() for s in services] + ["App Mesh", "CustomService"]
+    return [
+        {
+            "player": f"player{i}",
+            "scenario_id": rng.choice([1, 2, 3, 42]),
+            "services": [rng.choice(pool) for _ in range(rng.randint(0, 10))]
+        }
+        for i in range(count)
+    ]
+
+def test_jsonl_grading():
+    """Test JSONL grading against evaluate_architecture"""
+    print("Testing JSONL bulk grading...")
+
+    submissions = make_submissions(1000)
+    source = io.StringIO("".join(json.dumps(s) + "\n" for s in submissions))
+    output = io.StringIO()
+
+    total = grade_file(source, output, chunk_size=64)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert total == len(submissions), "Should grade every row"
+    assert len(results) == len(submissions), "Should write one result per row"
+    for submission, result in zip(submissions, results):
+        expected = evaluate_architecture(submission["services"], submission["scenario_id"], "en")
+        assert result["player"] == submission["player"], "Rows should stay in input order"
+        if "error" in expected:
+            assert result["error"] == expected["error"], "Invalid scenarios should be reported"
+            continue
+        assert result["score"] == expected["score"], f"Score mismatch for {submission}"
+        assert result["grade"] == expected["grade"], f"Grade mismatch for {submission}"
+        assert result["correct_ratio"] == expected["correct_ratio"], f"Ratio mismatch for {submission}"
+
+    print("✅ JSONL bulk grading test passed!")
+
+def test_csv_grading():
+    """Test CSV input and output"""
+    print("\nTesting CSV bulk grading...")
+
+    submissions = make_submissions(200, seed=11)
+    source = io.StringIO()
+    writer = csv.DictWriter(source, fieldnames=["player", "scenario_id", "services"])
+    writer.writeheader()
+    for s in submissions:
+        writer.writerow({**s, "services": ", ".join(s["services"])})
+    source.seek(0)
+    output = io.StringIO()
+
+    grade_file(source, output, input_format="csv", output_format="csv", chunk_size=50)
+    output.seek(0)
+    results = list(csv.DictReader(output))
+
+    assert len(results) == len(submissions), "Should write one result per row"
+    for submission, result in zip(submissions, results):
+        expected = evaluate_architecture(submission["services"], submission["scenario_id"], "en")
+        if "error" in expected:
+            assert result["error"] == expected["error"], "Invalid scenarios should be reported"
+        else:
+            assert int(result["score"]) == expected["score"], f"Score mismatch for {submission}"
+            assert result["grade"] == expected["grade"], f"Grade mismatch for {submission}"
+
+    print("✅ CSV bulk grading test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Bulk Grader Tests")
+    print("=" * 50)
+
+    test_jsonl_grading()
+    test_csv_grading()
+
+    print("\n🎉 All tests passed!")
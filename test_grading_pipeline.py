@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the process-pool grading pipeline
+マルチプロセス採点パイプラインのテストスクリプト
+"""
+
+import io
+import json
+import random
+from bulk_grader import grade_file
+from grading_pipeline import run_pipeline
+
+def make_input(count, seed=5):
+    rng = random.Random(seed)
+    pool = ["EC2", "ALB", "Auto Scaling", "RDS", "S3", "CloudFront", "ACM", "EKS", "Glue", "Lambda", "CustomService"]
+    lines = []
+    for i in range(count):
+        row = {"player": f"player{i}", "scenario_id": rng.choice([1, 2, 3, 7]), "services": rng.sample(pool, rng.randint(0, 8))}
+        lines.append(json.dumps(row) + "\n")
+    return "".join(lines)
+
+def test_pipeline_matches_bulk_grader():
+    """Test that the process pool produces the same rows, in order"""
+    print("Testing grading pipeline...")
+
+    source = make_input(2500)
+    expected = io.StringIO()
+    grade_file(io.StringIO(source), expected)
+
+    output = io.StringIO()
+    summary = run_pipeline(io.StringIO(source), output, chunk_size=100, workers=2)
+
+    assert summary["rows"] == 2500, "Should grade every row"
+    assert summary["rows_per_second"] > 0, "Should report throughput"
+    assert output.getvalue() == expected.getvalue(), "Pipeline output should match bulk grader output in order"
+
+    print(f"✅ Grading pipeline test passed! ({summary['rows_per_second']} rows/sec)")
+
+if __name__ == "__main__":
+    print("🧪 Running Grading Pipeline Tests")
+    print("=" * 50)
+
+    test_pipeline_matches_bulk_grader()
+
+    print("\n🎉 All tests passed!")
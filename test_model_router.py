@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the Bedrock model circuit breakers
+Bedrock モデルのサーキットブレーカーのテストスクリプト
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+from bedrock_models import CLOSED, HALF_OPEN, OPEN, ModelRouter, is_permanent_error
+from non_streaming_quiz_game import NonStreamingQuizGame
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeClientError(Exception):
+    """Shaped like botocore's ClientError"""
+
+    def __init__(self, code, message=""):
+        super().__init__(f"An error occurred ({code}): {message}")
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+class FakeBedrockClient:
+    """Answers from models in `healthy`, raises the given error code for the rest"""
+
+    def __init__(self, healthy, code="AccessDeniedException"):
+        self.healthy = set(healthy)
+        self.code = code
+        self.calls = []
+
+    def invoke_model(self, modelId, body):
+        self.calls.append(modelId)
+        if modelId not in self.healthy:
+            raise FakeClientError(self.code)
+        return {"body": io.BytesIO(json.dumps({"content": [{"text": f"answer from {modelId}"}]}).encode())}
+
+def test_breaker_transitions():
+    """Test closed -> open -> half-open -> closed/open transitions"""
+    print("Testing circuit breaker transitions...")
+
+    clock = FakeClock()
+    router = ModelRouter(["a", "b"], failure_threshold=2, reset_timeout=30, clock=clock)
+    assert router.candidates() == ["a", "b"]
+
+    router.record_failure("a", FakeClientError("ThrottlingException"))
+    assert router.breakers["a"].state == CLOSED, "A transient error below the threshold keeps the breaker closed"
+    router.record_failure("a", FakeClientError("ThrottlingException"))
+    assert router.breakers["a"].state == OPEN and router.candidates() == ["b"]
+
+    router.record_failure("b", FakeClientError("AccessDeniedException"))
+    assert router.breakers["b"].state == OPEN, "A permanent error should open the breaker at once"
+    assert router.candidates() == [], "Calls should fail fast while every breaker is open"
+
+    clock.now = 30
+    assert router.candidates() == ["a", "b"] and router.breakers["a"].state == HALF_OPEN
+    assert router.candidates() == [], "Only one probe may be in flight per half-open model"
+    router.record_failure("a")
+    router.record_success("b")
+    assert router.breakers["a"].state == OPEN and router.breakers["b"].state == CLOSED
+    assert router.state()["models"][0]["retry_in_seconds"] == 30.0 and router.state()["last_good"] == "b"
+
+    assert is_permanent_error(FakeClientError("ResourceNotFoundException"))
+    assert not is_permanent_error(FakeClientError("ThrottlingException")) and not is_permanent_error(ValueError())
+
+    print("✅ Circuit breaker transition test passed!")
+
+def test_transient_failure_recovery():
+    """Test that a preferred model skipped after a transient error is retried once the error is stale"""
+    print("\nTesting recovery after a transient error...")
+
+    clock = FakeClock()
+    router = ModelRouter(["A", "B", "C"], reset_timeout=30, clock=clock)
+    router.record_failure("A", FakeClientError("ThrottlingException"))
+    router.record_success("B")
+    assert router.breakers["A"].state == CLOSED and router.candidates() == ["B", "A", "C"]
+
+    clock.now = 29
+    assert router.candidates() == ["B", "A", "C"], "A recent failure should keep traffic on the fallback"
+    clock.now = 30
+    assert router.candidates() == ["A", "B", "C"], "The preferred model should be retried after reset_timeout"
+    router.record_success("A")
+    assert router.state()["last_good"] == "A" and router.candidates() == ["A", "B", "C"]
+
+    print("✅ Transient error recovery test passed!")
+
+def test_validation_errors():
+    """Test that a rejected request body does not count against the models"""
+    print("\nTesting validation error handling...")
+
+    bad_body = FakeClientError("ValidationException", "Input is too long for requested model.")
+    bad_model = FakeClientError("ValidationException", "The provided model identifier is invalid.")
+    assert not is_permanent_error(bad_body) and is_permanent_error(bad_model)
+
+    router = ModelRouter(["A", "B"], failure_threshold=1, clock=FakeClock())
+    for _ in range(5):
+        for model_id in router.candidates():
+            router.record_failure(model_id, bad_body)
+    assert [m["state"] for m in router.state()["models"]] == [CLOSED, CLOSED], "Bad prompts should not open breakers"
+    assert router.state()["models"][0]["failures"] == 0 and "too long" in router.state()["models"][0]["last_error"]
+
+    router.record_failure("A", bad_model)
+    assert router.breakers["A"].state == OPEN and router.candidates() == ["B"], "An invalid model ID should open the breaker"
+
+    print("✅ Validation error test passed!")
+
+def test_sticky_fallback_and_recovery():
+    """Test that calls go straight to the healthy model and probe the preferred one periodically"""
+    print("\nTesting sticky fallback in call_claude...")
+
+    clock = FakeClock()
+    game = NonStreamingQuizGame()
+    game.model_router = ModelRouter(["preferred", "fallback"], reset_timeout=60, clock=clock)
+    game.bedrock_client = FakeBedrockClient(healthy={"fallback"})
+
+    assert game.call_claude("hi") == "answer from fallback"
+    assert game.call_claude("hi again") == "answer from fallback"
+    assert game.bedrock_client.calls == ["preferred", "fallback", "fallback"], "The failing model should only be tried once"
+
+    clock.now = 61
+    game.bedrock_client.calls.clear()
+    game.bedrock_client.healthy.add("preferred")
+    assert game.call_claude("probe") == "answer from preferred", "The preferred model should be probed and win back"
+    assert game.call_claude("next") == "answer from preferred"
+    assert game.bedrock_client.calls == ["preferred", "preferred"]
+
+    status = game.model_status()
+    assert status["last_good"] == "preferred" and [m["state"] for m in status["models"]] == [CLOSED, CLOSED]
+    assert status["models"][0]["failures"] == 1 and status["models"][1]["successes"] == 2
+
+    game.bedrock_client = FakeBedrockClient(healthy=set())
+    game.call_claude("everything fails")
+    assert "temporarily unavailable" in game.call_claude("fail fast")
+
+    print("✅ Sticky fallback test passed!")
+
+class SlowBedrockClient:
+    """Echoes the prompt after a delay and records the peak number of concurrent calls"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def invoke_model(self, modelId, body):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        prompt = json.loads(body)["messages"][0]["content"]
+        return {"body": io.BytesIO(json.dumps({"content": [{"text": prompt.upper()}]}).encode())}
+
+def test_concurrent_calls():
+    """Test that prompts run concurrently from one event loop under the concurrency cap"""
+    print("\nTesting concurrent call_claude_async...")
+
+    game = NonStreamingQuizGame(max_concurrency=4)
+    game.bedrock_client = SlowBedrockClient()
+    messages = [f"prompt {i}" for i in range(12)]
+
+    started = time.perf_counter()
+    answers = asyncio.run(game.call_claude_many(messages))
+    elapsed = time.perf_counter() - started
+
+    assert answers == [message.upper() for message in messages], "Answers should keep the order of the prompts"
+    assert game.bedrock_client.peak == 4, f"Expected 4 calls in flight at most, saw {game.bedrock_client.peak}"
+    assert elapsed < 12 * game.bedrock_client.delay / 2, f"Calls should overlap, took {elapsed:.2f}s"
+    assert game.call_claude("sync wrapper") == "SYNC WRAPPER", "The blocking wrapper should still work"
+
+    print("✅ Concurrent call test passed!")
+
+def test_cancellation():
+    """Test that a cancelled call keeps its slot until its thread finishes and still records the outcome"""
+    print("\nTesting cancellation of call_claude_async...")
+
+    clock = FakeClock()
+    game = NonStreamingQuizGame(max_concurrency=1)
+    game.model_router = ModelRouter(["preferred", "fallback"], reset_timeout=60, clock=clock)
+    game.model_router.record_failure("preferred", FakeClientError("AccessDeniedException"))
+    clock.now = 61
+    game.bedrock_client = SlowBedrockClient(delay=0.2)
+
+    async def cancel(message):
+        task = asyncio.create_task(game.call_claude_async(message))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("The task should have been cancelled")
+
+    async def cancel_probe():
+        await cancel("slow")
+        status = game.model_status()["models"][0]
+        assert status["state"] == HALF_OPEN and status["successes"] == 0, "The probe is still running"
+        started = time.perf_counter()
+        answer = await asyncio.wait_for(game.call_claude_async("next"), timeout=2)
+        assert time.perf_counter() - started > 0.1, "The next call should wait for the abandoned one to finish"
+        return answer
+
+    assert asyncio.run(cancel_probe()) == "NEXT"
+    status = game.model_status()
+    assert status["last_good"] == "preferred" and status["models"][0]["successes"] == 2, \
+        "The abandoned probe's success should be recorded"
+
+    async def cancel_repeatedly():
+        for i in range(5):
+            await cancel(f"cancelled {i}")
+        return await game.call_claude_many(["a", "b"])
+
+    game = NonStreamingQuizGame(max_concurrency=2)
+    game.bedrock_client = SlowBedrockClient(delay=0.1)
+    assert asyncio.run(cancel_repeatedly()) == ["A", "B"]
+    assert game.bedrock_client.peak <= 2, f"Cancelled calls pushed {game.bedrock_client.peak} calls past the cap of 2"
+
+    game.close()
+    assert game._executor is None and game.call_claude("after close") == "AFTER CLOSE", "A closed game should start a new pool"
+    game.close()
+
+    print("✅ Cancellation test passed!")
+
+def test_call_inside_event_loop():
+    """Test that the blocking call_claude refuses to stall a running event loop"""
+    print("\nTesting call_claude inside a running event loop...")
+
+    game = NonStreamingQuizGame()
+    game.bedrock_client = SlowBedrockClient(delay=0)
+
+    async def handler():
+        try:
+            game.call_claude("from a coroutine")
+        except RuntimeError as e:
+            assert "call_claude_async" in str(e), "The error should point to the async method"
+        else:
+            raise AssertionError("call_claude should not block a running event loop")
+        return await game.call_claude_async("from a coroutine")
+
+    assert asyncio.run(handler()) == "FROM A COROUTINE"
+    assert game.bedrock_client.peak == 1, "Only the awaited call should reach Bedrock"
+
+    print("✅ Event loop call test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Model Router Tests")
+    print("=" * 50)
+
+    test_breaker_transitions()
+    test_transient_failure_recovery()
+    test_validation_errors()
+    test_sticky_fallback_and_recovery()
+    test_concurrent_calls()
+    test_cancellation()
+    test_call_inside_event_loop()
+
+    print("\n🎉 All tests passed!")
@@ -5,7 +5,7 @@ Test script for multilingual functionality
 多言語機能のテストスクリプト
 """
 
-from languages import get_supported_languages, get_language_config, get_message, get_scenarios
+from languages import get_supported_languages, get_language_config, get_message, get_scenarios, get_scenario, get_scenarios_by_difficulty
 
 def test_language_support():
     """Test basic language support functionality"""
@@ -112,6 +112,21 @@ def test_service_consistency():
     
     print("✅ Service consistency test passed!")
 
+def test_scenario_catalog():
+    """Test indexed scenario lookups"""
+    print("\nTesting scenario catalog lookups...")
+    
+    for language in ["ja", "en"]:
+        for scenario in get_scenarios(language):
+            assert get_scenario(language, scenario["id"]) is scenario, "Lookup by ID should return the scenario"
+            assert scenario in get_scenarios_by_difficulty(language, scenario["difficulty"]), "Scenario should be in its difficulty bucket"
+    
+    assert get_scenario("en", 99) is None, "Unknown scenario ID should return None"
+    assert get_scenarios_by_difficulty("en", "Expert") == [], "Unknown difficulty should return no scenarios"
+    assert get_scenario("fr", 1) is get_scenario("en", 1), "Unknown languages should fall back to English"
+    
+    print("✅ Scenario catalog test passed!")
+
 def demo_multilingual_output():
     """Demonstrate multilingual output"""
     print("\n" + "="*60)
@@ -150,6 +165,7 @@ if __name__ == "__main__":
         test_scenarios()
         test_difficulty_levels()
         test_service_consistency()
+        test_scenario_catalog()
         
         print("\n🎉 All tests passed!")
         
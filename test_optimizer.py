@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the cost-versus-score optimizer
+コスト対スコア最適化のテストスクリプト
+"""
+
+from itertools import combinations
+import numpy as np
+from optimizer import pareto_frontier, cheapest_for_grade, min_cost_cover, optimize_commitments, EXACT_COVER_LIMIT
+from pricing import service_cost, estimate_cost
+from languages import get_scenarios
+from scoring import ScoringKernel, accepted_answer_keys
+from demo_game import AWS_SERVICES, SCENARIOS
+
+def brute_force_frontier(kernel, scenario, extras):
+    """Enumerate every subset and keep the non-dominated (cost, score) pairs"""
+    pool = list(dict.fromkeys(sum(accepted_answer_keys(scenario), []) + extras))
+    points = set()
+    for size in range(len(pool) + 1):
+        for subset in combinations(pool, size):
+            cost = estimate_cost(list(subset))["total_monthly_cost"]
+            score = kernel.score(subset, scenario["id"])[0]
+            points.add((cost, score))
+    return sorted(
+        (c, s) for c, s in points
+        if not any(c2 <= c and s2 >= s and (c2, s2) != (c, s) for c2, s2 in points)
+    )
+
+def test_frontier_matches_brute_force():
+    """Test the DP frontier against exhaustive enumeration"""
+    print("Testing Pareto frontier against brute force...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    extras = ["Lambda", "DynamoDB", "ECS", "IAM"]
+    for scenario in SCENARIOS:
+        frontier = pareto_frontier(kernel, scenario["id"])
+        expected = brute_force_frontier(kernel, scenario, extras)
+        actual = [(p["monthly_cost"], p["score"]) for p in frontier]
+        assert actual == expected, f"Frontier mismatch for scenario {scenario['id']}: {actual} != {expected}"
+        for point in frontier:
+            assert round(sum(service_cost(s) for s in point["services"]), 2) == point["monthly_cost"], "Cost should match the price table"
+
+    scenarios = get_scenarios("en")
+    kernel = ScoringKernel(AWS_SERVICES, scenarios)
+    for scenario in scenarios:
+        frontier = pareto_frontier(kernel, scenario["id"])
+        expected = brute_force_frontier(kernel, scenario, ["IAM"])
+        assert [(p["monthly_cost"], p["score"]) for p in frontier] == expected, f"Alternative-key frontier mismatch for scenario {scenario['id']}"
+
+    print("✅ Pareto frontier test passed!")
+
+def test_cheapest_for_grade():
+    """Test the cheapest architecture for a target grade"""
+    print("\nTesting cheapest architecture per grade...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    cheapest_s = cheapest_for_grade(kernel, 1, "S")
+    cheapest_b = cheapest_for_grade(kernel, 1, "B")
+
+    assert cheapest_s["grade"] == "S", "Should reach grade S"
+    assert cheapest_b["grade"] in ("S", "A", "B"), "Should reach at least grade B"
+    assert cheapest_b["monthly_cost"] <= cheapest_s["monthly_cost"], "Lower grades should not cost more"
+    assert pareto_frontier(kernel, 99) is None, "Unknown scenario should return None"
+    assert cheapest_for_grade(kernel, 1, "s") == cheapest_s, "Grades should be matched in any case"
+    assert cheapest_for_grade(kernel, 1, "Pass") is None, "Unknown grades should not match the empty architecture"
+
+    print(f"✅ Cheapest S architecture: ${cheapest_s['monthly_cost']} ({', '.join(cheapest_s['services'])})")
+
+def brute_force_cover_cost(requirements, mapping):
+    """Cheapest (cents, size) of any service subset covering every coverable requirement"""
+    pool = sorted({s for req in requirements for s in mapping.get(req, [])})
+    coverable = {req for req in requirements if mapping.get(req)}
+    best = None
+    for size in range(len(pool) + 1):
+        for subset in combinations(pool, size):
+            if coverable <= {req for req in requirements if set(mapping.get(req, [])) & set(subset)}:
+                cost = (sum(int(round(service_cost(s) * 100)) for s in subset), size)
+                best = cost if best is None else min(best, cost)
+    return best
+
+def test_min_cost_cover():
+    """Test the set-cover solver against brute force and its coverage report"""
+    print("\nTesting minimum-cost requirement cover...")
+
+    mapping = {
+        "Web hosting": ["EC2", "ECS", "Lambda"],
+        "Database": ["RDS", "DynamoDB"],
+        "API": ["API Gateway", "ALB", "Lambda"],
+        "Analytics": ["Redshift", "Kinesis"],
+        "Serverless data": ["DynamoDB", "Lambda"]
+    }
+    requirements = list(mapping) + ["Quantum computing"]
+    result = min_cost_cover(requirements, mapping)
+
+    cents = sum(int(round(service_cost(s) * 100)) for s in result["services"])
+    assert result["method"] == "exact", "Small instances should be solved exactly"
+    assert (cents, len(result["services"])) == brute_force_cover_cost(requirements, mapping), "Cover should be optimal"
+    assert result["uncovered"] == ["Quantum computing"], "Unmapped requirements should be reported"
+    for req, services in result["coverage"].items():
+        assert services and all(s in mapping[req] and s in result["services"] for s in services), f"Bad coverage proof for {req}"
+
+    many = [f"Requirement {i}" for i in range(EXACT_COVER_LIMIT + 3)]
+    many_mapping = {req: ["Lambda", "EC2"] if i % 2 else ["S3"] for i, req in enumerate(many)}
+    greedy = min_cost_cover(many, many_mapping)
+    assert greedy["method"] == "greedy", "Large instances should fall back to greedy"
+    assert not greedy["uncovered"] and set(greedy["services"]) == {"Lambda", "S3"}, f"Unexpected greedy cover {greedy['services']}"
+
+    print(f"✅ Cheapest cover: ${result['total_monthly_cost']} ({', '.join(result['services'])})")
+
+def test_commitment_plan():
+    """Test the commitment optimizer on closed-form cases and against a grid search"""
+    print("\nTesting Reserved Instance / Savings Plan optimizer...")
+
+    steady = optimize_commitments(estimate_cost(["EC2", "RDS", "Lambda", "S3"])["cost_breakdown"])
+    assert set(steady["reserved_instances"]) == {"EC2", "RDS"}, "Steady instances should be fully reserved"
+    assert all(ri["coverage"] == 1 for ri in steady["reserved_instances"].values())
+    assert steady["savings_plan"]["monthly_commitment"] == round(20.00 * (1 - 0.12), 2), "Steady Lambda spend goes to the plan"
+    assert steady["on_demand"]["S3"] == 23.00 and steady["monthly_savings"] > 0
+
+    # A reservation pays off only if the demand it covers runs more than (1 - discount) of the time
+    busy = optimize_commitments({"RDS": 100.0}, {"RDS": [1] * 6 + [0] * 4})
+    idle = optimize_commitments({"RDS": 100.0}, {"RDS": [1] * 5 + [0] * 5})
+    assert busy["reserved_instances"]["RDS"]["coverage"] == 1 and not idle["reserved_instances"]
+    assert idle["optimized_monthly_cost"] == idle["on_demand_monthly_cost"] == 50.00
+    reserved = optimize_commitments({"EC2": 50.0}, {"EC2": [1, 2, 3]})["savings_plan"]
+    assert reserved == {"hourly_commitment": 0.0, "monthly_commitment": 0.0, "utilization": 0.0}, \
+        f"A commitment too small to report should not be reported as used: {reserved}"
+
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        breakdown = {"EC2": float(rng.uniform(20, 150)), "Lambda": float(rng.uniform(5, 50)), "S3": 23.0}
+        profile = {service: rng.uniform(0, 3, 4).round(2).tolist() for service in ("EC2", "Lambda")}
+        plan = optimize_commitments(breakdown, profile)
+        ec2, lam = np.array(profile["EC2"]), np.array(profile["Lambda"])
+        # Grid over (reservation, commitment) x slot, Savings Plan applied to EC2 before Lambda
+        reserved = np.linspace(0, 3, 301)[:, None, None]
+        commitment = np.linspace(0, 40, 801)[None, :, None]
+        residual = np.maximum(ec2 - reserved, 0) * breakdown["EC2"] / 4
+        ec2_covered = np.minimum(residual * 0.66, commitment)
+        lam_covered = np.minimum(lam * breakdown["Lambda"] / 4 * 0.88, commitment - ec2_covered)
+        cost = (reserved[..., 0] * breakdown["EC2"] * 0.6 + commitment[..., 0] * 4 + 23.0
+                + (residual - ec2_covered / 0.66).sum(axis=-1) + (lam * breakdown["Lambda"] / 4 - lam_covered / 0.88).sum(axis=-1))
+        best = cost.min()
+        assert plan["optimized_monthly_cost"] <= best + 0.01, f"Plan costs more than a grid search: {plan} vs {best}"
+
+    assert "error" in optimize_commitments({"EC2": 10.0}, term="5yr"), "Unknown terms should be reported"
+    assert "error" in optimize_commitments({"EC2": 10.0}, {"EC2": [1, 2], "Lambda": [1, 2]})
+    assert "error" in optimize_commitments({"EC2": 10.0, "RDS": 5.0}, {"EC2": [1, 2], "RDS": [1]})
+
+    print(f"✅ Steady-state commitments save ${steady['monthly_savings']} per month")
+
+if __name__ == "__main__":
+    print("🧪 Running Optimizer Tests")
+    print("=" * 50)
+
+    test_frontier_matches_brute_force()
+    test_cheapest_for_grade()
+    test_min_cost_cover()
+    test_commitment_plan()
+
+    print("\n🎉 All tests passed!")
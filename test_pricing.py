@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the region-aware pricing store
+リージョン別料金ストアのテストスクリプト
+"""
+
+import os
+import random
+import tempfile
+import numpy as np
+from demo_game import check_architecture_cost as demo_cost
+from pricing import (
+    SERVICE_COSTS, REGION_PRICE_FACTORS, USAGE_REFERENCE, PricingStore, batch_totals, compare_regions, cost_sweep,
+    estimate_cost, estimate_costs, get_pricing_store, load_pricing, service_cost, simulate_cost
+)
+from tool_cache import LRUCache
+
+def test_store_lookups():
+    """Test default instances, explicit instances and regional prices"""
+    print("Testing pricing store lookups...")
+
+    store = get_pricing_store()
+    assert len(store) == len(REGION_PRICE_FACTORS) * sum(len(c) if isinstance(c, dict) else 1 for c in SERVICE_COSTS.values())
+    assert store.price("EC2") == 30.37, "First instance type should be the default"
+    assert store.price("EC2", instance_type="m5.large") == 70.08, "Explicit instance type should be used"
+    assert store.price("S3", "ap-northeast-1") == round(23.00 * 1.22, 2), "Regional factor should apply"
+    assert store.price("EC2", instance_type="x1.huge") is None, "Unknown instance types are not priced"
+    assert store.price("Route 53") is None and service_cost("Route 53") == 0, "Unpriced services cost $0"
+    assert store.instance_types("RDS")[0] == "db.t3.micro" and store.instance_types("S3") == [""]
+
+    print("✅ Pricing store lookup test passed!")
+
+def test_estimate_cost_regions():
+    """Test that cost estimates reflect region and instance types"""
+    print("\nTesting region-aware estimates...")
+
+    us = estimate_cost(["EC2", "S3"])
+    tokyo = estimate_cost(["EC2", "S3"], "ap-northeast-1")
+    large = estimate_cost(["EC2", "S3"], "us-east-1", {"EC2": "m5.large"})
+
+    assert us["total_monthly_cost"] == 53.37, "us-east-1 should keep the original prices"
+    assert tokyo["total_monthly_cost"] > us["total_monthly_cost"], "Tokyo should cost more"
+    assert tokyo["region"] == "ap-northeast-1", "Result should report the requested region"
+    assert large["cost_breakdown"]["EC2"] == 70.08, "Instance type should change the price"
+    assert "error" in estimate_cost(["EC2"], "moon-1"), "Unknown regions should be reported"
+    assert "error" in estimate_cost(["EC2"], "us-east-1", {"EC2": "x1.huge"}), "Unknown instance types should be reported"
+
+    services = ["EC2", "RDS", "WAF", "X-Ray", "Secrets Manager", "ACM"]
+    for region in ("us-east-1", "ap-northeast-1"):
+        assert demo_cost(services, region) == estimate_cost(services, region), "The demo game should use the same prices"
+    assert estimate_cost(["WAF", "Secrets Manager"])["total_monthly_cost"] == 5.40, "Demo-only prices should be kept"
+
+    print("✅ Region-aware estimate test passed!")
+
+def test_save_and_mmap_load():
+    """Test the binary file round trip with and without mmap"""
+    print("\nTesting pricing file round trip...")
+
+    store = PricingStore([
+        ("EC2", "t3.medium", "us-east-1", "month", 30.37),
+        ("EC2", "t3.medium", "eu-west-1", "month", 32.8),
+        ("S3", "", "us-east-1", "month", 23.0)
+    ])
+    path = os.path.join(tempfile.mkdtemp(), "prices.bin")
+    store.save(path)
+
+    for use_mmap in (True, False):
+        loaded = PricingStore.load(path, use_mmap)
+        assert len(loaded) == 3, "Every row should be loaded"
+        assert loaded.price("EC2", "eu-west-1") == 32.8, "Prices should survive the round trip"
+        assert loaded.unit("S3") == "month", "Units should survive the round trip"
+        assert loaded.regions == ["us-east-1", "eu-west-1"], "Regions should keep their order"
+
+    print("✅ Pricing file round trip test passed!")
+
+def test_reload_invalidates_caches():
+    """Test that loading a price file swaps the store and clears pricing caches"""
+    print("\nTesting pricing reload...")
+
+    cache = LRUCache("test.pricing_reload", depends_on=("pricing",))
+    cache.put("key", "value")
+    path = os.path.join(tempfile.mkdtemp(), "prices.bin")
+    PricingStore([("EC2", "t3.medium", "us-east-1", "month", 99.0)]).save(path)
+
+    try:
+        load_pricing(path)
+        assert service_cost("EC2") == 99.0, "Loaded prices should be active"
+        assert len(cache) == 0, "Pricing caches should be cleared"
+    finally:
+        load_pricing()
+
+    assert service_cost("EC2") == 30.37, "Built-in prices should be restored"
+    print("✅ Pricing reload test passed!")
+
+def test_batch_matches_scalar():
+    """Test that batch estimates match estimate_cost exactly"""
+    print("\nTesting batch cost evaluation...")
+
+    rng = random.Random(13)
+    pool = list(SERVICE_COSTS) + ["Route 53", "IAM"]
+    architectures = [[rng.choice(pool) for _ in range(rng.randint(0, 12))] for _ in range(3000)]
+    for region, instance_types in (("us-east-1", None), ("ap-southeast-2", {"EC2": "c5.xlarge", "RDS": "db.m5.large"})):
+        expected = [estimate_cost(arch, region, instance_types) for arch in architectures]
+        assert estimate_costs(architectures, region, instance_types) == expected, f"Batch results differ in {region}"
+
+    membership = np.array([[1, 0, 2], [0, 1, 1], [0, 0, 0]])
+    columns = ["EC2", "S3", "Lambda"]
+    totals = batch_totals(membership, columns)
+    assert totals.tolist() == [estimate_cost(["EC2", "Lambda", "Lambda"])["total_monthly_cost"],
+                               estimate_cost(["S3", "Lambda"])["total_monthly_cost"], 0], "Matrix totals should match"
+    matrix_results = estimate_costs(membership.astype(bool), services=columns)
+    assert matrix_results[1] == estimate_cost(["S3", "Lambda"]), "Matrix input should give scalar-compatible results"
+
+    errors = estimate_costs([["EC2"], ["S3"]], "us-east-1", {"EC2": "x1.huge"})
+    assert "error" in errors[0] and "error" not in errors[1], "Errors should only affect matching architectures"
+    assert all("error" in r for r in estimate_costs([["S3"], []], "moon-1")), "Unknown regions fail every row"
+
+    print("✅ Batch cost evaluation test passed!")
+
+def test_usage_scaling():
+    """Test that usage dimensions scale prices from their reference quantities"""
+    print("\nTesting usage-based estimates...")
+
+    services = ["EC2", "S3", "CloudFront", "Lambda", "IAM"]
+    reference = {dimension: quantity for dimension, quantity in USAGE_REFERENCE.values()}
+    assert estimate_cost(services, usage=reference)["total_monthly_cost"] == estimate_cost(services)["total_monthly_cost"], \
+        "Reference usage should reproduce the listed prices"
+
+    tenth = estimate_cost(["EC2", "S3"], usage={"instance_hours": 73})
+    assert tenth["cost_breakdown"]["EC2"] == 3.04, "Instance hours should scale EC2"
+    assert tenth["cost_breakdown"]["S3"] == 23.00, "Services on other dimensions keep their price"
+    assert tenth["usage"] == {"instance_hours": 73}, "Usage should be echoed in the result"
+    assert estimate_cost(["Lambda"], usage={"requests": 0})["total_monthly_cost"] == 0, "Zero usage costs nothing"
+    assert "error" in estimate_cost(["S3"], usage={"page_views": 10}), "Unknown dimensions should be reported"
+    assert "error" in estimate_cost(["S3"], usage={"storage_gb": -1}), "Negative usage should be reported"
+    for bad in (None, "lots", [1], float("nan")):
+        assert "error" in estimate_cost(["S3"], usage={"storage_gb": bad}), f"Non-numeric usage {bad!r} should be reported"
+        assert "error" in cost_sweep(["S3"], {"storage_gb": [1, bad]}), "Non-numeric sweep values should be reported"
+    assert estimate_cost(["EC2"], usage={"instance_hours": "73"})["cost_breakdown"]["EC2"] == 3.04, \
+        "Numeric strings from tool calls should be accepted"
+
+    architectures = [["EC2", "S3"], ["Lambda", "API Gateway", "Lambda"]]
+    usage = {"requests": 2500000, "instance_hours": 100}
+    assert estimate_costs(architectures, usage=usage) == [estimate_cost(a, usage=usage) for a in architectures], \
+        "Batch results should apply usage the same way"
+
+    print("✅ Usage-based estimate test passed!")
+
+def test_cost_sweep_matches_scalar():
+    """Test that every sweep grid point equals estimate_cost at that usage"""
+    print("\nTesting vectorized cost sweep...")
+
+    services = ["EC2", "S3", "S3", "CloudFront", "Lambda", "API Gateway", "Route 53"]
+    sweep = {"requests": [0, 1e5, 1e6, 3.3e6], "transfer_gb": [10, 100, 1000.5], "storage_gb": [1, 50]}
+    for region in ("us-east-1", "eu-west-1"):
+        result = cost_sweep(services, sweep, region, {"EC2": "m5.large"}, {"instance_hours": 360})
+        assert result["dimensions"] == ["requests", "transfer_gb", "storage_gb"]
+        for i, requests in enumerate(sweep["requests"]):
+            for j, transfer_gb in enumerate(sweep["transfer_gb"]):
+                for k, storage_gb in enumerate(sweep["storage_gb"]):
+                    usage = {"requests": requests, "transfer_gb": transfer_gb, "storage_gb": storage_gb, "instance_hours": 360}
+                    expected = estimate_cost(services, region, {"EC2": "m5.large"}, usage)["total_monthly_cost"]
+                    assert result["total_monthly_cost"][i][j][k] == expected, f"Grid point differs in {region}"
+
+    assert cost_sweep(["EC2"], {})["total_monthly_cost"] == estimate_cost(["EC2"])["total_monthly_cost"], \
+        "An empty sweep is a single estimate"
+    assert "error" in cost_sweep(["S3"], {"storage_gb": [10, -5]}), "Negative sweep values should be reported"
+    assert "error" in cost_sweep(["S3"], {"storage_gb": [10]}, "moon-1"), "Unknown regions should be reported"
+
+    print("✅ Vectorized cost sweep test passed!")
+
+def test_cost_simulation():
+    """Test Monte Carlo cost distributions against closed-form cases"""
+    print("\nTesting Monte Carlo cost simulation...")
+
+    services = ["EC2", "S3", "Lambda", "API Gateway"]
+    fixed = simulate_cost(services, {"requests": {"distribution": "fixed", "value": 2000000}}, trials=1000)
+    expected = estimate_cost(services, usage={"requests": 2000000})["total_monthly_cost"]
+    assert fixed["min"] == fixed["max"] == expected, "Fixed usage should reproduce estimate_cost"
+    assert fixed["quantiles"]["p50"] == expected and sum(fixed["histogram"]["counts"]) == 1000
+
+    distributions = {
+        "requests": {"distribution": "lognormal", "median": 1000000, "sigma": 0.5},
+        "storage_gb": {"distribution": "uniform", "low": 0, "high": 2048}
+    }
+    result = simulate_cost(services, distributions, trials=200000, seed=7)
+    assert result == simulate_cost(services, distributions, trials=200000, seed=7), "Seeded runs should repeat"
+    # Lambda + API Gateway cost $55 at the median request volume, S3 averages $23
+    assert abs(result["quantiles"]["p50"] - (30.37 + 55.00 + 23.00)) < 2, "Median should follow the median usage"
+    assert result["quantiles"]["p5"] < result["quantiles"]["p50"] < result["quantiles"]["p95"] < result["quantiles"]["p99"]
+    assert len(result["histogram"]["bin_edges"]) == len(result["histogram"]["counts"]) + 1 == 21
+    assert result["min"] >= 30.37, "EC2 is not affected by simulated usage"
+
+    assert "error" in simulate_cost(services, {"requests": {"distribution": "zipf"}}), "Unknown kinds should be reported"
+    assert "error" in simulate_cost(services, {"requests": {"distribution": "normal", "mean": 5}}), \
+        "Missing parameters should be reported"
+    assert "error" in simulate_cost(services, {"page_views": {"distribution": "fixed", "value": 1}})
+    assert "error" in simulate_cost(services, {"storage_gb": {"distribution": "uniform", "low": 5, "high": 1}})
+    assert "error" in simulate_cost(services, {"requests": {"distribution": "normal", "mean": None, "std": 1}})
+    assert "error" in simulate_cost(services, {"requests": {"distribution": "fixed", "value": "many"}})
+    assert "error" in simulate_cost(services, {"requests": {"distribution": "fixed", "value": 1}}, usage={"storage_gb": None})
+    assert simulate_cost(services, {"requests": {"distribution": "fixed", "value": "2000000"}}, trials=10)["max"] == expected
+    assert "error" in simulate_cost(services, {"requests": 5}), "A bare number is not a distribution"
+    assert "error" in simulate_cost(services, [("requests", "uniform")])
+    uniform = {"storage_gb": {"distribution": "uniform", "low": 0, "high": 2048}}
+    assert simulate_cost(services, uniform, trials=1000.0, bins=10.0, seed=1) == simulate_cost(services, uniform, trials=1000, bins=10, seed=1), \
+        "Whole-number floats from JSON should be accepted"
+    for trials, bins in ((0, 20), ("many", 20), (None, 20), (10 ** 9, 20), (100, 10 ** 6)):
+        assert "error" in simulate_cost(services, uniform, trials=trials, bins=bins), f"trials={trials}, bins={bins} should be rejected"
+
+    print("✅ Monte Carlo cost simulation test passed!")
+
+def test_region_comparison():
+    """Test that the region matrix matches estimate_cost region by region"""
+    print("\nTesting multi-region cost comparison...")
+
+    services = ["EC2", "RDS", "S3", "S3", "Lambda", "IAM"]
+    for instance_types, usage in (({}, None), ({"EC2": "c5.xlarge", "RDS": "db.m5.large"}, {"requests": 3.5e6, "storage_gb": 10})):
+        result = compare_regions(services, instance_types=instance_types, usage=usage)
+        assert result["regions"] == list(REGION_PRICE_FACTORS), "All priced regions should be compared by default"
+        assert result["services"] == ["EC2", "RDS", "S3", "Lambda", "IAM"], "Services should be deduplicated"
+        for row, region in enumerate(result["regions"]):
+            expected = estimate_cost(services, region, instance_types, usage)
+            assert result["total_monthly_cost"][region] == expected["total_monthly_cost"], f"Total differs in {region}"
+            assert dict(zip(result["services"], result["cost_matrix"][row])) == expected["cost_breakdown"]
+        totals = result["total_monthly_cost"]
+        assert [totals[region] for region in result["ranking"]] == sorted(totals.values())
+        assert result["cheapest_region"] == result["ranking"][0]
+
+    subset = compare_regions(["EC2"], ["sa-east-1", "us-east-1"])
+    assert subset["regions"] == ["sa-east-1", "us-east-1"] and subset["cheapest_region"] == "us-east-1"
+    assert "error" in compare_regions(["EC2"], ["moon-1"]), "Unknown regions should be reported"
+    pinned = compare_regions(["EC2"], ["us-east-1"], {"EC2": "z9.huge"})
+    assert pinned["errors"]["us-east-1"].startswith("Unknown instance type") and pinned["cheapest_region"] is None
+
+    print("✅ Multi-region cost comparison test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Pricing Tests")
+    print("=" * 50)
+
+    test_store_lookups()
+    test_estimate_cost_regions()
+    test_save_and_mmap_load()
+    test_reload_invalidates_caches()
+    test_batch_matches_scalar()
+    test_usage_scaling()
+    test_cost_sweep_matches_scalar()
+    test_cost_simulation()
+    test_region_comparison()
+
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the multilingual requirement index
+多言語要件インデックスのテストスクリプト
+"""
+
+import time
+from requirement_index import FUZZY_MIN_SCORE, REQUIREMENT_INDEX, REQUIREMENT_NAMES, REQUIREMENT_SERVICES, RequirementIndex
+
+def test_names_cover_every_requirement():
+    """Test that every language names every requirement exactly once"""
+    print("Testing localized requirement names...")
+
+    for code, names in REQUIREMENT_NAMES.items():
+        assert set(names) == set(REQUIREMENT_SERVICES), f"{code} names do not match the requirement IDs"
+        assert len(set(names.values())) == len(names), f"{code} has duplicate names"
+        for req_id, name in names.items():
+            assert REQUIREMENT_INDEX.requirement_id(name, code) == req_id, f"{name} should resolve to {req_id}"
+            assert REQUIREMENT_INDEX.name(req_id, code) == name
+
+    print("✅ Localized name test passed!")
+
+def test_lookups_both_directions():
+    """Test requirement -> services and service -> requirements lookups"""
+    print("\nTesting requirement and service lookups...")
+
+    en = REQUIREMENT_INDEX.recommend(["High availability", "Database", "Unknown"], "en")
+    ja = REQUIREMENT_INDEX.recommend(["高可用性", "データベース"], "ja")
+    assert en == {"High availability": ["ALB", "Auto Scaling", "Multi-AZ RDS"], "Database": ["RDS", "DynamoDB", "ElastiCache"]}
+    assert list(ja.values()) == list(en.values()), "Languages should share the same services"
+    assert REQUIREMENT_INDEX.recommend(["Database"], "fr") == {"Database": ["RDS", "DynamoDB", "ElastiCache"]}, \
+        "Unknown languages should fall back to English"
+
+    for req_id, services in REQUIREMENT_SERVICES.items():
+        for service in services:
+            assert req_id in REQUIREMENT_INDEX.requirements_for(service), f"{service} should map back to {req_id}"
+    assert REQUIREMENT_INDEX.requirements_for("S3") == ["static_content_delivery", "data_lake"]
+    assert REQUIREMENT_INDEX.requirements_for("Nonexistent") == []
+
+    en["Database"].append("Aurora")
+    assert "Aurora" not in REQUIREMENT_INDEX.services("database"), "Results should not alias the index"
+
+    print("✅ Lookup test passed!")
+
+def test_third_language():
+    """Test that a new language only needs names"""
+    print("\nTesting a third language...")
+
+    names = dict(REQUIREMENT_NAMES, fr={"database": "Base de données", "security": "Sécurité"})
+    index = RequirementIndex(REQUIREMENT_SERVICES, names)
+    assert index.recommend(["Base de données", "Sécurité"], "fr") == {
+        "Base de données": REQUIREMENT_SERVICES["database"], "Sécurité": REQUIREMENT_SERVICES["security"]
+    }
+    assert index.mapping("ja") == REQUIREMENT_INDEX.mapping("ja"), "Existing languages should be unchanged"
+
+    print("✅ Third language test passed!")
+
+def test_fuzzy_matching():
+    """Test n-gram matching of near-miss phrasings in both languages"""
+    print("\nTesting fuzzy requirement matching...")
+
+    near_misses = {
+        ("高可用", "ja"): "high_availability",
+        ("SSL certificates", "en"): "ssl_certificate",
+        ("ｓｓｌ証明書", "ja"): "ssl_certificate",
+        ("machine-learning", "en"): "machine_learning",
+        ("Databases", "en"): "database",
+        ("データベース", "en"): "database",
+        ("ログの集約", "ja"): "log_aggregation"
+    }
+    for (text, code), req_id in near_misses.items():
+        matches = REQUIREMENT_INDEX.fuzzy_matches(text, code)
+        assert matches[0]["requirement_id"] == req_id, f"{text} should match {req_id}, got {matches}"
+        assert matches[0]["score"] >= FUZZY_MIN_SCORE, f"{text} should clear the fuzzy threshold"
+        assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+
+    exact = REQUIREMENT_INDEX.fuzzy_matches("High availability", "ja", k=1)[0]
+    assert exact["score"] == 1.0 and exact["name"] == "高可用性", "Names should follow the requested language"
+    assert len({m["requirement_id"] for m in REQUIREMENT_INDEX.fuzzy_matches("Data", "en", k=5)}) == 5
+
+    assert REQUIREMENT_INDEX.recommend(["高可用", "SSL certificates", "Quantum computing"], "ja") == {
+        "高可用": REQUIREMENT_SERVICES["high_availability"], "SSL certificates": REQUIREMENT_SERVICES["ssl_certificate"]
+    }, "Recommendations should tolerate near-miss phrasing"
+    assert REQUIREMENT_INDEX.recommend(["高可用"], "ja", min_score=None) == {}, "Fuzzy matching can be disabled"
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        REQUIREMENT_INDEX.fuzzy_matches("Static contents delivery", "en")
+    elapsed = (time.perf_counter() - start) / 1000
+    # Timings are reported rather than asserted; shared CI machines are too noisy for a hard bound
+
+    print(f"✅ Fuzzy matching test passed! ({elapsed * 1000:.3f} ms per lookup)")
+
+if __name__ == "__main__":
+    print("🧪 Running Requirement Index Tests")
+    print("=" * 50)
+
+    test_names_cover_every_requirement()
+    test_lookups_both_directions()
+    test_third_language()
+    test_fuzzy_matching()
+
+    print("\n🎉 All tests passed!")
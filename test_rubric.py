@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the compiled grading rubric
+ルーブリック（グレード閾値・減点）のテストスクリプト
+"""
+
+import io
+import json
+import random
+import timeit
+from bulk_grader import grade_file
+from languages import get_scenarios
+from rubric import Rubric, RubricTable, get_rubric, set_rubric
+from scoring import ScoringKernel, _popcount as popcount
+from tool_cache import LRUCache
+from demo_game import AWS_SERVICES, SCENARIOS
+
+def if_elif_grade(correct_ratio):
+    """The hardcoded grade chain the rubric replaces"""
+    if correct_ratio >= 0.9:
+        return "S"
+    elif correct_ratio >= 0.7:
+        return "A"
+    elif correct_ratio >= 0.5:
+        return "B"
+    elif correct_ratio >= 0.3:
+        return "C"
+    else:
+        return "D"
+
+def test_default_rubric_matches_chain():
+    """Test the default rubric against the original thresholds and penalty"""
+    print("Testing default rubric...")
+
+    table = Rubric().default
+    ratios = [0, 0.29, 0.3, 0.49, 0.5, 0.69, 0.7, 0.89, 0.9, 1.0] + [i / 7 for i in range(8)]
+    for ratio in ratios:
+        assert table.grade(ratio) == if_elif_grade(ratio), f"Grade mismatch at {ratio}"
+    for extra in range(100):
+        assert table.penalty(extra) == extra * 10, f"Penalty mismatch for {extra} extra services"
+    assert table.ranking == ["S", "A", "B", "C", "D"], "Ranking should list the best grade first"
+
+    print("✅ Default rubric test passed!")
+
+def test_penalty_curve_and_overrides():
+    """Test escalating penalties and per-scenario overrides"""
+    print("\nTesting penalty curve and scenario overrides...")
+
+    table = RubricTable({"Pass": 0.6}, "Fail", [5, 10, 20])
+    assert [table.penalty(k) for k in range(6)] == [0, 5, 15, 35, 55, 75], "Last step should repeat"
+    assert table.penalty(1000) == 35 + 997 * 20, "Penalties past the table should extrapolate"
+    assert table.grade(0.6) == "Pass" and table.grade(0.59) == "Fail", "Custom grades should apply"
+
+    rubric = Rubric({"scenario_overrides": {"2": {"penalty_curve": [0]}}})
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS, rubric)
+    services = SCENARIOS[1]["correct_services"] + ["Lambda", "DynamoDB"]
+    assert kernel.score(services, 2)[0] == SCENARIOS[1]["max_score"], "Override should remove the penalty"
+    services = SCENARIOS[0]["correct_services"] + ["Lambda", "DynamoDB"]
+    assert kernel.score(services, 1)[0] == SCENARIOS[0]["max_score"] - 20, "Other scenarios keep the default"
+
+    print("✅ Penalty curve and override test passed!")
+
+def test_runtime_swap():
+    """Test that swapping the active rubric reaches every evaluation path"""
+    print("\nTesting runtime rubric swap...")
+
+    scenarios = get_scenarios("en")
+    kernel = ScoringKernel(AWS_SERVICES, scenarios)
+    cache = LRUCache("test.rubric", depends_on=("rubric",))
+    cache.put("key", "value")
+    scenario = scenarios[0]
+    half = scenario["correct_services"][:len(scenario["correct_services"]) // 2] + ["Lambda"]
+    submission = json.dumps({"player": "p", "scenario_id": scenario["id"], "services": half}) + "\n"
+
+    try:
+        set_rubric({"thresholds": {"Pass": 0.4}, "lowest_grade": "Fail", "penalty_curve": [1],
+                    "scenario_overrides": {"3": {"penalty_curve": [50]}}})
+        score, grade, _ = kernel.score(half, scenario["id"])
+        live = kernel.live_scorer(scenario["id"])
+        for service in half:
+            live.add(service)
+        output = io.StringIO()
+        grade_file(io.StringIO(submission), output, language="en")
+        bulk = json.loads(output.getvalue())
+
+        assert grade == "Pass" and live.grade == "Pass", "Kernel and live scorer should use the new rubric"
+        assert live.projected_score == score, "Live scorer should apply the new penalty"
+        assert (bulk["score"], bulk["grade"]) == (score, grade), "Bulk grader should agree"
+        assert len(cache) == 0, "Rubric-dependent caches should be cleared"
+    finally:
+        set_rubric(None)
+
+    assert get_rubric().default.grades == ["D", "C", "B", "A", "S"], "Default rubric should be restored"
+    print("✅ Runtime swap test passed!")
+
+def test_benchmark():
+    """Compare kernel scoring through the compiled rubric with the threshold loop it replaced"""
+    print("\nBenchmarking compiled rubric against the threshold loop...")
+
+    rng = random.Random(9)
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    pool = [s for services in AWS_SERVICES.values() for s in services]
+    submissions = [(rng.choice(SCENARIOS)["id"], rng.sample(pool, rng.randint(0, 10))) for _ in range(20000)]
+    thresholds = [(0.9, "S"), (0.7, "A"), (0.5, "B"), (0.3, "C")]
+
+    def loop_grade(correct_ratio):
+        for threshold, grade in thresholds:
+            if correct_ratio >= threshold:
+                return grade
+        return "D"
+
+    def legacy():
+        answer_keys = kernel.answer_keys
+        encode = kernel.universe.encode
+        results = []
+        for scenario_id, services in submissions:
+            key_mask, key_size, base_score = answer_keys[scenario_id]
+            mask, unknown = encode(services)
+            matched = popcount(mask & key_mask)
+            extra = popcount(mask & ~key_mask) + len(unknown)
+            correct_ratio = matched / key_size if key_size else 0
+            results.append((max(0, int(base_score * correct_ratio - extra * 10)), loop_grade(correct_ratio), correct_ratio))
+        return results
+
+    def compiled():
+        return kernel.score_batch(submissions)
+
+    assert compiled() == legacy(), "Default rubric should reproduce the legacy scores"
+
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=5))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=5))
+    print(f"   threshold loop: {legacy_time * 1000:.1f} ms, compiled rubric: {compiled_time * 1000:.1f} ms")
+    # Timings are reported rather than asserted; shared CI machines are too noisy for a hard bound
+
+    print("✅ Benchmark test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Rubric Tests")
+    print("=" * 50)
+
+    test_default_rubric_matches_chain()
+    test_penalty_curve_and_overrides()
+    test_runtime_swap()
+    test_benchmark()
+
+    print("\n🎉 All tests passed!")
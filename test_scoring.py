@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the bitmask scoring kernel
+ビットマスク採点カーネルのテストスクリプト
+"""
+
+import random
+from languages import get_scenarios
+from scoring import ScoringKernel, ServiceUniverse, accepted_answer_keys, grade_for_ratio
+from demo_game import AWS_SERVICES, SCENARIOS
+
+def reference_evaluate(selected_services, scenario):
+    """Original set-based scoring used as the reference implementation"""
+    correct_services = set(scenario["correct_services"])
+    selected_services_set = set(selected_services)
+    correct_matches = correct_services.intersection(selected_services_set)
+    incorrect_services = selected_services_set - correct_services
+    missed_services = correct_services - selected_services_set
+    correct_ratio = len(correct_matches) / len(correct_services)
+    final_score = max(0, int(scenario["max_score"] * correct_ratio - len(incorrect_services) * 10))
+    return final_score, grade_for_ratio(correct_ratio), correct_ratio, correct_matches, incorrect_services, missed_services
+
+def random_submission(rng):
+    pool = [s for services in AWS_SERVICES.values() for s in services] + ["App Mesh", "InvalidService", "Multi-AZ RDS"]
+    return [rng.choice(pool) for _ in range(rng.randint(0, 12))]
+
+def test_universe_round_trip():
+    """Test encoding and decoding of service bitmasks"""
+    print("Testing service universe round trip...")
+
+    universe = ServiceUniverse(["EC2", "S3", "RDS"])
+    mask, unknown = universe.encode(["RDS", "EC2", "Unknown", "Unknown"])
+
+    assert mask == 0b101, "EC2 and RDS should set bits 0 and 2"
+    assert unknown == ["Unknown"], "Unknown services should be reported once"
+    assert universe.decode(mask) == ["EC2", "RDS"], "Decoding should return names in ID order"
+
+    print("✅ Service universe test passed!")
+
+def test_kernel_matches_reference():
+    """Test that the kernel reproduces the set-based scoring exactly"""
+    print("\nTesting kernel against reference implementation...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    rng = random.Random(42)
+
+    for _ in range(2000):
+        scenario = rng.choice(SCENARIOS)
+        selected = random_submission(rng)
+        score, grade, ratio, matches, incorrect, missed = reference_evaluate(selected, scenario)
+
+        result = kernel.evaluate(selected, scenario["id"])
+        assert result["score"] == score, f"Score mismatch for {selected}"
+        assert result["grade"] == grade, f"Grade mismatch for {selected}"
+        assert result["correct_ratio"] == round(ratio * 100, 1), f"Ratio mismatch for {selected}"
+        assert set(result["correct_services"]) == matches, "Correct services mismatch"
+        assert set(result["incorrect_services"]) == incorrect, "Incorrect services mismatch"
+        assert set(result["missed_services"]) == missed, "Missed services mismatch"
+
+    print("✅ Kernel reference test passed!")
+
+def test_batch_scoring():
+    """Test batch scoring matches single submission scoring"""
+    print("\nTesting batch scoring...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    rng = random.Random(7)
+    submissions = [(rng.choice([1, 2, 3]), random_submission(rng)) for _ in range(500)]
+    submissions.append((99, ["EC2"]))
+
+    results = kernel.score_batch(submissions)
+
+    assert len(results) == len(submissions), "Should return one result per submission"
+    assert results[-1] is None, "Unknown scenarios should yield None"
+    for (scenario_id, selected), result in zip(submissions[:-1], results[:-1]):
+        assert result == kernel.score(selected, scenario_id), "Batch result should match single scoring"
+
+    print("✅ Batch scoring test passed!")
+
+def test_invalid_scenario():
+    """Test unknown scenario IDs"""
+    print("\nTesting invalid scenario handling...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    assert kernel.evaluate(["EC2"], 99) is None, "Unknown scenario should return None"
+    assert kernel.score(["EC2"], 99) is None, "Unknown scenario should return None"
+
+    print("✅ Invalid scenario test passed!")
+
+def test_live_scorer():
+    """Test incremental scoring against full evaluation"""
+    print("\nTesting live scorer...")
+
+    kernel = ScoringKernel(AWS_SERVICES, SCENARIOS)
+    rng = random.Random(99)
+    pool = [s for services in AWS_SERVICES.values() for s in services] + ["App Mesh", "CustomService"]
+
+    scorer = kernel.live_scorer(2)
+    selected = []
+    for _ in range(300):
+        service = rng.choice(pool)
+        if service in selected and rng.random() < 0.6:
+            assert scorer.remove(service), "Removing a selected service should succeed"
+            selected.remove(service)
+        else:
+            added = scorer.add(service)
+            assert added == (service not in selected), "Adding twice should be a no-op"
+            if added:
+                selected.append(service)
+
+        expected = kernel.evaluate(selected, 2)
+        snapshot = scorer.snapshot()
+        assert snapshot["score"] == expected["score"], "Projected score should match evaluation"
+        assert snapshot["grade"] == expected["grade"], "Grade should match evaluation"
+        assert snapshot["correct_ratio"] == expected["correct_ratio"], "Ratio should match evaluation"
+        assert scorer.missed_count == len(expected["missed_services"]), "Missed count should match"
+        assert scorer.extra_count == len(expected["incorrect_services"]), "Extra count should match"
+
+    assert not scorer.remove("NotSelectedService"), "Removing an unselected service should fail"
+    assert kernel.live_scorer(99) is None, "Unknown scenario should return None"
+
+    print("✅ Live scorer test passed!")
+
+def test_alternative_answer_keys():
+    """Test best-match scoring across alternative answer keys"""
+    print("\nTesting alternative answer keys...")
+
+    scenarios = get_scenarios("en")
+    kernel = ScoringKernel(AWS_SERVICES, scenarios)
+    rng = random.Random(5)
+
+    for _ in range(2000):
+        scenario = rng.choice(scenarios)
+        selected = random_submission(rng) + rng.choice(accepted_answer_keys(scenario))[:rng.randint(0, 7)]
+        candidates = [
+            reference_evaluate(selected, dict(scenario, correct_services=key))
+            for key in accepted_answer_keys(scenario)
+        ]
+        best = max(range(len(candidates)), key=lambda i: (candidates[i][0], candidates[i][2], -i))
+
+        result = kernel.evaluate(selected, scenario["id"])
+        assert result["answer_key"] == best, f"Best key mismatch for {selected}"
+        assert result["score"] == candidates[best][0], f"Score mismatch for {selected}"
+        assert set(result["missed_services"]) == candidates[best][5], "Missed services should follow the best key"
+
+        scorer = kernel.live_scorer(scenario["id"])
+        for service in selected:
+            scorer.add(service)
+        assert scorer.snapshot() == result, "Live scorer should pick the same key"
+
+    serverless = ["Lambda", "API Gateway", "DynamoDB", "S3", "CloudFront", "ACM"]
+    result = kernel.evaluate(serverless, 1)
+    assert result["grade"] == "S" and not result["incorrect_services"], "A full alternative should score like the primary key"
+
+    print("✅ Alternative answer key test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Scoring Kernel Tests")
+    print("=" * 50)
+
+    test_universe_round_trip()
+    test_kernel_matches_reference()
+    test_batch_scoring()
+    test_invalid_scenario()
+    test_live_scorer()
+    test_alternative_answer_keys()
+
+    print("\n🎉 All tests passed!")
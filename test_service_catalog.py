@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the service catalog index
+サービスカタログインデックスのテストスクリプト
+"""
+
+from demo_game import AWS_SERVICES, validate_service_input
+import random
+import string
+import time
+from service_catalog import BKTree, PrefixTrie, ServiceCatalog, catalog_for, edit_distance, normalize_service_name, service_completion
+
+def test_alias_resolution():
+    """Test case, width, spacing and vendor-prefix insensitive lookups"""
+    print("Testing alias resolution...")
+
+    catalog = catalog_for(AWS_SERVICES)
+    spellings = {
+        "ec2": "EC2", "ＥＣ２": "EC2", "Amazon S3": "S3", "route53": "Route 53", "ROUTE 53": "Route 53",
+        "AWS Lambda": "Lambda", "xray": "X-Ray", "secrets_manager": "Secrets Manager",
+        "Application Load Balancer": "ALB", "Amazon Elastic Kubernetes Service": "EKS", "ssm": "Systems Manager"
+    }
+    for spelling, service in spellings.items():
+        assert catalog.canonical(spelling) == service, f"{spelling} should resolve to {service}"
+    assert catalog.canonical("InvalidService") is None
+    assert catalog.category("amazon rds") == "Database" and catalog.category("Nope") is None
+    assert catalog.names == frozenset(s for services in AWS_SERVICES.values() for s in services)
+    assert normalize_service_name("Amazon Route 53") == normalize_service_name("route53") == "route53"
+
+    print("✅ Alias resolution test passed!")
+
+def test_parse_and_validate():
+    """Test that validation returns canonical names and reports only unknown entries"""
+    print("\nTesting input parsing...")
+
+    catalog = catalog_for(AWS_SERVICES)
+    assert catalog_for(AWS_SERVICES) is catalog, "The catalog should be built once per table"
+    services, unknown = catalog.parse(" ec2, Amazon S3 ,, route53, App Mesh ")
+    assert services == ["EC2", "S3", "Route 53", "App Mesh"] and unknown == ["App Mesh"]
+    assert validate_service_input("ｅｃ２, rds, amazon s3", AWS_SERVICES) == ["EC2", "RDS", "S3"]
+
+    try:
+        ServiceCatalog({"Compute": ["EC2", "ECS"]}, {"Elastic": "EC2", "elastic": "ECS"})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Ambiguous aliases should be rejected")
+
+    print("✅ Input parsing test passed!")
+
+def test_did_you_mean():
+    """Test suggestions for misspelled services and the BK-tree against brute force"""
+    print("\nTesting did-you-mean suggestions...")
+
+    catalog = catalog_for(AWS_SERVICES)
+    typos = {"Cloudfrnt": "CloudFront", "Lamda": "Lambda", "Sagemakr": "SageMaker", "Redshfit": "Redshift",
+             "Route54": "Route 53", "Dynamo": "DynamoDB", "Amazon Kinesys": "Kinesis"}
+    for typo, service in typos.items():
+        assert catalog.suggest(typo)[0] == service, f"{typo} should suggest {service}, got {catalog.suggest(typo)}"
+    assert catalog.suggest("EC3") == ["EC2", "ECS"], "Ties should keep every closest service"
+    assert catalog.suggest("qwerty") == [] and catalog.suggest(" ") == []
+
+    validation = catalog.validate("Cloudfrnt, S3, Xyzzy")
+    assert validation["services"] == ["Cloudfrnt", "S3", "Xyzzy"]
+    assert validation["suggestions"] == {"Cloudfrnt": ["CloudFront"], "Xyzzy": []}
+
+    assert edit_distance("kitten", "sitting") == 3 and edit_distance("kitten", "sitting", limit=1) == 2
+    rng = random.Random(5)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 20))) for _ in range(300)]
+    tree = BKTree(words)
+    for query in rng.sample(words, 30):
+        query = query[1:] + "q"
+        for radius in (1, 2, 3):
+            expected = sorted((edit_distance(query, w), w) for w in set(words) if edit_distance(query, w) <= radius)
+            assert tree.search(query, radius) == expected, f"BK-tree search differs for {query} within {radius}"
+
+    large = ServiceCatalog({"All": words})
+    start = time.perf_counter()
+    for query in words[:100]:
+        large.suggest(query[:-1] + "z")
+    elapsed = (time.perf_counter() - start) / 100
+    # Timings are reported rather than asserted; shared CI machines are too noisy for a hard bound
+
+    print(f"✅ Did-you-mean test passed! ({elapsed * 1000:.2f} ms per lookup over {len(words)} names)")
+
+def test_tab_completion():
+    """Test prefix completion of service names and the readline completer"""
+    print("\nTesting tab completion...")
+
+    catalog = catalog_for(AWS_SERVICES)
+    assert catalog.complete("clo") == ["CloudFormation", "CloudFront", "CloudTrail", "CloudWatch"]
+    assert catalog.complete("ＲＯＵ") == ["Route 53"], "Completion should ignore case and width"
+    assert catalog.complete("Application") == ["ALB"], "Aliases should complete to catalog names"
+    assert catalog.complete("ec") == ["EC2", "ECS", "Auto Scaling"], "Name matches should come before alias matches"
+    assert catalog.complete("zz") == [] and len(catalog.complete("")) == len(catalog.names)
+    catalog.complete("clo").clear()
+    catalog.complete("Application").append("EC2")
+    assert catalog.complete("clo")[0] == "CloudFormation" and catalog.complete("Application") == ["ALB"], \
+        "Changing a returned list should not change the index"
+    assert [catalog.completer(" Cloudw", i) for i in range(2)] == [" CloudWatch", None], "Leading spacing should be kept"
+
+    trie = PrefixTrie([("Secrets Manager", "Secrets Manager"), ("secrets  manager", "Secrets Manager")])
+    assert trie.complete("secrets m") == ["Secrets Manager"], "Duplicate keys should complete once"
+    assert trie.complete("Secrets  M") == ["Secrets Manager"], "Prefix spacing should not matter"
+    assert catalog.complete("route53") == ["Route 53"] and catalog.complete("Amazon Route") == ["Route 53"], \
+        "Spellings that validation accepts should also complete"
+    assert "S3" in catalog.complete("amazon s") and catalog.complete("AWS Lamb") == ["Lambda"]
+
+    try:
+        import readline
+    except ImportError:
+        readline = None
+    if readline is not None:
+        delims = readline.get_completer_delims()
+        with service_completion(catalog):
+            assert readline.get_completer() == catalog.completer and readline.get_completer_delims() == ","
+        assert readline.get_completer_delims() == delims, "The previous completer settings should be restored"
+
+    rng = random.Random(9)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 20))) for _ in range(300)]
+    large = ServiceCatalog({"All": words})
+    prefixes = [word[:rng.randint(1, 6)] for word in words]
+    start = time.perf_counter()
+    for prefix in prefixes:
+        large.complete(prefix)
+    elapsed = (time.perf_counter() - start) / len(prefixes)
+    # Timings are reported rather than asserted; shared CI machines are too noisy for a hard bound
+
+    print(f"✅ Tab completion test passed! ({elapsed * 1e6:.2f} µs per lookup)")
+
+if __name__ == "__main__":
+    print("🧪 Running Service Catalog Tests")
+    print("=" * 50)
+
+    test_alias_resolution()
+    test_parse_and_validate()
+    test_did_you_mean()
+    test_tab_completion()
+
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the TF-IDF service recommender
+TF-IDFサービスレコメンダーのテストスクリプト
+"""
+
+import time
+import numpy as np
+from languages import get_scenarios
+from service_recommender import SERVICE_CORPUS, SERVICE_RECOMMENDER, ServiceRecommender, build_service_documents, tokenize
+
+def test_tokenize():
+    """Test Latin words and Japanese bigrams"""
+    print("Testing tokenizer...")
+
+    assert tokenize("Real-time SSL, ＡＰＩ") == ["real-time", "ssl", "api"], "Full-width text should be folded"
+    assert tokenize("高可用性") == ["高可", "可用", "用性"], "Japanese runs should become bigrams"
+    assert tokenize("月間10万PV") == ["10", "pv", "月間", "万"]
+
+    print("✅ Tokenizer test passed!")
+
+def test_scores_match_dense_cosine():
+    """Test the sparse scoring against a dense TF-IDF cosine computation"""
+    print("\nTesting sparse cosine scores...")
+
+    documents = {"A": "cache cache database", "B": "database storage", "C": "データ 分析 storage"}
+    recommender = ServiceRecommender(documents)
+    vocabulary = sorted(recommender.idf)
+
+    def dense(text):
+        tokens = [t for t in tokenize(text) if t in recommender.idf]
+        vector = np.array([(1 + np.log(tokens.count(t))) * recommender.idf[t] if t in tokens else 0 for t in vocabulary])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    matrix = np.array([dense(text) for text in documents.values()])
+    for query in ("database cache", "storage データ", "nothing known"):
+        assert np.allclose(recommender.scores(query), matrix @ dense(query)), f"Scores differ for {query}"
+
+    print("✅ Sparse cosine test passed!")
+
+def test_scenarios_rank_their_services():
+    """Test that built-in scenarios recall most of their answer key in both languages"""
+    print("\nTesting scenario recommendations...")
+
+    assert set(build_service_documents()) == set(SERVICE_CORPUS)
+    for code in ("en", "ja"):
+        for scenario in get_scenarios(code):
+            recommended = [r["service"] for r in SERVICE_RECOMMENDER.recommend_for_scenario(scenario)]
+            hits = set(recommended) & set(scenario["correct_services"])
+            assert len(hits) >= len(scenario["correct_services"]) // 2, f"Weak recall for {code} scenario {scenario['id']}: {recommended}"
+
+    results = SERVICE_RECOMMENDER.recommend("NoSQL key value database", k=3)
+    assert results[0]["service"] == "DynamoDB", f"Unexpected ranking {results}"
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert SERVICE_RECOMMENDER.recommend("zzzz qqqq") == [], "Unknown words should recommend nothing"
+
+    start = time.perf_counter()
+    for _ in range(200):
+        SERVICE_RECOMMENDER.recommend("リアルタイムのストリーミングデータ処理と機械学習")
+    elapsed = (time.perf_counter() - start) / 200
+    # Timings are reported rather than asserted; shared CI machines are too noisy for a hard bound
+
+    print(f"✅ Scenario recommendation test passed! ({elapsed * 1000:.3f} ms per query)")
+
+if __name__ == "__main__":
+    print("🧪 Running Service Recommender Tests")
+    print("=" * 50)
+
+    test_tokenize()
+    test_scores_match_dense_cosine()
+    test_scenarios_rank_their_services()
+
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the tool result LRU cache
+ツール結果LRUキャッシュのテストスクリプト
+"""
+
+import threading
+from languages import reload_scenarios
+from scoring import build_language_kernels
+from tool_cache import LRUCache, memoize, evaluation_key, cost_key
+from demo_game import AWS_SERVICES
+from pricing import estimate_cost
+
+def test_lru_eviction():
+    """Test LRU ordering and counters"""
+    print("Testing LRU eviction...")
+
+    cache = LRUCache("test.eviction", maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1, "Cached value should be returned"
+    cache.put("c", 3)  # evicts "b", the least recently used
+
+    assert cache.get("b") is None, "Least recently used entry should be evicted"
+    assert cache.get("c") == 3, "Newest entry should be kept"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["evictions"] == 1, f"Unexpected stats {stats}"
+
+    print("✅ LRU eviction test passed!")
+
+def test_canonical_keys():
+    """Test that argument order does not change cache keys"""
+    print("\nTesting canonical keys...")
+
+    assert evaluation_key(["EC2", "S3"], 1) == evaluation_key(["EC2", "S3", "EC2"], 1, "en"), "Evaluation keys should ignore duplicates"
+    assert evaluation_key(["EC2", "Foo", "Bar"], 1) != evaluation_key(["EC2", "Bar", "Foo"], 1), \
+        "Order decides how unknown services are listed, so it is part of the key"
+    assert evaluation_key(["EC2"], 1, "ja") != evaluation_key(["EC2"], 1, "en"), "Language should be part of the key"
+    assert cost_key(["EC2", "S3"]) == cost_key(["S3", "EC2"], "us-east-1"), "Cost keys should ignore order"
+    assert cost_key(["EC2", "EC2"]) != cost_key(["EC2"]), "Duplicate services change the total cost"
+    assert cost_key(["EC2"], "us-east-1", {"EC2": "m5.large"}) != cost_key(["EC2"]), "Instance types should be part of the key"
+    assert cost_key(["S3"], usage={"storage_gb": 50}) != cost_key(["S3"]), "Usage should be part of the key"
+
+    print("✅ Canonical key test passed!")
+
+def test_memoize_thread_safety():
+    """Test concurrent access through the memoize decorator"""
+    print("\nTesting memoized calls from many threads...")
+
+    cache = LRUCache("test.threads", maxsize=16)
+    calls = []
+
+    @memoize(cache, lambda x: x % 32)
+    def square(x):
+        calls.append(x)
+        return (x % 32) ** 2
+
+    def worker():
+        for i in range(2000):
+            assert square(i) == (i % 32) ** 2
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    assert stats["size"] <= 16, "Cache should stay bounded"
+    assert stats["hits"] + stats["misses"] == 16000, "Every call should be counted"
+    assert len(calls) == stats["misses"], "Only misses should call the function"
+
+    print("✅ Thread safety test passed!")
+
+def test_results_are_isolated():
+    """Test that callers cannot change cached results and that unkeyable input bypasses the cache"""
+    print("\nTesting cached result isolation...")
+
+    cache = LRUCache("test.isolation")
+    calls = []
+
+    @memoize(cache, evaluation_key)
+    def evaluate(selected_services, scenario_id, language="en"):
+        calls.append(selected_services)
+        if not all(isinstance(service, str) for service in selected_services):
+            return {"error": "Services must be names"}
+        return {"score": 50, "services": list(selected_services)}
+
+    first = evaluate(["EC2", "ALB"], 1)
+    first["score"] = 999
+    first["services"].append("S3")
+    second = evaluate(["EC2", "ALB"], 1)
+    assert second == {"score": 50, "services": ["EC2", "ALB"]}, "Changing a result should not change the cache"
+    second["score"] = 0
+    assert evaluate(["EC2", "ALB"], 1)["score"] == 50, "Changing a cache hit should not change the cache"
+    assert len(calls) == 1, "Repeated calls should still hit the cache"
+
+    assert evaluate([["EC2"]], 1) == {"error": "Services must be names"}, "Unhashable input should reach the function"
+    assert len(cache) == 1, "Unhashable input should not be cached"
+    check_architecture_cost = memoize(LRUCache("test.isolation.cost"), cost_key)(estimate_cost)
+
+    assert "error" in check_architecture_cost(["EC2"], instance_types={"EC2": ["m5.large"]}), \
+        "Bad input to a cached tool should get the tool's error dict"
+    assert "error" in check_architecture_cost(["S3"], usage={"storage_gb": [1]})
+
+    print("✅ Result isolation test passed!")
+
+def test_invalidation_on_reload():
+    """Test that reloading scenarios clears dependent caches and rebuilds kernels"""
+    print("\nTesting invalidation on scenario reload...")
+
+    scenario_cache = LRUCache("test.scenarios", depends_on=("scenarios",))
+    pricing_cache = LRUCache("test.pricing", depends_on=("pricing",))
+    scenario_cache.put("key", "value")
+    pricing_cache.put("key", "value")
+    kernels = build_language_kernels(AWS_SERVICES)
+    old_kernel = kernels["en"]
+
+    reload_scenarios()
+
+    assert len(scenario_cache) == 0, "Scenario-dependent cache should be cleared"
+    assert len(pricing_cache) == 1, "Pricing cache should be untouched"
+    assert kernels["en"] is not old_kernel, "Scoring kernels should be rebuilt in place"
+
+    print("✅ Invalidation test passed!")
+
+if __name__ == "__main__":
+    print("🧪 Running Tool Cache Tests")
+    print("=" * 50)
+
+    test_lru_eviction()
+    test_canonical_keys()
+    test_memoize_thread_safety()
+    test_results_are_isolated()
+    test_invalidation_on_reload()
+
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded LRU memoization for agent tool results
+エージェントツール結果のLRUキャッシュ
+"""
+
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Callable, Hashable, Iterable, Optional, Tuple
+
+from languages import on_scenarios_reloaded
+from pricing import on_pricing_reloaded
+from rubric import on_rubric_changed
+
+_MISSING = object()
+_CACHES: List["LRUCache"] = []
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with hit/miss/eviction counters
+
+    get returns the stored object itself; memoize hands each caller its own copy.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, depends_on: Iterable[str] = ()):
+        self.name = name
+        self.maxsize = maxsize
+        self.depends_on = frozenset(depends_on)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _CACHES.append(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+def memoize(cache: LRUCache, key_func: Callable[..., Hashable]):
+    """
+    Memoize a function through an LRUCache
+
+    key_func receives the same arguments as the wrapped function and must
+    return a hashable canonical form of them. Arguments it cannot turn into a
+    key (e.g. a list where a string belongs) are passed through uncached, so
+    the function's own input checks still apply. Results are deep-copied in
+    and out, so a caller changing its result cannot change later ones.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = key_func(*args, **kwargs)
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.put(key, copy.deepcopy(value))
+                return value
+            return copy.deepcopy(value)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def evaluation_key(selected_services: List[str], scenario_id: int, language: str = "en") -> Tuple:
+    """Canonical cache key for evaluate_architecture arguments (order matters: unknown services are listed as given)"""
+    return tuple(dict.fromkeys(selected_services)), scenario_id, language
+
+
+def cost_key(services: List[str], region: str = "us-east-1",
+             instance_types: Optional[Dict[str, str]] = None,
+             usage: Optional[Dict[str, float]] = None) -> Tuple:
+    """Canonical cache key for check_architecture_cost arguments (duplicates count toward the total)"""
+    return (tuple(sorted(services)), region, tuple(sorted((instance_types or {}).items())),
+            tuple(sorted((usage or {}).items())))
+
+
+def invalidate_caches(dependency: str):
+    """Clear every cache built on the given data source ("scenarios", "rubric" or "pricing")"""
+    for cache in _CACHES:
+        if dependency in cache.depends_on:
+            cache.clear()
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Hit/miss/eviction counters for every registered cache"""
+    return [cache.stats() for cache in _CACHES]
+
+
+on_scenarios_reloaded(lambda: invalidate_caches("scenarios"))
+on_rubric_changed(lambda: invalidate_caches("rubric"))
+on_pricing_reloaded(lambda: invalidate_caches("pricing"))